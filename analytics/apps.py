@@ -0,0 +1,11 @@
+# analytics/apps.py
+
+from django.apps import AppConfig
+
+
+class AnalyticsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "analytics"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,202 @@
+# analytics/forecasting.py
+
+import datetime
+from itertools import islice
+import numpy as np
+from customers.models import Deal
+
+STAGES = [stage for stage, _ in Deal.DEAL_STAGES]
+STAGE_INDEX = {stage: i for i, stage in enumerate(STAGES)}
+WON = STAGE_INDEX["closed_won"]
+LOST = STAGE_INDEX["closed_lost"]
+
+CHUNK_SIZE = 20000
+
+# Above this many deal x simulation draws, use the normal approximation
+EXACT_SIMULATION_LIMIT = 50_000_000
+
+
+def month_number(date):
+    return date.year * 12 + date.month - 1
+
+
+def month_start(number):
+    return datetime.date(number // 12, number % 12 + 1, 1)
+
+
+class Pipeline:
+    """Column arrays for a set of deals, one element per deal"""
+
+    def __init__(self, value, probability, stage, month, assigned_to):
+        self.value = value  # float64
+        self.probability = probability  # float64, 0-1
+        self.stage = stage  # int8 index into STAGES
+        self.month = month  # int32 months since year 0 (expected close)
+        self.assigned_to = assigned_to  # int64 user id, -1 if unassigned
+
+    def __len__(self):
+        return len(self.value)
+
+    @property
+    def is_open(self):
+        return (self.stage != WON) & (self.stage != LOST)
+
+
+def load_pipeline(queryset=None):
+    """Read deals into NumPy columns with one streaming values_list pass"""
+    if queryset is None:
+        queryset = Deal.objects.all()
+    rows = queryset.order_by().values_list(
+        "value", "probability", "stage", "expected_close_date", "assigned_to_id"
+    )
+
+    columns = [[], [], [], [], []]
+    iterator = rows.iterator(chunk_size=CHUNK_SIZE)
+    # Convert a chunk at a time so only one chunk of tuples is alive at once
+    while chunk := list(islice(iterator, CHUNK_SIZE)):
+        value, probability, stage, close_date, assigned_to = zip(*chunk)
+        columns[0].append(np.array(value, dtype=np.float64))
+        columns[1].append(np.array(probability, dtype=np.float64) / 100)
+        columns[2].append(np.array([STAGE_INDEX[s] for s in stage], dtype=np.int8))
+        columns[3].append(
+            np.array([month_number(d) for d in close_date], dtype=np.int32)
+        )
+        columns[4].append(
+            np.array([-1 if a is None else a for a in assigned_to], dtype=np.int64)
+        )
+
+    dtypes = [np.float64, np.float64, np.int8, np.int32, np.int64]
+    return Pipeline(
+        *(
+            np.concatenate(column) if column else np.empty(0, dtype=dtype)
+            for column, dtype in zip(columns, dtypes)
+        )
+    )
+
+
+def expected_revenue_by_month(pipeline):
+    """Probability-weighted value of open deals per expected close month"""
+    open_deals = pipeline.is_open
+    months, index = np.unique(pipeline.month[open_deals], return_inverse=True)
+    expected = np.bincount(
+        index,
+        weights=pipeline.value[open_deals] * pipeline.probability[open_deals],
+        minlength=len(months),
+    )
+    return [
+        {"month": month_start(month), "expected": float(amount)}
+        for month, amount in zip(months, expected)
+    ]
+
+
+def win_rates(pipeline):
+    """Historical won / (won + lost) overall, per assignee and per stage.
+
+    Deal only stores its current stage, so per-stage rates compare the
+    stated probability of open deals in each stage with the overall
+    historical rate rather than tracking actual stage transitions.
+    """
+    won = pipeline.stage == WON
+    closed = won | (pipeline.stage == LOST)
+    overall = float(won.sum() / closed.sum()) if closed.any() else 0.0
+
+    assignees, index = np.unique(pipeline.assigned_to[closed], return_inverse=True)
+    won_counts = np.bincount(index, weights=won[closed], minlength=len(assignees))
+    closed_counts = np.bincount(index, minlength=len(assignees))
+    by_assignee = {
+        (None if a == -1 else int(a)): float(w / c)
+        for a, w, c in zip(assignees, won_counts, closed_counts)
+    }
+
+    stage_counts = np.bincount(pipeline.stage, minlength=len(STAGES))
+    stage_probability = np.bincount(
+        pipeline.stage, weights=pipeline.probability, minlength=len(STAGES)
+    )
+    by_stage = {
+        stage: {
+            "deals": int(stage_counts[i]),
+            "mean_probability": (
+                float(stage_probability[i] / stage_counts[i])
+                if stage_counts[i]
+                else 0.0
+            ),
+        }
+        for i, stage in enumerate(STAGES)
+        if i not in (WON, LOST)
+    }
+    return {"overall": overall, "by_assignee": by_assignee, "by_stage": by_stage}
+
+
+def blended_probability(pipeline, blend):
+    """Mix stated probabilities with each assignee's historical win rate"""
+    if not blend:
+        return pipeline.probability
+
+    rates = win_rates(pipeline)
+    historical = np.full(len(pipeline), rates["overall"])
+    for assignee, rate in rates["by_assignee"].items():
+        historical[pipeline.assigned_to == (-1 if assignee is None else assignee)] = (
+            rate
+        )
+    return (1 - blend) * pipeline.probability + blend * historical
+
+
+def simulate(
+    pipeline, simulations=10000, percentiles=(10, 50, 90), blend=0.0, seed=None
+):
+    """Monte Carlo revenue per close month for the open deals.
+
+    Each open deal closes independently with its probability. Small
+    pipelines are simulated exactly with Bernoulli draws; once
+    ``deals * simulations`` exceeds ``EXACT_SIMULATION_LIMIT`` each month's
+    total is drawn from its normal approximation (mean ``sum(v*p)``,
+    variance ``sum(v^2*p*(1-p))``), which is what the sum of many
+    independent deals converges to and costs O(deals + simulations).
+    """
+    rng = np.random.default_rng(seed)
+    open_deals = pipeline.is_open
+    value = pipeline.value[open_deals]
+    probability = blended_probability(pipeline, blend)[open_deals]
+    months, index = np.unique(pipeline.month[open_deals], return_inverse=True)
+
+    if len(value) * simulations <= EXACT_SIMULATION_LIMIT:
+        # Deals ordered by month, so each month's draws sum as one slice
+        order = np.argsort(index, kind="stable")
+        value, probability = value[order], probability[order]
+        starts = np.searchsorted(index[order], np.arange(len(months)))
+        totals = np.empty((simulations, len(months)))
+        step = max(1, EXACT_SIMULATION_LIMIT // 10 // max(1, len(value)))
+        for start in range(0, simulations, step):
+            stop = min(simulations, start + step)
+            closed = rng.random((stop - start, len(value))) < probability
+            totals[start:stop] = np.add.reduceat(closed * value, starts, axis=1)
+    else:
+        mean = np.bincount(index, weights=value * probability, minlength=len(months))
+        variance = np.bincount(
+            index,
+            weights=value**2 * probability * (1 - probability),
+            minlength=len(months),
+        )
+        totals = rng.normal(mean, np.sqrt(variance), (simulations, len(months)))
+        np.clip(totals, 0, None, out=totals)
+
+    bands = np.percentile(totals, percentiles, axis=0)
+    return [
+        {
+            "month": month_start(month),
+            "mean": float(totals[:, i].mean()),
+            **{f"p{pct}": float(bands[j, i]) for j, pct in enumerate(percentiles)},
+        }
+        for i, month in enumerate(months)
+    ]
+
+
+def forecast(queryset=None, simulations=10000, blend=0.0, seed=None):
+    """Expected revenue, win rates and confidence bands in one call"""
+    pipeline = load_pipeline(queryset)
+    return {
+        "deals": len(pipeline),
+        "expected_by_month": expected_revenue_by_month(pipeline),
+        "win_rates": win_rates(pipeline),
+        "simulation": simulate(pipeline, simulations, blend=blend, seed=seed),
+    }
@@ -0,0 +1,18 @@
+# analytics/management/commands/rebuild_rollups.py
+
+from django.core.management.base import BaseCommand
+from analytics import rollups
+from analytics.models import OutcomeRollup, StageRollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild the pipeline rollup tables from the Deal table"
+
+    def handle(self, *args, **options):
+        rollups.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {StageRollup.objects.count()} stage and "
+                f"{OutcomeRollup.objects.count()} outcome rollup rows."
+            )
+        )
@@ -0,0 +1,52 @@
+# analytics/models.py
+
+from django.db import models
+from django.contrib.auth.models import User
+from customers.models import Deal
+
+
+class StageRollup(models.Model):
+    """Pipeline totals per deal stage, maintained from Deal saves"""
+
+    stage = models.CharField(max_length=20, choices=Deal.DEAL_STAGES, unique=True)
+    deal_count = models.IntegerField(default=0)
+    total_value = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    # Sum of value * probability / 100
+    weighted_value = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["stage"]
+
+    def __str__(self):
+        return f"{self.get_stage_display()}: {self.deal_count} deals"
+
+
+class OutcomeRollup(models.Model):
+    """Closed deal totals per close month, outcome and assignee"""
+
+    OUTCOMES = [
+        ("closed_won", "Closed Won"),
+        ("closed_lost", "Closed Lost"),
+    ]
+
+    # First day of the deal's expected_close_date month
+    month = models.DateField()
+    outcome = models.CharField(max_length=20, choices=OUTCOMES)
+    assigned_to = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    deal_count = models.IntegerField(default=0)
+    total_value = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-month", "outcome"]
+        indexes = [
+            models.Index(
+                fields=["month", "outcome", "assigned_to"], name="outcomerollup_key"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.get_outcome_display()}: {self.deal_count}"
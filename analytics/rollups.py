@@ -0,0 +1,136 @@
+# analytics/rollups.py
+
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import TruncMonth
+from customers.models import Deal
+from .models import OutcomeRollup, StageRollup
+
+STATE_FIELDS = [
+    "stage",
+    "value",
+    "probability",
+    "expected_close_date",
+    "assigned_to_id",
+]
+
+CLOSED_OUTCOMES = {outcome for outcome, _ in OutcomeRollup.OUTCOMES}
+
+WEIGHTED_VALUE = ExpressionWrapper(
+    # Multiply by a decimal so integer-valued rows don't use integer division
+    F("value") * F("probability") * Value(Decimal("0.01")),
+    output_field=DecimalField(max_digits=16, decimal_places=2),
+)
+
+
+def deal_state(stage, value, probability, expected_close_date, assigned_to_id):
+    """The parts of a deal the rollups depend on, as a plain dict"""
+    # A saved instance keeps the values as assigned, e.g. a date string
+    value = Deal._meta.get_field("value").to_python(value)
+    probability = Deal._meta.get_field("probability").to_python(probability)
+    expected_close_date = Deal._meta.get_field("expected_close_date").to_python(
+        expected_close_date
+    )
+    return {
+        "stage": stage,
+        "value": value,
+        "weighted_value": value * probability / 100,
+        "month": expected_close_date.replace(day=1),
+        "assigned_to_id": assigned_to_id,
+    }
+
+
+def state_of(deal):
+    return deal_state(*(getattr(deal, field) for field in STATE_FIELDS))
+
+
+def stored_states(**filters):
+    """Current database state of the deals matching ``filters``"""
+    return [
+        deal_state(*row)
+        for row in Deal.objects.filter(**filters).order_by().values_list(*STATE_FIELDS)
+    ]
+
+
+def apply_changes(changes):
+    """Apply ``(old_state, new_state)`` pairs to the rollup tables.
+
+    Either side may be None for a created or deleted deal. Deltas are summed
+    per rollup row first, so a batch of changes touches each row once.
+    """
+    stage_deltas = defaultdict(lambda: [0, Decimal(0), Decimal(0)])
+    outcome_deltas = defaultdict(lambda: [0, Decimal(0)])
+
+    for old, new in changes:
+        for state, sign in ((old, -1), (new, 1)):
+            if state is None:
+                continue
+
+            delta = stage_deltas[state["stage"]]
+            delta[0] += sign
+            delta[1] += sign * state["value"]
+            delta[2] += sign * state["weighted_value"]
+
+            if state["stage"] in CLOSED_OUTCOMES:
+                key = (state["month"], state["stage"], state["assigned_to_id"])
+                delta = outcome_deltas[key]
+                delta[0] += sign
+                delta[1] += sign * state["value"]
+
+    with transaction.atomic():
+        for stage, (count, value, weighted) in stage_deltas.items():
+            if not count and not value and not weighted:
+                continue
+            rollup, _ = StageRollup.objects.get_or_create(stage=stage)
+            StageRollup.objects.filter(pk=rollup.pk).update(
+                deal_count=F("deal_count") + count,
+                total_value=F("total_value") + value,
+                weighted_value=F("weighted_value") + weighted,
+            )
+
+        for (month, outcome, assigned_to_id), (count, value) in outcome_deltas.items():
+            if not count and not value:
+                continue
+            rollup = OutcomeRollup.objects.filter(
+                month=month, outcome=outcome, assigned_to_id=assigned_to_id
+            ).first() or OutcomeRollup.objects.create(
+                month=month, outcome=outcome, assigned_to_id=assigned_to_id
+            )
+            OutcomeRollup.objects.filter(pk=rollup.pk).update(
+                deal_count=F("deal_count") + count,
+                total_value=F("total_value") + value,
+            )
+
+
+@transaction.atomic
+def rebuild():
+    """Recompute every rollup row from the Deal table with grouped queries"""
+    StageRollup.objects.all().delete()
+    StageRollup.objects.bulk_create(
+        StageRollup(**row)
+        for row in Deal.objects.order_by()
+        .values("stage")
+        .annotate(
+            deal_count=Count("id"),
+            total_value=Sum("value"),
+            weighted_value=Sum(WEIGHTED_VALUE),
+        )
+    )
+
+    OutcomeRollup.objects.all().delete()
+    OutcomeRollup.objects.bulk_create(
+        OutcomeRollup(
+            month=row["month"],
+            outcome=row["stage"],
+            assigned_to_id=row["assigned_to"],
+            deal_count=row["deal_count"],
+            total_value=row["total_value"],
+        )
+        for row in Deal.objects.filter(stage__in=CLOSED_OUTCOMES)
+        .order_by()
+        .annotate(month=TruncMonth("expected_close_date"))
+        .values("month", "stage", "assigned_to")
+        .annotate(deal_count=Count("id"), total_value=Sum("value"))
+    )
@@ -0,0 +1,41 @@
+# analytics/signals.py
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from customers.models import Customer, Deal
+from customers.signals import deals_bulk_updated
+from customers.snapshots import cascades_from_customer, stored_values
+from . import rollups
+
+
+@receiver(post_save, sender=Deal)
+def update_rollups_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        old = stored_values(instance)
+        if old is not None:
+            old = rollups.deal_state(*(old[field] for field in rollups.STATE_FIELDS))
+        rollups.apply_changes([(old, rollups.state_of(instance))])
+
+
+@receiver(post_delete, sender=Deal)
+def update_rollups_on_delete(sender, instance, origin=None, **kwargs):
+    # Deals deleted with their customer are taken off in one batch
+    if not cascades_from_customer(origin):
+        rollups.apply_changes([(rollups.state_of(instance), None)])
+
+
+@receiver(pre_delete, sender=Customer)
+def update_rollups_on_customer_delete(sender, instance, **kwargs):
+    rollups.apply_changes(
+        [(state, None) for state in rollups.stored_states(customer=instance)]
+    )
+
+
+@receiver(deals_bulk_updated, sender=Deal)
+def update_rollups_on_bulk_update(sender, deals, previous, **kwargs):
+    rollups.apply_changes(
+        [
+            (rollups.state_of(previous[deal.pk]), rollups.state_of(deal))
+            for deal in deals
+        ]
+    )
@@ -0,0 +1,173 @@
+# analytics/tests.py
+
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from analytics.forecasting import forecast
+from analytics.models import OutcomeRollup, StageRollup
+from analytics.rollups import rebuild
+from customers.models import Customer, Deal
+
+
+class ForecastViewTests(TestCase):
+    def setUp(self):
+        self.client.force_login(
+            User.objects.create_superuser("admin", "admin@example.com", "x")
+        )
+
+    def test_invalid_parameters(self):
+        for query in [
+            "simulations=0",
+            "simulations=-5",
+            "simulations=100001",
+            "simulations=abc",
+            "blend=nan",
+            "blend=inf",
+        ]:
+            with self.subTest(query=query):
+                response = self.client.get(f"{reverse('analytics:forecast')}?{query}")
+                self.assertEqual(response.status_code, 400)
+
+    def test_forecast(self):
+        response = self.client.get(
+            f"{reverse('analytics:forecast')}?simulations=1&blend=2"
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class ForecastTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.rep = User.objects.create_user("rep")
+        customer = Customer.objects.create(
+            first_name="Ada", last_name="Lovelace", email="ada@example.com"
+        )
+        for value, probability, stage, close, assigned_to in [
+            (1000, 100, "prospecting", date(2030, 1, 15), cls.rep),
+            (500, 0, "proposal", date(2030, 1, 20), None),
+            (200, 50, "negotiation", date(2030, 2, 1), cls.rep),
+            (300, 100, "closed_won", date(2029, 12, 1), cls.rep),
+            (100, 0, "closed_lost", date(2029, 12, 10), cls.rep),
+            (400, 100, "closed_won", date(2029, 11, 5), None),
+        ]:
+            Deal.objects.create(
+                customer=customer,
+                title=stage,
+                value=Decimal(value),
+                probability=probability,
+                stage=stage,
+                expected_close_date=close,
+                assigned_to=assigned_to,
+            )
+
+    def test_expected_revenue_and_win_rates(self):
+        result = forecast(simulations=1000, seed=1)
+        self.assertEqual(result["deals"], 6)
+        self.assertEqual(
+            result["expected_by_month"],
+            [
+                {"month": date(2030, 1, 1), "expected": 1000.0},
+                {"month": date(2030, 2, 1), "expected": 100.0},
+            ],
+        )
+        rates = result["win_rates"]
+        self.assertAlmostEqual(rates["overall"], 2 / 3)
+        self.assertEqual(rates["by_assignee"], {self.rep.pk: 0.5, None: 1.0})
+        self.assertEqual(
+            rates["by_stage"]["negotiation"], {"deals": 1, "mean_probability": 0.5}
+        )
+
+    def test_simulation(self):
+        january, february = forecast(simulations=1000, seed=1)["simulation"]
+        # Certain and hopeless deals make January exact
+        self.assertEqual(january["month"], date(2030, 1, 1))
+        self.assertEqual(
+            (january["mean"], january["p10"], january["p90"]), (1000, 1000, 1000)
+        )
+        # A coin flip on 200
+        self.assertEqual(february["month"], date(2030, 2, 1))
+        self.assertEqual((february["p10"], february["p90"]), (0, 200))
+        self.assertAlmostEqual(february["mean"], 100, delta=10)
+        self.assertEqual(
+            forecast(simulations=1000, seed=1)["simulation"], [january, february]
+        )
+
+    def test_normal_approximation(self):
+        with patch("analytics.forecasting.EXACT_SIMULATION_LIMIT", 0):
+            january, february = forecast(simulations=5000, seed=1)["simulation"]
+        self.assertEqual(january["mean"], 1000)
+        self.assertAlmostEqual(february["mean"], 100, delta=10)
+
+    def test_blend(self):
+        # Full blend replaces stated probabilities with historical win rates
+        january, february = forecast(simulations=2000, blend=1, seed=1)["simulation"]
+        # The rep's 1000 at 0.5 plus the unassigned 500 at 1.0
+        self.assertAlmostEqual(january["mean"], 1000, delta=50)
+        self.assertAlmostEqual(february["mean"], 100, delta=10)
+
+    def test_rollups(self):
+        stages = {
+            rollup.stage: (rollup.deal_count, rollup.total_value, rollup.weighted_value)
+            for rollup in StageRollup.objects.all()
+        }
+        self.assertEqual(stages["prospecting"], (1, 1000, 1000))
+        self.assertEqual(stages["proposal"], (1, 500, 0))
+        self.assertEqual(stages["negotiation"], (1, 200, 100))
+        self.assertEqual(stages["closed_won"], (2, 700, 700))
+        outcomes = {
+            (rollup.month, rollup.outcome, rollup.assigned_to_id): (
+                rollup.deal_count,
+                rollup.total_value,
+            )
+            for rollup in OutcomeRollup.objects.exclude(deal_count=0)
+        }
+        self.assertEqual(
+            outcomes,
+            {
+                (date(2029, 12, 1), "closed_won", self.rep.pk): (1, 300),
+                (date(2029, 12, 1), "closed_lost", self.rep.pk): (1, 100),
+                (date(2029, 11, 1), "closed_won", None): (1, 400),
+            },
+        )
+
+        Deal.objects.filter(stage="negotiation").get().delete()
+        deal = Deal.objects.get(stage="proposal")
+        deal.stage = "closed_won"
+        deal.save()
+        incremental = self.rollup_rows()
+        rebuild()
+        self.assertEqual(self.rollup_rows(), incremental)
+
+    def rollup_rows(self):
+        return (
+            set(
+                StageRollup.objects.exclude(deal_count=0).values_list(
+                    "stage", "deal_count", "total_value", "weighted_value"
+                )
+            ),
+            set(
+                OutcomeRollup.objects.exclude(deal_count=0).values_list(
+                    "month", "outcome", "assigned_to", "deal_count", "total_value"
+                )
+            ),
+        )
+
+    def test_rollups_accept_unconverted_values(self):
+        Deal.objects.create(
+            customer=Customer.objects.get(),
+            title="Strings",
+            value="250.50",
+            probability="40",
+            stage="closed_won",
+            expected_close_date="2030-01-05",
+            assigned_to=self.rep,
+        )
+        rollup = OutcomeRollup.objects.get(
+            month=date(2030, 1, 1), outcome="closed_won", assigned_to=self.rep
+        )
+        self.assertEqual(
+            (rollup.deal_count, rollup.total_value), (1, Decimal("250.50"))
+        )
@@ -6,6 +6,6 @@ from . import views
 app_name = "analytics"
 
 urlpatterns = [
-    # Future analytics endpoints
-    # path('dashboard/', views.dashboard_view, name='dashboard'),
+    path("dashboard/", views.dashboard_view, name="dashboard"),
+    path("forecast/", views.forecast_view, name="forecast"),
 ]
@@ -1,8 +1,82 @@
 # analytics/views.py
 
+import math
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Q, Sum
+from django.http import JsonResponse
 from django.shortcuts import render
+from customers.models import Deal
+from .forecasting import forecast
+from .models import OutcomeRollup, StageRollup
 
+MAX_SIMULATIONS = 100_000
 
-# Future analytics views will go here
+OPEN_STAGES = [
+    stage for stage, _ in Deal.DEAL_STAGES if stage not in ("closed_won", "closed_lost")
+]
+
+OUTCOME_TOTALS = {
+    "won_count": Sum("deal_count", filter=Q(outcome="closed_won")),
+    "won_value": Sum("total_value", filter=Q(outcome="closed_won")),
+    "lost_count": Sum("deal_count", filter=Q(outcome="closed_lost")),
+    "lost_value": Sum("total_value", filter=Q(outcome="closed_lost")),
+}
+
+
+@staff_member_required
 def dashboard_view(request):
-    return render(request, "analytics/dashboard.html")
+    """Sales pipeline dashboard, read from the precomputed rollup tables"""
+    rollups = {rollup.stage: rollup for rollup in StageRollup.objects.all()}
+    stages = [
+        {
+            "label": label,
+            "deal_count": rollups[stage].deal_count if stage in rollups else 0,
+            "total_value": rollups[stage].total_value if stage in rollups else 0,
+            "weighted_value": rollups[stage].weighted_value if stage in rollups else 0,
+        }
+        for stage, label in Deal.DEAL_STAGES
+    ]
+    forecast = sum(
+        rollups[stage].weighted_value for stage in OPEN_STAGES if stage in rollups
+    )
+
+    by_month = (
+        OutcomeRollup.objects.order_by("-month")
+        .values("month")
+        .annotate(**OUTCOME_TOTALS)[:12]
+    )
+    by_assignee = (
+        OutcomeRollup.objects.order_by()
+        .values("assigned_to__username")
+        .annotate(**OUTCOME_TOTALS)
+        .order_by("-won_value")
+    )
+
+    return render(
+        request,
+        "analytics/dashboard.html",
+        {
+            "page_title": "Sales Pipeline - FlowTada Analytics",
+            "stages": stages,
+            "weighted_forecast": forecast,
+            "by_month": by_month,
+            "by_assignee": by_assignee,
+        },
+    )
+
+
+@staff_member_required
+def forecast_view(request):
+    """Revenue forecast with Monte Carlo confidence bands, as JSON"""
+    try:
+        simulations = int(request.GET.get("simulations", 10000))
+        blend = float(request.GET.get("blend", 0))
+        if not 1 <= simulations <= MAX_SIMULATIONS or not math.isfinite(blend):
+            raise ValueError
+    except ValueError:
+        return JsonResponse(
+            {"status": "error", "message": "Invalid forecast parameters."}, status=400
+        )
+    blend = min(max(blend, 0.0), 1.0)
+
+    return JsonResponse(forecast(simulations=simulations, blend=blend))
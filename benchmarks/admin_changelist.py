@@ -0,0 +1,113 @@
+# benchmarks/admin_changelist.py
+
+"""Customer changelist response times on a large table.
+
+Seeds ``--customers`` rows, runs ANALYZE so the estimated count is
+available, then requests each changelist URL ``--repeat`` times as a
+superuser. The exact COUNT(*) and a plain OFFSET page at the same depth
+are timed alongside for comparison.
+
+    python benchmarks/admin_changelist.py --customers 1000000
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import timedelta
+
+from common import setup_django, summarize
+
+STATUSES = ["new", "contacted", "qualified", "proposal", "won", "lost"]
+SOURCES = ["website", "referral", "ads", "event", ""]
+
+
+def seed(count, batch_size=20000):
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.utils import timezone
+    from customers.models import Company, Customer
+
+    users = User.objects.bulk_create(
+        [User(username=f"rep{i}", is_staff=True) for i in range(500)]
+    )
+    companies = Company.objects.bulk_create(
+        [
+            Company(name=f"Company {i}", normalized_name=f"company {i}")
+            for i in range(2000)
+        ]
+    )
+    now = timezone.now()
+    for start in range(0, count, batch_size):
+        Customer.objects.bulk_create(
+            [
+                Customer(
+                    first_name=f"First{i}",
+                    last_name=f"Last{i}",
+                    email=f"customer{i}@example.com",
+                    company=random.choice(companies) if i % 3 else None,
+                    assigned_to=random.choice(users) if i % 2 else None,
+                    lead_status=random.choice(STATUSES),
+                    lead_source=random.choice(SOURCES),
+                    created_at=now - timedelta(seconds=i),
+                )
+                for i in range(start, min(count, start + batch_size))
+            ]
+        )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    return users
+
+
+def timed(repeat, func):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--customers", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.test import Client
+    from customers.models import Customer
+
+    users = seed(args.customers)
+    client = Client()
+    client.force_login(User.objects.create_superuser("admin", "a@example.com", "x"))
+
+    # deep_next_page is requested after deep_page, as if following "next"
+    deep = args.customers // 100 // 2
+    urls = {
+        "first_page": "/admin/customers/customer/",
+        "next_page": "/admin/customers/customer/?p=2",
+        "deep_page": f"/admin/customers/customer/?p={deep}",
+        "deep_next_page": f"/admin/customers/customer/?p={deep + 1}",
+        "status_filter": "/admin/customers/customer/?lead_status__exact=qualified",
+        "source_filter": "/admin/customers/customer/?lead_source=referral",
+        "assignee_filter": (
+            f"/admin/customers/customer/?assigned_to__id__exact={users[0].pk}"
+        ),
+    }
+    results = {}
+    for name, url in urls.items():
+        assert client.get(url).status_code == 200, url
+        results[name] = timed(args.repeat, lambda: client.get(url))
+
+    queryset = Customer.objects.order_by("-created_at", "-pk")
+    results["exact_count"] = timed(args.repeat, queryset.count)
+    results["offset_deep_page"] = timed(
+        args.repeat, lambda: list(queryset[deep * 100 : deep * 100 + 100])
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
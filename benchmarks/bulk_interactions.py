@@ -0,0 +1,69 @@
+# benchmarks/bulk_interactions.py
+
+"""Throughput of the bulk interaction endpoint.
+
+Posts ``--rows`` interactions to ``/customers/bulk/interactions/`` as one
+JSON array and as NDJSON, spread over ``--customers`` customers, and reports
+rows/sec for each.
+
+    python benchmarks/bulk_interactions.py --rows 10000
+"""
+
+import argparse
+import json
+import time
+
+from common import setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--customers", type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.test import Client
+    from customers.models import Customer, Interaction
+
+    admin = User.objects.create_superuser("bench", "bench@example.com", "bench")
+    Customer.objects.bulk_create(
+        Customer(first_name="Lead", last_name=str(i), email=f"lead{i}@example.com")
+        for i in range(args.customers)
+    )
+    rows = [
+        {
+            "customer_email": f"lead{i % args.customers}@example.com",
+            "username": "bench",
+            "interaction_type": "call",
+            "subject": f"Call {i}",
+            "notes": "Logged by the telephony integration.",
+        }
+        for i in range(args.rows)
+    ]
+
+    client = Client()
+    client.force_login(admin)
+    results = {}
+    for name, body, content_type in (
+        ("json", json.dumps(rows), "application/json"),
+        ("ndjson", "\n".join(json.dumps(row) for row in rows), "application/x-ndjson"),
+    ):
+        start = time.perf_counter()
+        response = client.post(
+            "/customers/bulk/interactions/", body, content_type=content_type
+        )
+        elapsed = time.perf_counter() - start
+        assert response.json()["written"] == args.rows, response.content[:500]
+        results[name] = {
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(args.rows / elapsed),
+        }
+
+    results["total_interactions"] = Interaction.objects.count()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# benchmarks/common.py
+
+"""Shared setup for the standalone benchmark scripts.
+
+Each script is run directly (``python benchmarks/<name>.py``) and gets its
+own throwaway database, created the same way Django's test runner does.
+"""
+
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def setup_django(db_name=None):
+    """Configure Django and create a fresh database for the benchmark.
+
+    Pass a file path as ``db_name`` when the benchmark uses several threads,
+    since SQLite in-memory databases are private to one connection.
+    """
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flowtada.settings")
+    os.environ.setdefault("SECRET_KEY", "benchmark-only-secret-key")
+
+    import django
+
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    if db_name:
+        connection.settings_dict["TEST"]["NAME"] = db_name
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Latency summary (in milliseconds) for a list of durations in seconds"""
+    return {
+        "count": len(samples),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 2),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2),
+    }
+
+
+def stats(samples):
+    """pytest-benchmark style statistics (in seconds) for a list of durations"""
+    q1, median, q3 = (
+        statistics.quantiles(samples, n=4) if len(samples) > 1 else [samples[0]] * 3
+    )
+    mean = statistics.fmean(samples)
+    return {
+        "rounds": len(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "mean": mean,
+        "stddev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "median": median,
+        "q1": q1,
+        "q3": q3,
+        "iqr": q3 - q1,
+        "ops": 1 / mean if mean else 0.0,
+    }
+
+
+def git(*args):
+    try:
+        return subprocess.run(
+            ["git", *args], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_info():
+    """Commit and machine details stored with results, so runs can be compared"""
+    import django
+    from django.db import connection
+
+    return {
+        "datetime": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "commit_info": {
+            "id": git("rev-parse", "HEAD"),
+            "branch": git("rev-parse", "--abbrev-ref", "HEAD"),
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        },
+        "machine_info": {
+            "node": platform.node(),
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "cpu_count": os.cpu_count(),
+            "python_version": platform.python_version(),
+            "django_version": django.get_version(),
+            "database": connection.vendor,
+        },
+    }
+
+
+def write_results(benchmarks, output=None, **extra):
+    """Print the results as JSON and also save them to ``output`` if given.
+
+    The layout follows pytest-benchmark's ``--benchmark-json`` files: run
+    details plus a ``benchmarks`` list of ``{"name", "stats"}`` entries,
+    which ``compare.py`` diffs between two runs.
+    """
+    results = json.dumps(
+        {**run_info(), **extra, "benchmarks": benchmarks}, indent=2, default=str
+    )
+    if output:
+        Path(output).write_text(results + "\n")
+    print(results)
@@ -0,0 +1,118 @@
+# benchmarks/compare.py
+
+"""Compare two benchmark result files and flag regressions.
+
+Reads JSON saved with ``--output`` by ``hot_views.py`` or
+``load_test.py`` (or pytest-benchmark's ``--benchmark-json``), matches the
+benchmarks by name and prints the change in each metric. A timing or
+throughput metric that got worse by more than ``--threshold`` percent, or
+a view that runs more queries than before, is a regression, and the exit
+status is then 1, so the script can gate a CI job.
+
+Compare runs made with the same parameters on the same machine; the
+script warns when they differ.
+
+    python benchmarks/compare.py before.json after.json --threshold 10
+"""
+
+import argparse
+import json
+import sys
+
+# Metric -> True when higher is better
+METRICS = {
+    "median": False,
+    "mean": False,
+    "min": False,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "ops": True,
+    "requests_per_second": True,
+}
+
+DEFAULT_METRICS = ["median", "p50_ms", "p95_ms", "requests_per_second"]
+
+
+def load(path):
+    with open(path) as f:
+        results = json.load(f)
+    return results, {bench["name"]: bench["stats"] for bench in results["benchmarks"]}
+
+
+def error_rate(stats):
+    """Share of load-test responses that were not 2xx or 3xx"""
+    statuses = stats.get("statuses")
+    if not statuses:
+        return None
+    failed = sum(n for code, n in statuses.items() if code[:1] not in ("2", "3"))
+    return failed / sum(statuses.values())
+
+
+def compare(old, new, metrics, threshold):
+    """Yield ``(benchmark, metric, old, new, change %, regressed)`` rows"""
+    for name in old.keys() & new.keys():
+        before, after = old[name], new[name]
+        for metric in metrics:
+            if metric not in before or metric not in after:
+                continue
+            a, b = before[metric], after[metric]
+            change = (b / a - 1) * 100 if a else 0.0
+            worse = -change if METRICS[metric] else change
+            yield name, metric, a, b, change, worse > threshold
+
+        if "queries" in before and "queries" in after:
+            a, b = before["queries"], after["queries"]
+            yield name, "queries", a, b, (b / a - 1) * 100 if a else 0.0, b > a
+
+        a, b = error_rate(before), error_rate(after)
+        if a is not None and b is not None:
+            yield name, "error_rate", a, b, (b - a) * 100, b > a
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="Percent change in a timing that counts as a regression",
+    )
+    parser.add_argument(
+        "--metric",
+        action="append",
+        choices=sorted(METRICS),
+        help=f"Metrics to compare (default: {', '.join(DEFAULT_METRICS)})",
+    )
+    args = parser.parse_args()
+
+    baseline, old = load(args.baseline)
+    current, new = load(args.current)
+    for key in ("params", "machine_info"):
+        if baseline.get(key) != current.get(key):
+            print(f"warning: the runs' {key} differ", file=sys.stderr)
+    for name in sorted(old.keys() ^ new.keys()):
+        print(f"warning: {name} is only in one of the runs", file=sys.stderr)
+
+    rows = sorted(compare(old, new, args.metric or DEFAULT_METRICS, args.threshold))
+    regressions = [row for row in rows if row[-1]]
+    print(f"{'benchmark':<32} {'metric':<20} {'baseline':>12} {'current':>12} change")
+    for name, metric, a, b, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<32} {metric:<20} {a:>12.4g} {b:>12.4g} {change:+6.1f}%{flag}")
+
+    commits = [
+        (results.get("commit_info") or {}).get("id") or "?"
+        for results in (baseline, current)
+    ]
+    print(
+        f"\n{len(regressions)} regression(s) from {commits[0][:12]} "
+        f"to {commits[1][:12]}"
+    )
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# benchmarks/forecast.py
+
+"""Vectorized forecast engine vs. a naive per-object implementation.
+
+Seeds ``--deals`` deals, times ``analytics.forecasting.forecast`` on all of
+them, then times a straightforward loop over Deal instances on the first
+``--naive-deals`` deals (the naive version is too slow to run at full size)
+and extrapolates its cost linearly.
+
+    python benchmarks/forecast.py --deals 1000000 --simulations 10000
+"""
+
+import argparse
+import datetime
+import json
+import random
+import time
+from collections import defaultdict
+
+from common import setup_django
+
+
+def seed(count):
+    from django.contrib.auth.models import User
+    from customers.models import Customer, Deal
+
+    users = [User.objects.create_user(f"rep{i}") for i in range(20)]
+    customer = Customer.objects.create(
+        first_name="Bench", last_name="Mark", email="bench@example.com"
+    )
+    stages = [stage for stage, _ in Deal.DEAL_STAGES]
+    today = datetime.date.today()
+    rng = random.Random(42)
+    batch = []
+    for i in range(count):
+        batch.append(
+            Deal(
+                customer=customer,
+                title=f"Deal {i}",
+                value=rng.randint(500, 50000),
+                stage=rng.choice(stages),
+                probability=rng.randint(5, 95),
+                expected_close_date=today
+                + datetime.timedelta(days=rng.randint(0, 365)),
+                assigned_to=rng.choice(users),
+            )
+        )
+        if len(batch) == 10000:
+            Deal.objects.bulk_create(batch)
+            batch = []
+    Deal.objects.bulk_create(batch)
+
+
+def naive_forecast(deals, simulations):
+    """Per-object reference implementation"""
+    expected = defaultdict(float)
+    open_deals = []
+    for deal in deals:
+        if deal.stage in ("closed_won", "closed_lost"):
+            continue
+        month = deal.expected_close_date.replace(day=1)
+        p = deal.probability / 100
+        expected[month] += float(deal.value) * p
+        open_deals.append((month, float(deal.value), p))
+
+    totals = defaultdict(list)
+    for _ in range(simulations):
+        run = defaultdict(float)
+        for month, value, p in open_deals:
+            if random.random() < p:
+                run[month] += value
+        for month in expected:
+            totals[month].append(run[month])
+    return expected, totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--deals", type=int, default=1000000)
+    parser.add_argument("--simulations", type=int, default=10000)
+    parser.add_argument("--naive-deals", type=int, default=2000)
+    parser.add_argument("--naive-simulations", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from analytics import forecasting
+    from customers.models import Deal
+
+    start = time.perf_counter()
+    seed(args.deals)
+    seed_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pipeline = forecasting.load_pipeline()
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    forecasting.expected_revenue_by_month(pipeline)
+    forecasting.win_rates(pipeline)
+    forecasting.simulate(pipeline, args.simulations, seed=1)
+    compute_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    naive_forecast(
+        Deal.objects.order_by("pk")[: args.naive_deals], args.naive_simulations
+    )
+    naive_seconds = time.perf_counter() - start
+    scale = (args.deals / args.naive_deals) * (
+        args.simulations / args.naive_simulations
+    )
+
+    print(
+        json.dumps(
+            {
+                "deals": args.deals,
+                "simulations": args.simulations,
+                "seed_seconds": round(seed_seconds, 2),
+                "vectorized": {
+                    "load_seconds": round(load_seconds, 2),
+                    "compute_seconds": round(compute_seconds, 2),
+                },
+                "naive": {
+                    "deals": args.naive_deals,
+                    "simulations": args.naive_simulations,
+                    "seconds": round(naive_seconds, 2),
+                    "extrapolated_seconds": round(naive_seconds * scale, 1),
+                },
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
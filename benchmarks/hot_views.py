@@ -0,0 +1,136 @@
+# benchmarks/hot_views.py
+
+"""Micro-benchmarks for the hot views on a seeded database.
+
+Seeds ``--customers`` customers with ``manage.py seed_benchmark``, then
+calls each view through the test client: the staff pipeline dashboard,
+the portal dashboard and deals list (as a seeded customer with many deals),
+the website contact form (a new lead per call) and the pricing page. Every
+view gets ``--warmup`` untimed calls and ``--rounds`` timed ones; the
+statistics are in seconds, as pytest-benchmark reports them, along with the
+queries each call ran.
+
+Save runs with ``--output`` and diff two of them with ``compare.py``:
+
+    python benchmarks/hot_views.py --customers 100000 --output before.json
+"""
+
+import argparse
+import itertools
+import json
+import time
+
+from common import setup_django, stats, write_results
+
+
+def contact_payload(n):
+    """Body of the ``n``th website contact form; every one is a new lead"""
+    return json.dumps(
+        {
+            "name": f"Bench Lead{n}",
+            "email": f"bench.lead{n}@example.com",
+            "company": f"Bench Company {n % 50}",
+            "message": "Please get in touch.",
+        }
+    )
+
+
+def clients():
+    """Test clients for a staff member and the busiest portal customer"""
+    from django.contrib.auth.models import User
+    from django.db.models import Count
+    from django.test import Client
+    from customers.models import Customer
+
+    staff = Client()
+    staff.force_login(User.objects.create_superuser("bench", "bench@example.com", "x"))
+
+    portal_emails = User.objects.filter(is_staff=False).values("email")
+    busiest = (
+        Customer.objects.filter(email__in=portal_emails)
+        .annotate(deal_total=Count("deals"))
+        .order_by("-deal_total")
+        .first()
+    )
+    portal = Client()
+    portal.force_login(User.objects.get(username=busiest.email))
+    return staff, portal
+
+
+def cases(staff, portal):
+    """``{name: call}``; each call makes one request and returns the response"""
+    from django.test import Client
+
+    anonymous = Client()
+    leads = itertools.count()
+
+    def contact():
+        return anonymous.post(
+            "/customers/contact/",
+            contact_payload(next(leads)),
+            content_type="application/json",
+        )
+
+    return {
+        "analytics.dashboard_view": lambda: staff.get("/analytics/dashboard/"),
+        "portal.dashboard_view": lambda: portal.get("/portal/dashboard/"),
+        "portal.deals_view": lambda: portal.get("/portal/deals/"),
+        "customers.contact_submission": contact,
+        "core.pricing_view": lambda: anonymous.get("/pricing/"),
+    }
+
+
+def measure(call, warmup, rounds):
+    from django.db import connection
+    from core.instrumentation import QueryRecorder
+
+    for _ in range(warmup):
+        response = call()
+        assert response.status_code < 300, response.status_code
+    queries = QueryRecorder()
+    with connection.execute_wrapper(queries):
+        call()
+
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return {**stats(samples), "queries": queries.count}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--customers", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--only", action="append", help="Benchmark only these views (repeatable)"
+    )
+    parser.add_argument("--output", help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    setup_django()
+    from io import StringIO
+    from django.core.management import call_command
+
+    call_command(
+        "seed_benchmark", customers=args.customers, seed=args.seed, stdout=StringIO()
+    )
+    benchmarks = []
+    for name, call in cases(*clients()).items():
+        if args.only and name not in args.only:
+            continue
+        benchmarks.append(
+            {"name": name, "stats": measure(call, args.warmup, args.rounds)}
+        )
+    write_results(
+        benchmarks,
+        args.output,
+        params={"customers": args.customers, "seed": args.seed},
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/instrumentation_overhead.py
+
+"""Cost of the request instrumentation middleware at several sample rates.
+
+Requests the customers API list (one page of 50 customers) and the about
+page as a staff user with ``INSTRUMENTATION_SAMPLE_RATE`` set to each of
+``--rates``. Requests at the different rates are interleaved one by one,
+so drift on the machine affects every rate alike. Reports the median
+latency per rate and its overhead against the first rate.
+
+    python benchmarks/instrumentation_overhead.py --requests 1000
+"""
+
+import argparse
+import json
+import statistics
+import time
+from collections import defaultdict
+
+from common import setup_django
+
+URLS = ["/customers/customers/", "/about/"]
+
+
+def seed():
+    from django.contrib.auth.models import User
+    from customers.models import Customer, Interaction
+
+    staff = User.objects.create_superuser("staff", "staff@example.com", "x")
+    customers = Customer.objects.bulk_create(
+        [
+            Customer(
+                first_name=f"First{i}",
+                last_name=f"Last{i}",
+                email=f"customer{i}@example.com",
+                assigned_to=staff,
+            )
+            for i in range(200)
+        ]
+    )
+    Interaction.objects.bulk_create(
+        [
+            Interaction(
+                customer=customer, interaction_type="call", subject="Call", user=staff
+            )
+            for customer in customers
+            for _ in range(5)
+        ]
+    )
+    return staff
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--rates", default="0,0.1,1")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.test import Client
+
+    client = Client()
+    client.force_login(seed())
+    rates = [float(rate) for rate in args.rates.split(",")]
+
+    samples = defaultdict(list)
+    for url in URLS:
+        assert client.get(url).status_code == 200, url
+        for _ in range(args.requests):
+            for rate in rates:
+                settings.INSTRUMENTATION_SAMPLE_RATE = rate
+                start = time.perf_counter()
+                client.get(url)
+                samples[(url, rate)].append(time.perf_counter() - start)
+
+    results = {}
+    for url in URLS:
+        baseline = statistics.median(samples[(url, rates[0])])
+        results[url] = {}
+        for rate in rates:
+            median = statistics.median(samples[(url, rate)])
+            results[url][str(rate)] = {
+                "median_ms": round(median * 1000, 3),
+                "overhead_pct": round((median / baseline - 1) * 100, 2),
+            }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/lead_ingest_burst.py
+
+"""Burst load test for the public lead forms.
+
+Fires a burst of concurrent trial signups at ``/customers/trial/`` with
+``LEAD_INGEST_MODE`` set to ``sync`` and then ``db``, and reports request
+latency percentiles for each. In ``db`` mode it also reports how long the
+worker takes to drain the queue.
+
+    python benchmarks/lead_ingest_burst.py --requests 200 --concurrency 16
+"""
+
+import argparse
+import json
+import logging
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from common import setup_django, summarize
+
+
+def fire_burst(mode, count, concurrency):
+    from django.conf import settings
+    from django.test import Client
+
+    settings.LEAD_INGEST_MODE = mode
+
+    def signup(i):
+        payload = {
+            "email": f"{mode}-lead-{i}@example.com",
+            "first_name": "Lead",
+            "last_name": str(i),
+            "company": f"Company {i % 50}",
+        }
+        start = time.perf_counter()
+        response = Client().post(
+            "/customers/trial/", json.dumps(payload), content_type="application/json"
+        )
+        return time.perf_counter() - start, response.status_code in (200, 202)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(signup, range(count)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(str(Path(tmp) / "bench.sqlite3"))
+        logging.disable(logging.ERROR)
+
+        from django.db import connection
+        from customers.ingest import process_pending
+
+        # The test database is a file, so worker threads can share it
+        connection.close()
+
+        results = {}
+        for mode in ("sync", "db"):
+            outcomes = fire_burst(mode, args.requests, args.concurrency)
+            results[mode] = summarize([elapsed for elapsed, _ in outcomes])
+            # SQLite rejects some overlapping write transactions outright
+            results[mode]["errors"] = sum(1 for _, ok in outcomes if not ok)
+
+        start = time.perf_counter()
+        while process_pending():
+            pass
+        results["db"]["drain_seconds"] = round(time.perf_counter() - start, 2)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# benchmarks/load_test.py
+
+"""HTTP load test of the public, portal and staff endpoints under uvicorn.
+
+Seeds a database file with ``manage.py seed_benchmark --customers N``,
+starts uvicorn on ``flowtada.asgi`` against it and drives each scenario
+with ``--concurrency`` keep-alive connections from ``loadgen.py``:
+
+* ``public``: the marketing pages, as an anonymous visitor;
+* ``contact``: website contact form posts, each one a new lead;
+* ``portal``: dashboard, deals and interactions of a seeded customer;
+* ``staff``: the pipeline dashboard and the customers API list.
+
+Non-2xx responses are counted in ``statuses``; on SQLite, concurrent
+contact posts contend for the write lock and some fail with "database is
+locked". Results use the same layout as ``hot_views.py``, so
+``compare.py`` can diff two runs. Requires uvicorn (``pip install uvicorn``).
+
+    python benchmarks/load_test.py --customers 100000 --output before.json
+"""
+
+import argparse
+import asyncio
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from common import setup_django, write_results
+from hot_views import contact_payload
+from loadgen import run_load
+from portal_async import start_server
+
+SCENARIOS = {
+    "public": ["/", "/about/", "/pricing/", "/th/pricing/"],
+    "portal": ["/portal/dashboard/", "/portal/deals/", "/portal/interactions/"],
+    "staff": ["/analytics/dashboard/", "/customers/customers/"],
+}
+
+
+def session_cookie(username):
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.test import Client
+
+    client = Client()
+    client.force_login(User.objects.get(username=username))
+    return f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+
+def seed(customers, seed):
+    """Seed the database; returns the cookie for each scenario"""
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+
+    call_command("seed_benchmark", customers=customers, seed=seed, stdout=StringIO())
+    User.objects.create_superuser("bench", "bench@example.com", "x")
+    portal_user = User.objects.filter(is_staff=False).order_by("pk").first()
+    return {
+        "public": None,
+        "contact": None,
+        "portal": session_cookie(portal_user.username),
+        "staff": session_cookie("bench"),
+    }
+
+
+def requests_for(scenario, first, count):
+    if scenario == "contact":
+        # Unique leads, so every post creates a customer as on the live site
+        return [
+            ("POST", "/customers/contact/", contact_payload(n).encode())
+            for n in range(first, first + count)
+        ]
+    return SCENARIOS[scenario]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--customers", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=["public", "contact", "portal", "staff"],
+        help="Run only these scenarios (repeatable)",
+    )
+    parser.add_argument(
+        "--async-views", action="store_true", help="Serve the async portal views"
+    )
+    parser.add_argument("--output", help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = str(Path(tmp) / "load_test.sqlite3")
+        setup_django(database)
+        cookies = seed(args.customers, args.seed)
+
+        benchmarks = []
+        server, port = start_server(database, args.async_views)
+        try:
+            base = f"http://127.0.0.1:{port}/"
+            for scenario, cookie in cookies.items():
+                if args.scenario and scenario not in args.scenario:
+                    continue
+                # Warm up imports, templates and caches
+                warmup = requests_for(scenario, 0, 60)
+                asyncio.run(run_load(base, warmup, 60, 3, cookie))
+                paths = requests_for(scenario, 60, args.requests)
+                result = asyncio.run(
+                    run_load(base, paths, args.requests, args.concurrency, cookie)
+                )
+                benchmarks.append({"name": scenario, "stats": result})
+        finally:
+            server.terminate()
+            server.wait()
+
+        write_results(
+            benchmarks,
+            args.output,
+            params={
+                "customers": args.customers,
+                "seed": args.seed,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "async_views": args.async_views,
+            },
+        )
+
+
+if __name__ == "__main__":
+    main()
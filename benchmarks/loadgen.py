@@ -0,0 +1,138 @@
+# benchmarks/loadgen.py
+
+"""Minimal asyncio HTTP/1.1 load generator.
+
+Opens ``concurrency`` keep-alive connections to one host and has each of
+them request URLs back to back until ``total`` requests have been sent.
+No third-party client is needed, so it measures the server rather than the
+client library.
+
+    python benchmarks/loadgen.py http://127.0.0.1:8000/ --requests 2000 \\
+        --concurrency 50 --cookie "sessionid=..."
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from common import summarize
+
+
+async def read_response(reader):
+    """Read one response; return its status code and whether the server closes"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Server closed the connection")
+    status = int(status_line.split()[1])
+
+    length, chunked, close = 0, False, False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin1").partition(":")
+        name, value = name.strip().lower(), value.strip()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+        elif name == "connection" and value.lower() == "close":
+            close = True
+
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return status, close
+
+
+async def worker(host, port, requests, headers, latencies, statuses):
+    reader = writer = None
+    for request in requests:
+        method, path, body = (
+            request if isinstance(request, tuple) else ("GET", request, b"")
+        )
+        if writer is None:
+            reader, writer = await asyncio.open_connection(host, port)
+        head = f"{method} {path} HTTP/1.1\r\nHost: {host}:{port}\r\n{headers}"
+        if body:
+            head += f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+        start = time.perf_counter()
+        writer.write(head.encode("latin1") + b"\r\n" + body)
+        try:
+            status, close = await read_response(reader)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            status, close = "error", True
+        latencies.append(time.perf_counter() - start)
+        statuses[status] += 1
+        if close:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(base_url, paths, total, concurrency, cookie=None):
+    """Issue ``total`` requests spread round-robin over ``paths``.
+
+    A path is requested with GET; pass a ``(method, path, body)`` tuple
+    instead to send a JSON body.
+
+    Returns requests/sec, a latency summary and a count per status code.
+    """
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+    headers = "Connection: keep-alive\r\n"
+    if cookie:
+        headers += f"Cookie: {cookie}\r\n"
+
+    # Hand each worker its share of the request sequence up front
+    sequence = list(itertools.islice(itertools.cycle(paths), total))
+    shares = [sequence[i::concurrency] for i in range(concurrency)]
+
+    latencies, statuses = [], Counter()
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            worker(host, port, share, headers, latencies, statuses)
+            for share in shares
+            if share
+        )
+    )
+    elapsed = time.perf_counter() - start
+    return {
+        "requests_per_second": round(total / elapsed, 1),
+        "seconds": round(elapsed, 3),
+        "statuses": {str(code): count for code, count in statuses.items()},
+        **summarize(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("url", help="Base URL, with the first path to request")
+    parser.add_argument("--path", action="append", default=[], help="More paths")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--cookie")
+    args = parser.parse_args()
+
+    parts = urlsplit(args.url)
+    first = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    paths = [first] + args.path
+    result = asyncio.run(
+        run_load(args.url, paths, args.requests, args.concurrency, args.cookie)
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/marketing_pages.py
+
+"""Requests/sec for the marketing pages with and without the page cache.
+
+Fetches each marketing URL (English and Thai) ``--requests`` times as an
+anonymous visitor, first with ``PAGE_CACHE_TIMEOUT = 0`` and then with the
+cache on, and reports requests/sec and latency for both runs. Each request
+uses a fresh client, like a first-time visitor without cookies.
+
+    python benchmarks/marketing_pages.py --requests 500
+"""
+
+import argparse
+import json
+import time
+
+from common import setup_django, summarize
+
+URLS = ["/", "/about/", "/pricing/", "/th/", "/th/about/", "/th/pricing/"]
+
+
+def run(requests):
+    from django.test import Client
+
+    results = {}
+    for url in URLS:
+        Client().get(url)  # warm templates (and the cache, when enabled)
+        samples = []
+        start = time.perf_counter()
+        for _ in range(requests):
+            began = time.perf_counter()
+            response = Client().get(url)
+            samples.append(time.perf_counter() - began)
+            assert response.status_code == 200, (url, response.status_code)
+        elapsed = time.perf_counter() - start
+        results[url] = {
+            "requests_per_second": round(requests / elapsed),
+            **summarize(samples),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import override_settings
+    from core.cache import bump_version
+
+    with override_settings(PAGE_CACHE_TIMEOUT=0):
+        uncached = run(args.requests)
+    bump_version()
+    cached = run(args.requests)
+
+    print(
+        json.dumps(
+            {
+                "uncached": uncached,
+                "cached": cached,
+                "speedup": {
+                    url: round(
+                        cached[url]["requests_per_second"]
+                        / uncached[url]["requests_per_second"],
+                        1,
+                    )
+                    for url in URLS
+                },
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
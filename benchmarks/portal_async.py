@@ -0,0 +1,143 @@
+# benchmarks/portal_async.py
+
+"""Concurrent-user throughput of the sync vs. async portal views under ASGI.
+
+Seeds a portal customer with ``--deals`` deals and interactions, then starts
+uvicorn on ``flowtada.asgi`` twice, with ``PORTAL_ASYNC_VIEWS`` off and on.
+Each time it drives the dashboard, deals and interactions pages with
+``--concurrency`` keep-alive connections from ``loadgen.py``.
+
+Requires uvicorn (``pip install uvicorn``).
+
+    python benchmarks/portal_async.py --requests 3000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import ROOT, setup_django
+from loadgen import run_load
+
+PATHS = ["/portal/dashboard/", "/portal/deals/", "/portal/interactions/"]
+
+
+def seed(deals):
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.test import Client
+    from customers.models import Customer, Deal, Interaction
+
+    user = User.objects.create_user("portal", "portal@example.com", "portal")
+    rep = User.objects.create_user("rep", "rep@example.com", "rep", is_staff=True)
+    customer = Customer.objects.create(
+        first_name="Portal", last_name="User", email="portal@example.com"
+    )
+    today = datetime.date.today()
+    Deal.objects.bulk_create(
+        Deal(
+            customer=customer,
+            title=f"Deal {i}",
+            value=1000 + i,
+            stage="closed_won" if i % 4 == 0 else "proposal",
+            expected_close_date=today,
+            assigned_to=rep,
+        )
+        for i in range(deals)
+    )
+    Interaction.objects.bulk_create(
+        Interaction(
+            customer=customer,
+            user=rep,
+            interaction_type="call",
+            subject=f"Call {i}",
+            notes="",
+        )
+        for i in range(deals)
+    )
+
+    client = Client()
+    client.force_login(user)
+    return f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database, async_views):
+    port = free_port()
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "server_settings",
+        "BENCHMARK_DATABASE": database,
+        "PORTAL_ASYNC_VIEWS": "True" if async_views else "False",
+        "PYTHONPATH": os.pathsep.join([str(ROOT), str(Path(__file__).parent)]),
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "flowtada.asgi:application",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        env=env,
+        cwd=ROOT,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server, port
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--deals", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = str(Path(tmp) / "portal_async.sqlite3")
+        setup_django(database)
+        cookie = seed(args.deals)
+
+        results = {}
+        for name, async_views in (("sync", False), ("async", True)):
+            server, port = start_server(database, async_views)
+            try:
+                base = f"http://127.0.0.1:{port}/"
+                # Warm up imports, templates and caches
+                asyncio.run(run_load(base, PATHS, 60, 3, cookie))
+                results[name] = asyncio.run(
+                    run_load(base, PATHS, args.requests, args.concurrency, cookie)
+                )
+            finally:
+                server.terminate()
+                server.wait()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+# benchmarks/server_settings.py
+
+"""Settings for app servers started by the benchmarks.
+
+Same as the project settings, but pointed at the benchmark's database file
+(``BENCHMARK_DATABASE``) and with DEBUG off so query logging does not skew
+the numbers. Caches and channel layers keep their local-memory backends.
+"""
+
+import os
+
+from flowtada.settings import *  # noqa: F401,F403
+
+DEBUG = False
+DATABASES["default"]["NAME"] = os.environ["BENCHMARK_DATABASE"]  # noqa: F405
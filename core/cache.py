@@ -0,0 +1,108 @@
+# core/cache.py
+
+import hashlib
+import re
+from functools import wraps
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import patch_vary_headers
+from django.utils.translation import get_language
+
+VERSION_KEY = "pagecache:version"
+PAGE_KEY = "pagecache:{version}:{language}:{url}"
+
+# Marketing pages render the CSRF token into the language switcher forms.
+# Cached copies get the current visitor's token swapped in on the way out.
+CSRF_INPUT = re.compile(rb'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+def page_cache():
+    return caches[settings.PAGE_CACHE_ALIAS]
+
+
+def current_version():
+    """Key version for cached pages; bumping it orphans every stored page"""
+    return page_cache().get_or_set(VERSION_KEY, 1, timeout=None)
+
+
+def bump_version():
+    """Invalidate every cached page at once, e.g. after a deploy"""
+    cache = page_cache()
+    cache.add(VERSION_KEY, 1, timeout=None)
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(VERSION_KEY, 2, timeout=None)
+        return 2
+
+
+def page_cache_key(request):
+    """Cache key for a page: key version, active language and full URL.
+
+    The language comes from the URL prefix (``i18n_patterns``), not from the
+    Accept-Language header, so ``/about/`` and ``/th/about/`` are separate
+    entries and a Thai page can never be stored under an English URL.
+    """
+    url = hashlib.md5(
+        request.build_absolute_uri().encode(), usedforsecurity=False
+    ).hexdigest()
+    return PAGE_KEY.format(version=current_version(), language=get_language(), url=url)
+
+
+def is_cacheable_request(request):
+    """Only anonymous GET/HEAD requests with no pending flash messages.
+
+    ``base.html`` renders login state and messages, so anything else has to
+    be rendered fresh.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return False
+    if request.user.is_authenticated:
+        return False
+    return not len(get_messages(request))
+
+
+def cached_page(view_func):
+    """Per-language full-page cache for anonymous marketing pages.
+
+    Stores the rendered body in ``PAGE_CACHE_ALIAS`` for
+    ``PAGE_CACHE_TIMEOUT`` seconds. Cookies are never stored; the CSRF token
+    embedded in the page is replaced with one for the current visitor, so
+    CsrfViewMiddleware still sets their cookie as usual.
+    """
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        timeout = settings.PAGE_CACHE_TIMEOUT
+        if not timeout or not is_cacheable_request(request):
+            return view_func(request, *args, **kwargs)
+
+        key = page_cache_key(request)
+        cached = page_cache().get(key)
+        if cached is not None:
+            content, content_type, token = cached
+            if token:
+                content = content.replace(token, get_token(request).encode())
+            response = HttpResponse(content, content_type=content_type)
+            response["X-Page-Cache"] = "hit"
+        else:
+            response = view_func(request, *args, **kwargs)
+            if hasattr(response, "render") and callable(response.render):
+                response = response.render()
+            if response.status_code == 200 and not response.streaming:
+                match = CSRF_INPUT.search(response.content)
+                token = match.group(1) if match else None
+                page_cache().set(
+                    key, (response.content, response["Content-Type"], token), timeout
+                )
+            response["X-Page-Cache"] = "miss"
+
+        # The cached copy depends on the login cookie as well as the URL
+        patch_vary_headers(response, ("Cookie",))
+        return response
+
+    return wrapper
@@ -0,0 +1,269 @@
+# core/instrumentation.py
+
+"""Per-view query counts, database time and latency.
+
+``InstrumentationMiddleware`` times a sample of requests
+(``INSTRUMENTATION_SAMPLE_RATE``) and, for those, wraps every database
+connection with ``connection.execute_wrapper`` to count queries and their
+time. A statement run ``INSTRUMENTATION_DUPLICATE_THRESHOLD`` times or more
+in one request, with only its parameters changing, is reported as a
+likely N+1.
+
+Sampled responses get a ``Server-Timing`` header when
+``INSTRUMENTATION_SERVER_TIMING`` is on, and the totals are served in
+Prometheus text format by ``metrics_view``. Totals are kept in memory per
+process, so with several workers each one reports its own share.
+"""
+
+import hashlib
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Latency histogram buckets, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Distinct duplicate fingerprints kept per view, to bound label cardinality
+MAX_FINGERPRINTS = 20
+
+LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def fingerprint(sql):
+    """Short hash of a statement with any inlined literals collapsed"""
+    shape = LITERAL.sub("?", sql)
+    return hashlib.md5(shape.encode(), usedforsecurity=False).hexdigest()[:12]
+
+
+class QueryRecorder:
+    """execute_wrapper that counts and times the statements it runs"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+    def duplicates(self, threshold):
+        """``{fingerprint: (times run, sql)}`` for statements repeated in the request.
+
+        The ORM passes parameters separately, so an N+1 loop repeats the
+        exact same SQL string and only those strings need fingerprinting.
+        """
+        repeated = {}
+        for sql, times in self.statements.items():
+            if times >= threshold:
+                key = fingerprint(sql)
+                previous = repeated.get(key, (0, sql))
+                repeated[key] = (previous[0] + times, previous[1])
+        return repeated
+
+
+# (metric, help, value) for the per-view counters
+COUNTERS = [
+    ("requests", "Sampled requests.", lambda stats: stats.requests),
+    ("queries", "Queries run by sampled requests.", lambda stats: stats.queries),
+    (
+        "db_seconds",
+        "Time sampled requests spent in the database.",
+        lambda stats: f"{stats.db_seconds:.6f}",
+    ),
+    (
+        "n_plus_one_requests",
+        "Sampled requests that repeated a query.",
+        lambda stats: stats.n_plus_one,
+    ),
+]
+
+
+class ViewStats:
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.seconds = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.n_plus_one = 0
+        self.duplicates = Counter()
+
+
+class Registry:
+    """Running totals per view for this process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = defaultdict(ViewStats)
+
+    def record(self, view, seconds, recorder, duplicates):
+        with self.lock:
+            stats = self.views[view]
+            stats.requests += 1
+            stats.queries += recorder.count
+            stats.db_seconds += recorder.duration
+            stats.seconds += seconds
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    stats.buckets[i] += 1
+            if duplicates:
+                stats.n_plus_one += 1
+            for key, (times, _) in duplicates.items():
+                if key in stats.duplicates or len(stats.duplicates) < MAX_FINGERPRINTS:
+                    stats.duplicates[key] += times
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+    def prometheus(self):
+        """The totals in Prometheus text exposition format"""
+        rate = settings.INSTRUMENTATION_SAMPLE_RATE
+        lines = [
+            "# HELP flowtada_instrumentation_sample_rate Fraction of requests measured.",
+            "# TYPE flowtada_instrumentation_sample_rate gauge",
+            f"flowtada_instrumentation_sample_rate {rate}",
+        ]
+        with self.lock:
+            views = [(label(view), stats) for view, stats in sorted(self.views.items())]
+            for metric, help_text, value in COUNTERS:
+                name = f"flowtada_view_{metric}_total"
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                lines += [
+                    f'{name}{{view="{view}"}} {value(stats)}' for view, stats in views
+                ]
+
+            name = "flowtada_view_duplicate_queries_total"
+            lines += [
+                f"# HELP {name} Runs of repeated queries, by statement fingerprint.",
+                f"# TYPE {name} counter",
+            ]
+            lines += [
+                f'{name}{{view="{view}",fingerprint="{key}"}} {times}'
+                for view, stats in views
+                for key, times in sorted(stats.duplicates.items())
+            ]
+
+            name = "flowtada_view_latency_seconds"
+            lines += [
+                f"# HELP {name} Response time of sampled requests.",
+                f"# TYPE {name} histogram",
+            ]
+            for view, stats in views:
+                lines += [
+                    f'{name}_bucket{{view="{view}",le="{bound}"}} {count}'
+                    for bound, count in zip(BUCKETS, stats.buckets)
+                ]
+                lines += [
+                    f'{name}_bucket{{view="{view}",le="+Inf"}} {stats.requests}',
+                    f'{name}_sum{{view="{view}"}} {stats.seconds:.6f}',
+                    f'{name}_count{{view="{view}"}} {stats.requests}',
+                ]
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def view_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "<unresolved>"
+    # The route pattern keeps unnamed views' label cardinality bounded
+    return match.view_name or match.route
+
+
+def wrap_connections(stack, recorder):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(recorder))
+
+
+def server_timing(seconds, recorder):
+    return ", ".join(
+        [
+            f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries"',
+            f"app;dur={(seconds - recorder.duration) * 1000:.1f}",
+            f"total;dur={seconds * 1000:.1f}",
+        ]
+    )
+
+
+class InstrumentationMiddleware:
+    """Measure a sample of requests; see the module docstring.
+
+    Put it first in MIDDLEWARE so the timings include the other
+    middleware. Streaming responses are only measured until the response
+    object is returned, not while their content is generated.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def sampled(self):
+        rate = settings.INSTRUMENTATION_SAMPLE_RATE
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            wrap_connections(stack, recorder)
+            response = self.get_response(request)
+        return self.finish(request, response, time.perf_counter() - start, recorder)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        # Connections are per thread, and async views query from the
+        # request's thread-sensitive worker thread, so wrap them there
+        stack = ExitStack()
+        await sync_to_async(wrap_connections)(stack, recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.finish(request, response, time.perf_counter() - start, recorder)
+
+    def finish(self, request, response, seconds, recorder):
+        view = view_name(request)
+        duplicates = recorder.duplicates(settings.INSTRUMENTATION_DUPLICATE_THRESHOLD)
+        for key, (times, sql) in duplicates.items():
+            logger.warning(
+                "%s ran a query %d times (fingerprint %s): %s", view, times, key, sql
+            )
+        registry.record(view, seconds, recorder, duplicates)
+        if settings.INSTRUMENTATION_SERVER_TIMING:
+            response["Server-Timing"] = server_timing(seconds, recorder)
+        return response
@@ -0,0 +1,14 @@
+# core/management/commands/clear_page_cache.py
+
+from django.core.management.base import BaseCommand
+from core.cache import bump_version
+
+
+class Command(BaseCommand):
+    help = "Invalidate all cached marketing pages (run on deploy)"
+
+    def handle(self, *args, **options):
+        version = bump_version()
+        self.stdout.write(
+            self.style.SUCCESS(f"Page cache cleared (key version is now {version}).")
+        )
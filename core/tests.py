@@ -0,0 +1,71 @@
+# core/tests.py
+
+import re
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+TOKENS = re.compile(r"""csrfmiddlewaretoken" value="([^"]+)"|CSRF_TOKEN = '([^']+)'""")
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    PAGE_CACHE_ALIAS="default",
+    PAGE_CACHE_TIMEOUT=600,
+)
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def get(self, path, client=None, **headers):
+        response = (client or self.client).get(path, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def tokens(self, response):
+        return {a or b for a, b in TOKENS.findall(response.content.decode())}
+
+    def test_each_language_has_its_own_entry(self):
+        english = self.get("/about/")
+        thai = self.get("/th/about/")
+        self.assertEqual(english["X-Page-Cache"], "miss")
+        self.assertEqual(thai["X-Page-Cache"], "miss")
+        self.assertContains(english, "<title>About Us - FlowTada</title>")
+        self.assertContains(thai, "<title>เกี่ยวกับเรา - FlowTada</title>")
+
+        # The URL prefix picks the language, whatever the browser asks for
+        english = self.get("/about/", accept_language="th")
+        thai = self.get("/th/about/", accept_language="en")
+        self.assertEqual(english["X-Page-Cache"], "hit")
+        self.assertEqual(thai["X-Page-Cache"], "hit")
+        self.assertContains(english, "<title>About Us - FlowTada</title>")
+        self.assertContains(thai, "<title>เกี่ยวกับเรา - FlowTada</title>")
+
+    def test_vary(self):
+        for cached in ["miss", "hit"]:
+            with self.subTest(cached=cached):
+                response = self.get("/about/")
+                self.assertEqual(response["X-Page-Cache"], cached)
+                vary = {header.strip() for header in response["Vary"].split(",")}
+                self.assertLessEqual({"Cookie", "Accept-Language"}, vary)
+
+    def test_hits_carry_the_visitors_csrf_token(self):
+        first = self.get("/about/")
+        visitor = Client(enforce_csrf_checks=True)
+        hit = self.get("/about/", client=visitor)
+        self.assertEqual(hit["X-Page-Cache"], "hit")
+
+        # One token throughout the page, and not the first visitor's
+        (token,) = self.tokens(hit)
+        self.assertNotIn(token, self.tokens(first))
+        self.assertIn("csrftoken", visitor.cookies)
+        response = visitor.post(
+            reverse("set_language"), {"csrfmiddlewaretoken": token, "language": "th"}
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def test_logged_in_visitors_bypass_the_cache(self):
+        self.get("/about/")
+        self.client.force_login(User.objects.create_user("ada"))
+        self.assertNotIn("X-Page-Cache", self.get("/about/"))
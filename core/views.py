@@ -1,12 +1,20 @@
 # core/views.py
 
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
 from django.shortcuts import render
 from django.views.generic import TemplateView
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
+from django.utils.crypto import constant_time_compare
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import never_cache
 from django.views.decorators.csrf import csrf_exempt
 import json
+from .cache import cached_page
+from .instrumentation import registry
 
 
+@method_decorator(cached_page, name="dispatch")
 class HomeView(TemplateView):
     """Main landing page"""
 
@@ -23,6 +31,7 @@ class HomeView(TemplateView):
         return context
 
 
+@cached_page
 def about_view(request):
     """About page"""
     return render(
@@ -30,6 +39,7 @@ def about_view(request):
     )
 
 
+@cached_page
 def pricing_view(request):
     """Pricing page"""
     pricing_plans = [
@@ -98,3 +108,22 @@ def contact_form(request):
     return JsonResponse(
         {"status": "error", "message": "Method not allowed"}, status=405
     )
+
+
+@never_cache
+def metrics_view(request):
+    """Request instrumentation totals in Prometheus text format.
+
+    Open to staff, and to scrapers sending
+    ``Authorization: Bearer <INSTRUMENTATION_METRICS_TOKEN>``.
+    """
+    token = settings.INSTRUMENTATION_METRICS_TOKEN
+    authorization = request.headers.get("Authorization", "")
+    if (
+        not (token and constant_time_compare(authorization, f"Bearer {token}"))
+        and not request.user.is_staff
+    ):
+        raise PermissionDenied
+    return HttpResponse(
+        registry.prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
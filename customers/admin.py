@@ -0,0 +1,289 @@
+# customers/admin.py
+
+from django.contrib import admin
+from django.utils.html import format_html
+from django.urls import reverse
+from django.utils.safestring import mark_safe
+from .changelists import (
+    AutocompleteFilter,
+    DistinctValuesFilter,
+    LargeTableAdminMixin,
+)
+from .exports import streaming_export_response
+from .inlines import RecentInline
+from .models import (
+    Company,
+    Customer,
+    Interaction,
+    InteractionArchive,
+    Deal,
+    LeadSubmission,
+)
+from .search import get_search_backend
+
+
+def export_action(resource):
+    """Admin action streaming the selected rows as CSV"""
+
+    def export_selected(modeladmin, request, queryset):
+        return streaming_export_response(resource, queryset)
+
+    export_selected.short_description = "Export selected %(verbose_name_plural)s as CSV"
+    export_selected.__name__ = f"export_{resource}"
+    return export_selected
+
+
+@admin.register(Company)
+class CompanyAdmin(admin.ModelAdmin):
+    list_display = [
+        "name",
+        "industry",
+        "size",
+        "website",
+        "interaction_count",
+        "open_deal_value",
+        "last_interaction_at",
+        "created_at",
+    ]
+    list_filter = ["industry", "size", "created_at"]
+    search_fields = ["name", "website"]
+    readonly_fields = [
+        "created_at",
+        "updated_at",
+        "interaction_count",
+        "open_deal_value",
+        "last_interaction_at",
+    ]
+
+    fieldsets = (
+        (None, {"fields": ("name", "website", "industry", "size")}),
+        (
+            "Activity",
+            {
+                "fields": (
+                    "interaction_count",
+                    "open_deal_value",
+                    "last_interaction_at",
+                )
+            },
+        ),
+        (
+            "Timestamps",
+            {"fields": ("created_at", "updated_at"), "classes": ("collapse",)},
+        ),
+    )
+
+
+class InteractionInline(RecentInline):
+    model = Interaction
+    readonly_fields = ["created_at"]
+    fields = ["interaction_type", "subject", "notes", "user", "created_at"]
+    autocomplete_fields = ["user"]
+
+
+class ArchivedInteractionInline(RecentInline):
+    """Interactions moved to the archive, read-only"""
+
+    model = InteractionArchive
+    fields = ["interaction_type", "subject", "notes", "user", "created_at"]
+    readonly_fields = fields
+    extra = 0
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+class DealInline(RecentInline):
+    model = Deal
+    readonly_fields = ["created_at", "updated_at"]
+    fields = [
+        "title",
+        "value",
+        "stage",
+        "probability",
+        "expected_close_date",
+        "assigned_to",
+    ]
+    autocomplete_fields = ["assigned_to"]
+
+
+@admin.register(Customer)
+class CustomerAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = [
+        "full_name",
+        "email",
+        "company",
+        "lead_status",
+        "assigned_to",
+        "lead_score",
+        "interaction_count",
+        "open_deal_value",
+        "last_interaction_at",
+        "created_at",
+    ]
+    list_filter = [
+        "lead_status",
+        ("lead_source", DistinctValuesFilter),
+        ("assigned_to", AutocompleteFilter),
+        "created_at",
+    ]
+    search_fields = ["first_name", "last_name", "email", "company__name"]
+    readonly_fields = [
+        "created_at",
+        "updated_at",
+        "last_contacted",
+        "lead_score",
+        "score_engagement",
+        "score_pipeline",
+        "score_recency",
+        "interaction_count",
+        "open_deal_value",
+        "last_interaction_at",
+    ]
+
+    fieldsets = (
+        (
+            "Personal Information",
+            {"fields": ("first_name", "last_name", "email", "phone")},
+        ),
+        ("Company Information", {"fields": ("company", "position")}),
+        (
+            "CRM Fields",
+            {"fields": ("lead_status", "lead_source", "assigned_to", "last_contacted")},
+        ),
+        (
+            "Activity",
+            {
+                "fields": (
+                    "interaction_count",
+                    "open_deal_value",
+                    "last_interaction_at",
+                )
+            },
+        ),
+        (
+            "Lead Score",
+            {
+                "fields": (
+                    "lead_score",
+                    "score_engagement",
+                    "score_pipeline",
+                    "score_recency",
+                )
+            },
+        ),
+        (
+            "Timestamps",
+            {"fields": ("created_at", "updated_at"), "classes": ("collapse",)},
+        ),
+    )
+
+    autocomplete_fields = ["company", "assigned_to"]
+    inlines = [InteractionInline, ArchivedInteractionInline, DealInline]
+    actions = [export_action("customers")]
+
+    def get_search_results(self, request, queryset, search_term):
+        # Full-text index instead of icontains scans over search_fields
+        if not search_term:
+            return queryset, False
+        return get_search_backend().filter(queryset, "customer", search_term), False
+
+    def full_name(self, obj):
+        return obj.full_name
+
+    full_name.short_description = "Name"
+
+
+@admin.register(Interaction)
+class InteractionAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ["customer", "interaction_type", "subject", "user", "created_at"]
+    list_filter = ["interaction_type", ("user", AutocompleteFilter), "created_at"]
+    search_fields = ["customer__first_name", "customer__last_name", "subject", "notes"]
+    readonly_fields = ["created_at"]
+    autocomplete_fields = ["customer", "user"]
+    actions = [export_action("interactions")]
+
+    def get_search_results(self, request, queryset, search_term):
+        # Full-text index instead of icontains scans over search_fields
+        if not search_term:
+            return queryset, False
+        return get_search_backend().filter(queryset, "interaction", search_term), False
+
+
+@admin.register(InteractionArchive)
+class InteractionArchiveAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    """Read-only; rows get here through ``manage.py archive_interactions``"""
+
+    list_display = [
+        "customer",
+        "interaction_type",
+        "subject",
+        "user",
+        "created_at",
+        "archived_at",
+    ]
+    list_filter = ["interaction_type", ("user", AutocompleteFilter), "created_at"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Deal)
+class DealAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = [
+        "title",
+        "customer",
+        "value",
+        "stage",
+        "probability",
+        "expected_close_date",
+        "assigned_to",
+        "created_at",
+    ]
+    list_filter = [
+        "stage",
+        ("assigned_to", AutocompleteFilter),
+        "created_at",
+        "expected_close_date",
+    ]
+    search_fields = ["title", "customer__first_name", "customer__last_name"]
+    readonly_fields = ["created_at", "updated_at"]
+    autocomplete_fields = ["customer", "assigned_to"]
+    actions = [export_action("deals")]
+
+    fieldsets = (
+        ("Deal Information", {"fields": ("customer", "title", "value")}),
+        (
+            "Sales Process",
+            {"fields": ("stage", "probability", "expected_close_date", "assigned_to")},
+        ),
+        (
+            "Timestamps",
+            {"fields": ("created_at", "updated_at"), "classes": ("collapse",)},
+        ),
+    )
+
+    # Custom admin styling
+    class Media:
+        css = {"all": ("admin/css/custom_admin.css",)}
+
+
+@admin.register(LeadSubmission)
+class LeadSubmissionAdmin(admin.ModelAdmin):
+    list_display = ["__str__", "source", "status", "created_at", "processed_at"]
+    list_filter = ["status", "source"]
+    readonly_fields = [
+        "source",
+        "payload",
+        "status",
+        "error",
+        "created_at",
+        "claimed_at",
+        "processed_at",
+    ]
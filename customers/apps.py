@@ -0,0 +1,15 @@
+# customers/apps.py
+
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+class CustomersConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "customers"
+
+    def ready(self):
+        from . import counters, events, scoring  # noqa: F401
+        from .search import install_search_index
+
+        post_migrate.connect(install_search_index, sender=self)
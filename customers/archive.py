@@ -0,0 +1,76 @@
+# customers/archive.py
+
+"""Archival of old interactions.
+
+Interactions are append-only, and the hot queries only read recent months.
+``manage.py archive_interactions`` moves the rows older than a cutoff into
+``InteractionArchive`` with archive_batch(), one transaction per batch, so
+the live table and its indexes stay the size of recent history.
+
+The archived interactions still count. The move sends no signals and
+leaves customer counters and lead scores as they are, and the rebuilds in
+customers.counters and customers.scoring read both tables. Full-text
+search only covers the live table.
+
+Rows are archived oldest first, so every archived row sorts before every
+live one on ``(created_at, id)``. The portal and admin read through by
+continuing into the archive once a customer's live rows run out, see
+``interaction_history()``.
+"""
+
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import Interaction, InteractionArchive
+
+FIELDS = [
+    "id",
+    "customer_id",
+    "interaction_type",
+    "subject",
+    "notes",
+    "user_id",
+    "created_at",
+]
+
+
+def archive_cutoff(days=None):
+    """Interactions created before this are due for the archive"""
+    if days is None:
+        days = settings.INTERACTION_ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def archive_batch(before, batch_size):
+    """Move up to ``batch_size`` of the oldest interactions; returns how many"""
+    with transaction.atomic():
+        rows = list(
+            Interaction.objects.filter(created_at__lt=before)
+            .order_by("created_at", "id")
+            .select_for_update()
+            .values(*FIELDS)[:batch_size]
+        )
+        if not rows:
+            return 0
+        InteractionArchive.objects.bulk_create(
+            InteractionArchive(**row) for row in rows
+        )
+        # A plain DELETE without post_delete: the rows live on in the
+        # archive, so the counter and score handlers must not see them go
+        ids = [row["id"] for row in rows]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {connection.ops.quote_name(Interaction._meta.db_table)} "
+                f"WHERE id IN ({', '.join(['%s'] * len(ids))})",
+                ids,
+            )
+    return len(rows)
+
+
+def interaction_history(customer):
+    """The customer's live and archived interactions, in reading order"""
+    return [
+        Interaction.objects.filter(customer=customer),
+        InteractionArchive.objects.filter(customer=customer),
+    ]
@@ -0,0 +1,182 @@
+# customers/bulk.py
+
+import copy
+import json
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from .models import Customer, Deal, Interaction
+from .signals import deals_bulk_updated, interactions_bulk_created
+
+BATCH_SIZE = 1000
+
+INTERACTION_TYPES = {value for value, _ in Interaction.INTERACTION_TYPES}
+DEAL_STAGES = {value for value, _ in Deal.DEAL_STAGES}
+
+# Deal.value is a DecimalField(max_digits=10, decimal_places=2)
+_value_field = Deal._meta.get_field("value")
+DEAL_VALUE_DIGITS = _value_field.max_digits - _value_field.decimal_places
+DEAL_VALUE_STEP = Decimal(1).scaleb(-_value_field.decimal_places)
+DEAL_VALUE_LIMIT = Decimal(1).scaleb(DEAL_VALUE_DIGITS)
+
+
+class NDJSONParser(BaseParser):
+    """Newline-delimited JSON: one object per line, parsed into a list"""
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return [json.loads(line) for line in stream if line.strip()]
+        except ValueError as e:
+            raise ParseError(f"NDJSON parse error - {e}")
+
+
+def text(row, name, errors, max_length, required=True):
+    value = row.get(name, "")
+    if not isinstance(value, str):
+        errors[name] = "Must be a string."
+    elif required and not value.strip():
+        errors[name] = "This field is required."
+    elif len(value) > max_length:
+        errors[name] = f"Ensure this field has no more than {max_length} characters."
+    else:
+        return value.strip()
+
+
+def lookup_map(model, field, rows, key, kind=str):
+    """Resolve ``row[key]`` for every row to primary keys with one IN query"""
+    keys = {row[key] for row in rows if isinstance(row.get(key), kind)}
+    return dict(model.objects.filter(**{f"{field}__in": keys}).values_list(field, "pk"))
+
+
+def create_interactions(rows):
+    """Validate interaction rows in one pass and bulk insert the valid ones.
+
+    Rows name their customer by ``customer_email`` and their user by
+    ``username``; both are resolved with one IN query for the whole batch.
+    Returns ``(created_count, errors)`` with errors keyed by row index.
+    """
+    customers = lookup_map(Customer, "email", rows, "customer_email")
+    users = lookup_map(User, "username", rows, "username")
+
+    interactions, errors = [], []
+    for index, row in enumerate(rows):
+        row_errors = {}
+        customer_id = customers.get(str(row.get("customer_email")))
+        if customer_id is None:
+            row_errors["customer_email"] = "Unknown customer."
+        user_id = users.get(str(row.get("username")))
+        if user_id is None:
+            row_errors["username"] = "Unknown user."
+        if row.get("interaction_type") not in INTERACTION_TYPES:
+            row_errors["interaction_type"] = "Invalid interaction type."
+        subject = text(row, "subject", row_errors, 200)
+        notes = text(row, "notes", row_errors, 1_000_000, required=False)
+
+        if row_errors:
+            errors.append({"row": index, "errors": row_errors})
+            continue
+        interactions.append(
+            Interaction(
+                customer_id=customer_id,
+                user_id=user_id,
+                interaction_type=row["interaction_type"],
+                subject=subject,
+                notes=notes,
+            )
+        )
+
+    with transaction.atomic():
+        Interaction.objects.bulk_create(interactions, batch_size=BATCH_SIZE)
+        interactions_bulk_created.send(sender=Interaction, interactions=interactions)
+    return len(interactions), errors
+
+
+def update_deals(rows):
+    """Validate deal update rows in one pass and apply them with bulk_update.
+
+    Each row carries the deal ``id`` plus any of ``title``, ``value``,
+    ``stage``, ``probability``, ``expected_close_date`` and ``assigned_to``
+    (a username). Returns ``(updated_count, errors)``.
+    """
+    deals = Deal.objects.in_bulk(
+        {row["id"] for row in rows if isinstance(row.get("id"), int)}
+    )
+    users = lookup_map(User, "username", rows, "assigned_to")
+
+    previous, changed_fields, errors = {}, set(), []
+    for index, row in enumerate(rows):
+        row_errors = {}
+        deal = deals.get(row["id"]) if isinstance(row.get("id"), int) else None
+        if deal is None:
+            errors.append({"row": index, "errors": {"id": "Unknown deal."}})
+            continue
+
+        changes = {}
+        if "title" in row:
+            changes["title"] = text(row, "title", row_errors, 200)
+        if "value" in row:
+            try:
+                value = Decimal(str(row["value"])).quantize(DEAL_VALUE_STEP)
+            except InvalidOperation:
+                value = None
+            if value is None or not value.is_finite():
+                row_errors["value"] = "A valid number is required."
+            elif abs(value) >= DEAL_VALUE_LIMIT:
+                row_errors["value"] = (
+                    f"Must be less than {DEAL_VALUE_LIMIT:,f} in size."
+                )
+            else:
+                changes["value"] = value
+        if "stage" in row:
+            if row["stage"] in DEAL_STAGES:
+                changes["stage"] = row["stage"]
+            else:
+                row_errors["stage"] = "Invalid stage."
+        if "probability" in row:
+            if isinstance(row["probability"], int) and 0 <= row["probability"] <= 100:
+                changes["probability"] = row["probability"]
+            else:
+                row_errors["probability"] = "Must be an integer between 0 and 100."
+        if "expected_close_date" in row:
+            try:
+                changes["expected_close_date"] = date.fromisoformat(
+                    row["expected_close_date"]
+                )
+            except (TypeError, ValueError):
+                row_errors["expected_close_date"] = "Must be an ISO date."
+        if "assigned_to" in row:
+            if row["assigned_to"] is None:
+                changes["assigned_to_id"] = None
+            elif isinstance(row["assigned_to"], str) and row["assigned_to"] in users:
+                changes["assigned_to_id"] = users[row["assigned_to"]]
+            else:
+                row_errors["assigned_to"] = "Unknown user."
+
+        if row_errors:
+            errors.append({"row": index, "errors": row_errors})
+            continue
+
+        # Keep the first pre-update copy when a deal appears in several rows
+        previous.setdefault(deal.pk, copy.copy(deal))
+        for attname, value in changes.items():
+            setattr(deal, attname, value)
+            changed_fields.add(attname.removesuffix("_id"))
+
+    updated = [deals[pk] for pk in previous]
+    if updated and changed_fields:
+        # bulk_update() skips auto_now, so stamp updated_at ourselves
+        now = timezone.now()
+        for deal in updated:
+            deal.updated_at = now
+        with transaction.atomic():
+            Deal.objects.bulk_update(
+                updated, sorted(changed_fields) + ["updated_at"], batch_size=BATCH_SIZE
+            )
+            deals_bulk_updated.send(sender=Deal, deals=updated, previous=previous)
+    return len(updated), errors
@@ -0,0 +1,316 @@
+# customers/changelists.py
+
+"""Admin changelists for tables with millions of rows.
+
+Four things make the stock changelist slow on a large table: an exact
+COUNT(*) per page (two with filters), OFFSET paging that reads and throws
+away every row before the page, related-field filters that load the whole
+related table into the sidebar, and free-text field filters that run
+SELECT DISTINCT over every row. ``LargeTableAdminMixin`` and the filters
+below replace each of them.
+"""
+
+import hashlib
+from django import forms
+from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+def estimated_count(queryset):
+    """Row estimate for the queryset's table from planner statistics.
+
+    Postgres keeps ``pg_class.reltuples`` current through autovacuum; SQLite
+    only has ``sqlite_stat1`` once ANALYZE has run. Returns None when there
+    is no estimate.
+    """
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(table)],
+            )
+            row = cursor.fetchone()
+            # -1 until the table has been vacuumed or analyzed
+            return row[0] if row and row[0] >= 0 else None
+        if connection.vendor == "sqlite":
+            try:
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s", [table])
+            except DatabaseError:
+                return None
+            # The first number of each entry is the row count it was taken at
+            counts = [int(stat.split()[0]) for stat, in cursor.fetchall()]
+            return max(counts) if counts else None
+    return None
+
+
+def foreign_keys(model, names):
+    """The names among ``names`` that are forward relations on ``model``"""
+    related = []
+    for name in names:
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue
+        if field.many_to_one or (field.one_to_one and field.concrete):
+            related.append(name)
+    return related
+
+
+def keyset_ordering(queryset):
+    """The queryset's ordering as field names, if it can drive keyset paging.
+
+    That takes plain non-null local columns ending in a unique one, which
+    the changelist's ordering (always finished off with the primary key)
+    usually is. Returns None otherwise.
+    """
+    ordering = list(queryset.query.order_by)
+    opts = queryset.model._meta
+    fields = []
+    for name in ordering:
+        if not isinstance(name, str):
+            return None
+        name = name.lstrip("-")
+        try:
+            field = opts.pk if name == "pk" else opts.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        if not field.concrete or field.is_relation or field.null:
+            return None
+        fields.append(field)
+    return ordering if fields and fields[-1].unique else None
+
+
+def keyset_filter(ordering, values):
+    """Rows that come after ``values`` in ``ordering``"""
+    condition, equal = Q(), {}
+    for name, value in zip(ordering, values):
+        field = name.lstrip("-")
+        lookup = "lt" if name.startswith("-") else "gt"
+        condition |= Q(**equal, **{f"{field}__{lookup}": value})
+        equal[field] = value
+    # Redundant, but gives the planner a range to seek on the leading column
+    first = ordering[0].lstrip("-")
+    lookup = "lte" if ordering[0].startswith("-") else "gte"
+    return Q(**{f"{first}__{lookup}": values[0]}) & condition
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that never counts a whole large table.
+
+    * Unfiltered, the count is the planner estimate once that reaches
+      ``estimate_threshold`` rows, exact below it.
+    * Filtered, counting stops at ``count_limit`` rows, and so does paging.
+
+    Each page remembers where the next one starts (the sort key of its last
+    row) in the cache for ``boundary_timeout`` seconds, so following "next"
+    seeks straight to it however deep the page is. Other pages fall back to
+    OFFSET. Either way the scan reads primary keys only, which the ordering
+    index covers, and just the page's rows are then loaded in full.
+    """
+
+    boundary_key = "changelist:boundary:{query}:{per_page}:{number}"
+
+    def __init__(
+        self,
+        *args,
+        estimate_threshold=100_000,
+        count_limit=10_000,
+        boundary_timeout=300,
+        **kwargs,
+    ):
+        self.estimate_threshold = estimate_threshold
+        self.count_limit = count_limit
+        self.boundary_timeout = boundary_timeout
+        super().__init__(*args, **kwargs)
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if queryset.query.where:
+            return queryset.order_by()[: self.count_limit].count()
+        estimate = estimated_count(queryset)
+        if estimate is not None and estimate >= self.estimate_threshold:
+            return estimate
+        return queryset.count()
+
+    def cache_key(self, number):
+        try:
+            sql, params = self.object_list.query.sql_with_params()
+        except EmptyResultSet:
+            return None
+        query = hashlib.md5(
+            f"{sql}{params!r}".encode(), usedforsecurity=False
+        ).hexdigest()
+        return self.boundary_key.format(
+            query=query, per_page=self.per_page, number=number
+        )
+
+    def page_keys(self, number, bottom, top):
+        """Primary keys of page ``number``, using a cached boundary if any"""
+        queryset = self.object_list
+        ordering = keyset_ordering(queryset)
+        if ordering is None:
+            return list(queryset.values_list("pk", flat=True)[bottom:top])
+
+        columns = [name.lstrip("-") for name in ordering]
+        key = self.cache_key(number) if number > 1 else None
+        boundary = cache.get(key) if key else None
+        if boundary is not None:
+            rows = queryset.filter(keyset_filter(ordering, boundary))[: top - bottom]
+        else:
+            rows = queryset[bottom:top]
+        rows = list(rows.values_list("pk", *columns))
+        key = self.cache_key(number + 1)
+        if key and len(rows) == top - bottom:
+            cache.set(key, rows[-1][1:], self.boundary_timeout)
+        return [row[0] for row in rows]
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+        pks = self.page_keys(number, bottom, top)
+        rows = {row.pk: row for row in self.object_list.filter(pk__in=pks).order_by()}
+        return self._get_page([rows[pk] for pk in pks if pk in rows], number, self)
+
+
+class AutocompleteFilter(admin.RelatedFieldListFilter):
+    """Related-field filter picked with the admin's autocomplete widget.
+
+    Only the selected object is loaded; the related model's admin needs
+    ``search_fields``, as for ``autocomplete_fields``.
+    """
+
+    template = "admin/autocomplete_filter.html"
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.model_admin = model_admin
+        super().__init__(field, request, params, model, model_admin, field_path)
+
+    def field_choices(self, field, request, model_admin):
+        if not self.lookup_val:
+            return []
+        try:
+            return field.get_choices(
+                include_blank=False,
+                limit_choices_to={field.target_field.name: self.lookup_val},
+            )
+        except (ValueError, ValidationError):
+            # The changelist reports the bad lookup itself
+            return []
+
+    def has_output(self):
+        return True
+
+    def widget(self):
+        formfield = self.field.formfield(
+            widget=AutocompleteSelect(self.field, self.model_admin.admin_site),
+            required=False,
+        )
+        return formfield.widget.render(
+            self.lookup_kwarg,
+            self.lookup_val,
+            attrs={
+                "id": f"filter_{self.field_path}",
+                "class": "autocomplete-filter",
+                "data-lookup": self.lookup_kwarg,
+                "data-lookup-isnull": self.lookup_kwarg_isnull,
+            },
+        )
+
+
+def distinct_values(model, field, limit, using="default"):
+    """Up to ``limit`` distinct non-null values of ``field``, ascending.
+
+    A recursive query steps from each value to the next larger one, so with
+    an index leading on the column it costs one index seek per value
+    instead of a scan of the table.
+    """
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(field.column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH RECURSIVE skip(value) AS (
+                SELECT MIN({column}) FROM {table}
+                UNION ALL
+                SELECT (SELECT MIN({column}) FROM {table} WHERE {column} > skip.value)
+                FROM skip WHERE skip.value IS NOT NULL
+            )
+            SELECT value FROM skip WHERE value IS NOT NULL LIMIT %s
+            """,
+            [limit],
+        )
+        return [value for value, in cursor.fetchall()]
+
+
+class DistinctValuesFilter(admin.AllValuesFieldListFilter):
+    """AllValuesFieldListFilter for a column with an index leading on it.
+
+    The values come from distinct_values() rather than SELECT DISTINCT, and
+    are not narrowed by the ModelAdmin's get_queryset().
+    """
+
+    max_values = 100
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        self.lookup_choices = distinct_values(field.model, field, self.max_values)
+        if (
+            field.null
+            and field.model._default_manager.filter(
+                **{f"{field.name}__isnull": True}
+            ).exists()
+        ):
+            self.lookup_choices.append(None)
+
+
+class LargeTableAdminMixin:
+    """ModelAdmin settings for changelists over very large tables"""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    estimate_threshold = 100_000
+    count_limit = 10_000
+    boundary_timeout = 300
+
+    def get_paginator(
+        self, request, queryset, per_page, orphans=0, allow_empty_first_page=True
+    ):
+        return self.paginator(
+            queryset,
+            per_page,
+            orphans,
+            allow_empty_first_page,
+            estimate_threshold=self.estimate_threshold,
+            count_limit=self.count_limit,
+            boundary_timeout=self.boundary_timeout,
+        )
+
+    def get_list_select_related(self, request):
+        """Join every foreign key shown in list_display, nullable ones too"""
+        if self.list_select_related:
+            return self.list_select_related
+        return foreign_keys(self.model, self.get_list_display(request)) or False
+
+    @property
+    def media(self):
+        media = super().media
+        if any(
+            isinstance(spec, (list, tuple)) and issubclass(spec[1], AutocompleteFilter)
+            for spec in self.list_filter
+        ):
+            media += AutocompleteSelect(None, self.admin_site).media
+            media += forms.Media(js=["js/admin_autocomplete_filter.js"])
+        return media
@@ -0,0 +1,217 @@
+# customers/conditional.py
+
+import asyncio
+import hashlib
+from functools import partial, wraps
+from django.contrib.messages import get_messages
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import get_language
+
+
+def queryset_validator(queryset, field="updated_at"):
+    """``(row count, latest timestamp)`` for a queryset in one query.
+
+    The count catches deletions, the max timestamp catches inserts and
+    edits, so together they change whenever the rendered rows would. Only
+    the ETag sees deletions; Last-Modified alone cannot.
+
+    Models without a timestamp (such as User) pass ``field=None`` and a
+    ``values_list()`` of the rendered columns; the rows themselves are then
+    compared, so keep such querysets small.
+    """
+    if field is None:
+        return rows_digest(queryset.order_by("pk")), None
+    stats = queryset.order_by().aggregate(count=Count("pk"), latest=Max(field))
+    return stats["count"], stats["latest"]
+
+
+async def aqueryset_validator(queryset, field="updated_at"):
+    if field is None:
+        return rows_digest([row async for row in queryset.order_by("pk")]), None
+    stats = await queryset.order_by().aaggregate(count=Count("pk"), latest=Max(field))
+    return stats["count"], stats["latest"]
+
+
+def rows_digest(rows):
+    return hashlib.md5(repr(list(rows)).encode(), usedforsecurity=False).hexdigest()
+
+
+def related_sources(queryset, relations):
+    """Validator sources for the rows related to ``queryset``.
+
+    ``relations`` maps relation names on the queryset's model to the
+    columns rendered from the related model. Reverse foreign keys cover the
+    related rows pointing at the queryset; forward ones cover the rows it
+    points at.
+    """
+    opts = queryset.model._meta
+    sources = []
+    for name, columns in relations.items():
+        field = opts.get_field(name)
+        model = field.related_model
+        if field.one_to_many:
+            related = model.objects.filter(**{f"{field.field.name}__in": queryset})
+        else:
+            related = model.objects.filter(pk__in=queryset.values(name))
+        names = {f.name for f in model._meta.concrete_fields}
+        timestamp = next((f for f in ("updated_at", "created_at") if f in names), None)
+        if timestamp:
+            sources.append((related, timestamp))
+        else:
+            sources.append((related.values_list(*columns), None))
+    return sources
+
+
+def compute_validators(request, sources):
+    """ETag and Last-Modified for a response built from ``sources``.
+
+    ``sources`` is a list of ``(queryset, timestamp_field)`` pairs. The ETag
+    also covers the user, URL and language, since the same rows render
+    differently for each.
+    """
+    validators = [queryset_validator(queryset, field) for queryset, field in sources]
+    return validators_to_headers(request, validators)
+
+
+async def acompute_validators(request, sources):
+    validators = await asyncio.gather(
+        *(aqueryset_validator(queryset, field) for queryset, field in sources)
+    )
+    return validators_to_headers(request, list(validators))
+
+
+def validators_to_headers(request, validators):
+    # Pages greet the user by name, so the name is part of the user's key
+    user = request.user
+    identity = (user.pk, user.get_username(), getattr(user, "first_name", ""))
+    key = repr((identity, request.get_full_path(), get_language(), validators)).encode()
+    etag = quote_etag(hashlib.md5(key, usedforsecurity=False).hexdigest())
+    timestamps = [latest for _, latest in validators if latest is not None]
+    last_modified = max(timestamps).timestamp() if timestamps else None
+    return etag, last_modified
+
+
+def not_modified_response(request, etag, last_modified):
+    """A 304 response if the client's copy is current, otherwise None"""
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def set_validators(response, etag, last_modified):
+    if response.status_code == 200:
+        response.headers.setdefault("ETag", etag)
+        if last_modified is not None:
+            response.headers.setdefault("Last-Modified", http_date(last_modified))
+    # Pages are per user; shared caches must not reuse them
+    response.headers.setdefault("Cache-Control", "private, no-cache")
+    return response
+
+
+def conditional_page(get_sources):
+    """Answer GETs with 304 when the data behind the page has not changed.
+
+    ``get_sources(request)`` returns the ``(queryset, timestamp_field)``
+    pairs the page renders, or None to skip conditional handling. The check
+    costs one aggregate query per source and nothing is rendered on a hit.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def inner(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view_func(request, *args, **kwargs)
+
+            sources = get_sources(request)
+            # Pending flash messages are part of the page
+            if sources is None or len(get_messages(request)):
+                return view_func(request, *args, **kwargs)
+
+            etag, last_modified = compute_validators(request, sources)
+            response = not_modified_response(request, etag, last_modified)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+            return set_validators(response, etag, last_modified)
+
+        return inner
+
+    return decorator
+
+
+def aconditional_page(get_sources):
+    """Async version of conditional_page() for async views.
+
+    ``get_sources`` is a coroutine function; the per-source aggregates run
+    concurrently.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        async def inner(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return await view_func(request, *args, **kwargs)
+
+            sources = await get_sources(request)
+            if sources is None or len(get_messages(request)):
+                return await view_func(request, *args, **kwargs)
+
+            etag, last_modified = await acompute_validators(request, sources)
+            response = not_modified_response(request, etag, last_modified)
+            if response is None:
+                response = await view_func(request, *args, **kwargs)
+            return set_validators(response, etag, last_modified)
+
+        return inner
+
+    return decorator
+
+
+class ConditionalListMixin:
+    """ETag/Last-Modified (and 304s) for DRF list and detail views.
+
+    Goes with SparseFieldsMixin: besides the primary rows, the validators
+    cover the related rows the response renders, i.e. reverse relations in
+    ``?fields=`` and foreign keys in ``?expand=``.
+    """
+
+    # Timestamp field that changes whenever a row changes
+    validator_field = "updated_at"
+
+    def validator_sources(self, queryset):
+        serializer_class = self.get_serializer_class()
+        fields = self.get_requested_fields() or serializer_class.Meta.fields
+        expand = self.get_expansions()
+        opts = queryset.model._meta
+        relations = {}
+        for name in fields:
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if name in expand:
+                relations[name] = serializer_class.expandable[name].Meta.fields
+            elif field.one_to_many:
+                # Only the ids are rendered
+                relations[name] = []
+        return [(queryset, self.validator_field)] + related_sources(queryset, relations)
+
+    def conditional(self, request, queryset, render):
+        etag, last_modified = compute_validators(
+            request, self.validator_sources(queryset)
+        )
+        response = not_modified_response(request, etag, last_modified)
+        if response is None:
+            response = render()
+        return set_validators(response, etag, last_modified)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.queryset.all())
+        render = partial(super().list, request, *args, **kwargs)
+        return self.conditional(request, queryset, render)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = {self.lookup_field: kwargs[self.lookup_url_kwarg or self.lookup_field]}
+        queryset = self.queryset.filter(**lookup)
+        render = partial(super().retrieve, request, *args, **kwargs)
+        return self.conditional(request, queryset, render)
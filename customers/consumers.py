@@ -0,0 +1,68 @@
+# customers/consumers.py
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from portal.customers import resolve_customer
+from .events import assignee_group, customer_group
+from .models import Customer
+
+
+class CRMEventConsumer(AsyncJsonWebsocketConsumer):
+    """Pushes Deal/Interaction events to signed-in users.
+
+    Staff join their own assignee group and can follow individual customers
+    by sending ``{"action": "subscribe", "customer": <id>}`` (and
+    ``"unsubscribe"``). Portal users join their own customer's group only.
+    """
+
+    async def connect(self):
+        user = self.scope["user"]
+        if not user.is_authenticated:
+            await self.close()
+            return
+
+        self.groups_joined = set()
+        if user.is_staff:
+            await self.join(assignee_group(user.pk))
+        else:
+            customer = await database_sync_to_async(resolve_customer)(user)
+            if customer is None:
+                await self.close()
+                return
+            await self.join(customer_group(customer.pk))
+        await self.accept()
+
+    async def disconnect(self, code):
+        for group in getattr(self, "groups_joined", ()):
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+    async def receive_json(self, content):
+        if not self.scope["user"].is_staff:
+            return
+        action = content.get("action")
+        customer_id = content.get("customer")
+        if action not in ("subscribe", "unsubscribe") or not isinstance(
+            customer_id, int
+        ):
+            await self.send_json({"error": "Expected subscribe/unsubscribe."})
+            return
+
+        group = customer_group(customer_id)
+        if action == "unsubscribe":
+            self.groups_joined.discard(group)
+            await self.channel_layer.group_discard(group, self.channel_name)
+        elif await self.customer_exists(customer_id):
+            await self.join(group)
+        else:
+            await self.send_json({"error": "Unknown customer."})
+
+    async def join(self, group):
+        self.groups_joined.add(group)
+        await self.channel_layer.group_add(group, self.channel_name)
+
+    @database_sync_to_async
+    def customer_exists(self, customer_id):
+        return Customer.objects.filter(pk=customer_id).exists()
+
+    async def crm_events(self, message):
+        await self.send_json({"events": message["events"]})
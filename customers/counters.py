@@ -0,0 +1,326 @@
+# customers/counters.py
+
+"""Activity counters stored on Customer and rolled up to Company.
+
+``interaction_count`` and ``open_deal_value`` are adjusted with F()
+expressions as interactions and deals are written or deleted, and
+``last_interaction_at`` is moved forward on insert and recomputed with a
+subquery on delete. ``manage.py rebuild_counters`` reconciles them with the
+source tables.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from .models import Company, Customer, Deal, Interaction, InteractionArchive
+from .signals import deals_bulk_updated, interactions_bulk_created
+from .snapshots import cascades_from_customer, stored_values
+
+CLOSED_STAGES = {"closed_won", "closed_lost"}
+
+COUNTER_FIELDS = ["interaction_count", "open_deal_value", "last_interaction_at"]
+
+
+def open_value(stage, value):
+    return Decimal(0) if stage in CLOSED_STAGES else Decimal(value)
+
+
+def add_counts(model, deltas):
+    """Add ``{pk: (interactions, open value)}`` deltas to ``model`` rows.
+
+    Rows sharing the same delta are updated together.
+    """
+    by_delta = defaultdict(list)
+    for pk, delta in deltas.items():
+        if pk is not None and any(delta):
+            by_delta[delta].append(pk)
+    for (count, value), pks in by_delta.items():
+        model.objects.filter(pk__in=pks).update(
+            interaction_count=F("interaction_count") + count,
+            open_deal_value=F("open_deal_value") + value,
+        )
+
+
+def apply_changes(deltas):
+    """Apply per-customer deltas to the customers and their companies"""
+    deltas = {pk: delta for pk, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return
+    companies = dict(
+        Customer.objects.filter(pk__in=deltas, company__isnull=False).values_list(
+            "pk", "company_id"
+        )
+    )
+    company_deltas = defaultdict(lambda: (0, Decimal(0)))
+    for pk, (count, value) in deltas.items():
+        if pk in companies:
+            total = company_deltas[companies[pk]]
+            company_deltas[companies[pk]] = (total[0] + count, total[1] + value)
+
+    with transaction.atomic():
+        add_counts(Customer, deltas)
+        add_counts(Company, company_deltas)
+
+
+def interacted(customer_ids, when):
+    """Move last_interaction_at forward for new interactions at ``when``"""
+    newer = Q(last_interaction_at__lt=when) | Q(last_interaction_at__isnull=True)
+    Customer.objects.filter(newer, pk__in=customer_ids).update(last_interaction_at=when)
+    Company.objects.filter(newer, customer__pk__in=customer_ids).update(
+        last_interaction_at=when
+    )
+
+
+def refresh_last_interaction(customer_ids, company_ids=()):
+    """Recompute last_interaction_at, e.g. after the latest one was deleted"""
+    # Archived interactions are all older than live ones
+    latest = [
+        Subquery(
+            model.objects.filter(customer=OuterRef("pk"))
+            .order_by("-created_at")
+            .values("created_at")[:1]
+        )
+        for model in (Interaction, InteractionArchive)
+    ]
+    Customer.objects.filter(pk__in=customer_ids).update(
+        last_interaction_at=Coalesce(*latest)
+    )
+    Company.objects.filter(
+        Q(customer__pk__in=customer_ids) | Q(pk__in=company_ids)
+    ).update(
+        last_interaction_at=Subquery(
+            Customer.objects.filter(company=OuterRef("pk"))
+            .order_by(F("last_interaction_at").desc(nulls_last=True))
+            .values("last_interaction_at")[:1]
+        )
+    )
+
+
+@receiver(post_save, sender=Interaction)
+def count_interaction(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        apply_changes({instance.customer_id: (1, Decimal(0))})
+        interacted([instance.customer_id], instance.created_at)
+        return
+
+    old = stored_values(instance)
+    old_customer_id = old["customer_id"] if old else None
+    if old_customer_id is not None and old_customer_id != instance.customer_id:
+        apply_changes(
+            {
+                old_customer_id: (-1, Decimal(0)),
+                instance.customer_id: (1, Decimal(0)),
+            }
+        )
+        refresh_last_interaction([old_customer_id, instance.customer_id])
+
+
+@receiver(post_delete, sender=Interaction)
+def uncount_interaction(sender, instance, origin=None, **kwargs):
+    if cascades_from_customer(origin):
+        # uncount_customer() takes the whole customer off its company
+        return
+    apply_changes({instance.customer_id: (-1, Decimal(0))})
+    refresh_last_interaction([instance.customer_id])
+
+
+@receiver(interactions_bulk_created, sender=Interaction)
+def count_bulk_interactions(sender, interactions, **kwargs):
+    deltas = defaultdict(int)
+    for interaction in interactions:
+        deltas[interaction.customer_id] += 1
+    apply_changes({pk: (count, Decimal(0)) for pk, count in deltas.items()})
+    if interactions:
+        # Each row has its own created_at; take every customer's latest
+        refresh_last_interaction(list(deltas))
+
+
+def deal_changes(pairs):
+    """Per-customer open value deltas for ``(old, new)`` deal state pairs.
+
+    A state is ``(customer_id, stage, value)``; either side may be None.
+    """
+    deltas = defaultdict(Decimal)
+    for old, new in pairs:
+        for state, sign in ((old, -1), (new, 1)):
+            if state is not None:
+                customer_id, stage, value = state
+                deltas[customer_id] += sign * open_value(stage, value)
+    return {pk: (0, value) for pk, value in deltas.items()}
+
+
+def deal_state(deal):
+    return deal.customer_id, deal.stage, deal.value
+
+
+@receiver(post_save, sender=Deal)
+def count_deal(sender, instance, raw=False, **kwargs):
+    if not raw:
+        old = stored_values(instance)
+        if old is not None:
+            old = old["customer_id"], old["stage"], old["value"]
+        apply_changes(deal_changes([(old, deal_state(instance))]))
+
+
+@receiver(post_delete, sender=Deal)
+def uncount_deal(sender, instance, origin=None, **kwargs):
+    if cascades_from_customer(origin):
+        return
+    apply_changes(deal_changes([(deal_state(instance), None)]))
+
+
+@receiver(deals_bulk_updated, sender=Deal)
+def count_bulk_deals(sender, deals, previous, **kwargs):
+    apply_changes(
+        deal_changes(
+            [(deal_state(previous[deal.pk]), deal_state(deal)) for deal in deals]
+        )
+    )
+
+
+@receiver(post_save, sender=Customer)
+def move_company_counts(sender, instance, created, raw=False, **kwargs):
+    """Carry a customer's counters over when it changes company"""
+    old = stored_values(instance)
+    if raw or created or old is None or old["company_id"] == instance.company_id:
+        return
+    customers_moved({instance.pk: old["company_id"]})
+
+
+def customers_moved(old_companies):
+    """Carry counters over for customers whose company was changed.
+
+    ``old_companies`` maps customer pks to their company before the change;
+    the new one is read back, so this also serves updates that send no
+    signals, such as the upserts of ``manage.py import_leads``.
+    """
+    deltas = defaultdict(lambda: (0, Decimal(0)))
+    for pk, company_id, count, value in Customer.objects.filter(
+        pk__in=old_companies
+    ).values_list("pk", "company_id", "interaction_count", "open_deal_value"):
+        old_company_id = old_companies[pk]
+        if old_company_id == company_id:
+            continue
+        for company, sign in ((old_company_id, -1), (company_id, 1)):
+            total = deltas[company]
+            deltas[company] = (total[0] + sign * count, total[1] + sign * value)
+
+    companies = [pk for pk in deltas if pk is not None]
+    if companies:
+        with transaction.atomic():
+            add_counts(Company, deltas)
+            refresh_last_interaction([], companies)
+
+
+@receiver(pre_delete, sender=Customer)
+def uncount_customer(sender, instance, **kwargs):
+    """Take a deleted customer's counters off its company, in one go.
+
+    The customer's interactions and deals are deleted with it, and their
+    own handlers skip the cascade rather than adjust each row in turn.
+    """
+    row = (
+        Customer.objects.filter(pk=instance.pk)
+        .values_list("company_id", "interaction_count", "open_deal_value")
+        .first()
+    )
+    if row is not None:
+        company_id, count, value = row
+        instance._counted_company_id = company_id
+        add_counts(Company, {company_id: (-count, -value)})
+
+
+@receiver(post_delete, sender=Customer)
+def refresh_company_after_delete(sender, instance, **kwargs):
+    company_id = getattr(instance, "_counted_company_id", None)
+    if company_id is not None:
+        refresh_last_interaction([], [company_id])
+
+
+def rebuild_customers(batch_size=1000):
+    """Reconcile customer counters in primary-key batches; returns rows fixed"""
+    fixed = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            Customer.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", *COUNTER_FIELDS)[:batch_size]
+        )
+        if not batch:
+            return fixed
+        last_pk = batch[-1][0]
+        pks = [row[0] for row in batch]
+
+        # Archived interactions still count, see customers.archive
+        interactions = {}
+        for model in (Interaction, InteractionArchive):
+            for row in (
+                model.objects.filter(customer__in=pks)
+                .order_by()
+                .values("customer")
+                .annotate(count=Count("id"), latest=Max("created_at"))
+            ):
+                count, latest = interactions.get(row["customer"], (0, None))
+                interactions[row["customer"]] = (
+                    count + row["count"],
+                    max(filter(None, [latest, row["latest"]])),
+                )
+        open_values = dict(
+            Deal.objects.filter(customer__in=pks)
+            .exclude(stage__in=CLOSED_STAGES)
+            .order_by()
+            .values("customer")
+            .annotate(total=Sum("value"))
+            .values_list("customer", "total")
+        )
+
+        stale = []
+        for pk, *stored in batch:
+            count, latest = interactions.get(pk, (0, None))
+            actual = [count, open_values.get(pk) or Decimal(0), latest]
+            if stored != actual:
+                stale.append(Customer(pk=pk, **dict(zip(COUNTER_FIELDS, actual))))
+        Customer.objects.bulk_update(stale, COUNTER_FIELDS)
+        fixed += len(stale)
+
+
+def rebuild_companies(batch_size=1000):
+    """Reconcile company rollups from the (reconciled) customer counters"""
+    fixed = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            Company.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", *COUNTER_FIELDS)[:batch_size]
+        )
+        if not batch:
+            return fixed
+        last_pk = batch[-1][0]
+
+        totals = {
+            row["company"]: [row["count"], row["value"], row["latest"]]
+            for row in Customer.objects.filter(company__in=[row[0] for row in batch])
+            .order_by()
+            .values("company")
+            .annotate(
+                count=Sum("interaction_count"),
+                value=Sum("open_deal_value"),
+                latest=Max("last_interaction_at"),
+            )
+        }
+
+        stale = []
+        for pk, *stored in batch:
+            actual = totals.get(pk, [0, Decimal(0), None])
+            if stored != actual:
+                stale.append(Company(pk=pk, **dict(zip(COUNTER_FIELDS, actual))))
+        Company.objects.bulk_update(stale, COUNTER_FIELDS)
+        fixed += len(stale)
@@ -0,0 +1,268 @@
+# customers/dedupe.py
+
+"""Near-duplicate matching for companies and customers.
+
+Names are reduced to a normalized key ("ACME, Inc." -> "acme"), which is
+stored on ``Company.normalized_name`` so ingest can match variants with one
+indexed IN query. Fuzzier matches ("Acme Widgets" / "Acme Widget Co") are
+found with a trigram inverted index. Each record is only compared against
+records that share one of its rarer trigrams, so grouping a table costs
+roughly linear time instead of comparing every pair.
+"""
+
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from django.db import transaction
+from django.db.models import Case, Value, When
+
+# Legal-form words dropped from company names, including the Thai forms
+LEGAL_SUFFIXES = {
+    "inc",
+    "incorporated",
+    "corp",
+    "corporation",
+    "co",
+    "company",
+    "llc",
+    "llp",
+    "lp",
+    "ltd",
+    "limited",
+    "plc",
+    "gmbh",
+    "ag",
+    "sa",
+    "bv",
+    "pte",
+    "pty",
+    "pcl",
+    "บริษัท",
+    "จำกัด",
+    "มหาชน",
+    "บจก",
+    "หจก",
+}
+
+# Shared mailbox providers say nothing about which company a person is with
+FREE_EMAIL_DOMAINS = {
+    "gmail.com",
+    "googlemail.com",
+    "hotmail.com",
+    "outlook.com",
+    "live.com",
+    "yahoo.com",
+    "icloud.com",
+    "me.com",
+    "aol.com",
+    "proton.me",
+    "protonmail.com",
+}
+
+# \w alone would split Thai words at their (combining) vowel and tone marks
+WORD = re.compile(r"[\w\u0e00-\u0e7f]+")
+
+
+def strip_accents(text):
+    """Drop accents from Latin letters.
+
+    Other scripts keep their combining marks; Thai vowels and tone marks
+    are combining characters too, and removing them would change the word.
+    """
+    chars = []
+    for ch in unicodedata.normalize("NFD", text):
+        if unicodedata.combining(ch) and chars and chars[-1] < "\u0250":
+            continue
+        chars.append(ch)
+    return unicodedata.normalize("NFC", "".join(chars))
+
+
+def words(text):
+    """Casefolded words of ``text`` with accents and punctuation removed"""
+    text = strip_accents(text or "").casefold().replace("&", " and ")
+    # "S.A." and "N.V." are one word
+    return WORD.findall(text.replace(".", ""))
+
+
+def normalize_company_name(name):
+    """Comparison key for a company name.
+
+    "ACME, Inc.", "Acme Inc" and "acme inc." all become "acme". A name made
+    only of legal-form words keeps them rather than normalizing to "".
+    """
+    tokens = words(name)
+    kept = [token for token in tokens if token not in LEGAL_SUFFIXES]
+    return " ".join(kept or tokens)
+
+
+def normalize_person_name(first_name, last_name):
+    """Order-insensitive key for a person's name"""
+    return " ".join(sorted(words(f"{first_name} {last_name}")))
+
+
+def email_domain(email):
+    return (email or "").rpartition("@")[2].strip().lower()
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a, b):
+    """Jaccard similarity of two trigram sets"""
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class NGramIndex:
+    """Inverted trigram index over normalized keys.
+
+    Posting lists longer than ``max_postings`` are not consulted. Those are
+    trigrams so common, like " in", that they match almost everything and
+    would make lookups quadratic. Keys that share only common trigrams
+    cannot be similar enough to matter.
+    """
+
+    def __init__(self, max_postings=200):
+        self.max_postings = max_postings
+        self.grams = {}
+        self.postings = defaultdict(list)
+
+    def add(self, ident, key):
+        grams = trigrams(key)
+        self.grams[ident] = grams
+        for gram in grams:
+            self.postings[gram].append(ident)
+
+    def similar(self, key, threshold):
+        """``(ident, score)`` pairs for indexed keys at least ``threshold`` alike"""
+        grams = trigrams(key)
+        shared = Counter()
+        for gram in grams:
+            posting = self.postings.get(gram, ())
+            if len(posting) <= self.max_postings:
+                shared.update(posting)
+
+        matches = []
+        for ident, count in shared.items():
+            other = self.grams[ident]
+            # Upper bound on the score from the counts alone
+            if count / (len(grams) + len(other) - count) < threshold:
+                continue
+            score = similarity(grams, other)
+            if score >= threshold:
+                matches.append((ident, score))
+        return matches
+
+
+class DisjointSet:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        self.parent.setdefault(item, item)
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            # Keep the lowest id as the root, i.e. the oldest record
+            self.parent[max(a, b)] = min(a, b)
+
+    def groups(self):
+        members = defaultdict(list)
+        for item in self.parent:
+            members[self.find(item)].append(item)
+        return [sorted(group) for group in members.values() if len(group) > 1]
+
+
+def group_duplicates(records, threshold=0.8, block=None):
+    """Group ``(id, key)`` records whose keys are equal or similar.
+
+    Records are only compared within the same ``block(id, key)`` value when
+    a blocking function is given. Returns lists of ids, lowest first.
+    """
+    sets = DisjointSet()
+    indexes = defaultdict(NGramIndex)
+    exact = {}
+    for ident, key in records:
+        if not key:
+            continue
+        scope = block(ident, key) if block else None
+        if (scope, key) in exact:
+            sets.union(exact[(scope, key)], ident)
+            continue
+        exact[(scope, key)] = ident
+
+        index = indexes[scope]
+        for other, _ in index.similar(key, threshold):
+            sets.union(other, ident)
+        index.add(ident, key)
+    return sets.groups()
+
+
+def company_duplicates(threshold=0.75):
+    from .models import Company
+
+    records = Company.objects.order_by("pk").values_list("pk", "normalized_name")
+    return group_duplicates(records.iterator(chunk_size=5000), threshold)
+
+
+def customer_duplicates(threshold=0.9):
+    """Customers with similar names at the same (non-webmail) email domain"""
+    from .models import Customer
+
+    domains = {}
+    records = []
+    rows = Customer.objects.order_by("pk").values_list(
+        "pk", "first_name", "last_name", "email"
+    )
+    for pk, first_name, last_name, email in rows.iterator(chunk_size=5000):
+        domain = email_domain(email)
+        if domain and domain not in FREE_EMAIL_DOMAINS:
+            domains[pk] = domain
+            records.append((pk, normalize_person_name(first_name, last_name)))
+    return group_duplicates(records, threshold, block=lambda pk, key: domains[pk])
+
+
+def merge_duplicates(model, groups):
+    """Fold each group into its first (oldest) record.
+
+    Every foreign key pointing at ``model`` is repointed with one CASE
+    UPDATE per relation and batch of duplicates, then the duplicates are
+    deleted.
+    Returns the number of records removed.
+    """
+    mapping = {dup: group[0] for group in groups for dup in group[1:]}
+    if not mapping:
+        return 0
+
+    # Plain foreign keys only; one-to-one rows can't be repointed onto a
+    # record that may already have one, so those cascade with the duplicate
+    relations = [rel for rel in model._meta.related_objects if rel.field.many_to_one]
+    pks = list(mapping)
+    with transaction.atomic():
+        for start in range(0, len(pks), 500):
+            batch = pks[start : start + 500]
+            for rel in relations:
+                column = rel.field.attname
+                rel.related_model._base_manager.filter(
+                    **{f"{column}__in": batch}
+                ).update(
+                    **{
+                        column: Case(
+                            *(
+                                When(**{column: dup}, then=Value(mapping[dup]))
+                                for dup in batch
+                            )
+                        )
+                    }
+                )
+            model._base_manager.filter(pk__in=batch).delete()
+    return len(pks)
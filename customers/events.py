@@ -0,0 +1,181 @@
+# customers/events.py
+
+"""Real-time Deal/Interaction events for the WebSocket stream.
+
+Saves are buffered per thread and published once the surrounding
+transaction commits. Repeated saves of the same row within a transaction
+collapse into one event, and each group receives its events in batches of
+``REALTIME_EVENT_BATCH_SIZE`` rather than one channel-layer message per row,
+so bulk writes and imports stay cheap.
+"""
+
+import logging
+import threading
+import weakref
+from collections import defaultdict
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import Customer, Deal, Interaction
+from .signals import deals_bulk_updated, interactions_bulk_created
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_TYPE = "crm.events"
+
+_local = threading.local()
+
+
+def customer_group(customer_id):
+    return f"crm.customer.{customer_id}"
+
+
+def assignee_group(user_id):
+    return f"crm.assignee.{user_id}"
+
+
+def deal_event(deal, action):
+    return {
+        "model": "deal",
+        "action": action,
+        "id": deal.pk,
+        "customer_id": deal.customer_id,
+        "assigned_to_id": deal.assigned_to_id,
+        "title": deal.title,
+        "stage": deal.stage,
+        "value": str(deal.value),
+        "probability": deal.probability,
+        "updated_at": deal.updated_at.isoformat() if deal.updated_at else None,
+    }
+
+
+def interaction_event(interaction, action):
+    return {
+        "model": "interaction",
+        "action": action,
+        "id": interaction.pk,
+        "customer_id": interaction.customer_id,
+        "user_id": interaction.user_id,
+        "interaction_type": interaction.interaction_type,
+        "subject": interaction.subject,
+        "created_at": (
+            interaction.created_at.isoformat() if interaction.created_at else None
+        ),
+    }
+
+
+class PendingEvents:
+    """Events buffered until one transaction commits, keyed by (model, id)"""
+
+    def __init__(self):
+        self.events = {}
+
+    def add(self, events):
+        # A later event for the same row replaces the earlier one but keeps
+        # the first action, so create-then-update arrives as one "created"
+        for event in events:
+            key = (event["model"], event["id"])
+            if key in self.events:
+                event = {**event, "action": self.events[key]["action"]}
+            self.events[key] = event
+
+    def flush(self):
+        if getattr(_local, "pending", None) is self:
+            del _local.pending
+        publish(list(self.events.values()))
+
+
+def queue_events(events):
+    """Publish ``events`` once the current transaction commits.
+
+    Outside an atomic block they are published immediately.
+    """
+    if not events:
+        return
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        publish(events)
+        return
+
+    # One buffer per transaction, flushed by the one callback it queues.
+    # Django's on-commit queue holds the only reference to that callback
+    # and drops it once it has run or the transaction rolled back, so a
+    # dead weak reference means the buffer is spent or was rolled back
+    pending = getattr(_local, "pending", None)
+    if pending is None or pending.queued() is None:
+        pending = _local.pending = PendingEvents()
+        flush = pending.flush
+        pending.queued = weakref.ref(flush)
+        transaction.on_commit(flush)
+    pending.add(events)
+
+
+def publish(events):
+    """Send events to their customer and assignee groups, best-effort.
+
+    The rows are already written when this runs, so a channel layer that
+    is down is logged rather than raised into the save or commit.
+    """
+    try:
+        send_events(events)
+    except Exception:
+        logger.exception("Publishing %d realtime events failed", len(events))
+
+
+def send_events(events):
+    """Send events to their customer and assignee groups in batches"""
+    layer = get_channel_layer()
+    if layer is None:
+        return
+
+    # Interactions are routed to the customer's assignee; look them up once
+    customer_ids = {e["customer_id"] for e in events if e["model"] == "interaction"}
+    assignees = dict(
+        Customer.objects.filter(pk__in=customer_ids).values_list("pk", "assigned_to")
+    )
+
+    groups = defaultdict(list)
+    for event in events:
+        groups[customer_group(event["customer_id"])].append(event)
+        if event["model"] == "deal":
+            assignee_id = event["assigned_to_id"]
+        else:
+            assignee_id = assignees.get(event["customer_id"])
+        if assignee_id:
+            groups[assignee_group(assignee_id)].append(event)
+
+    size = settings.REALTIME_EVENT_BATCH_SIZE
+    send = async_to_sync(layer.group_send)
+    for group, group_events in groups.items():
+        for start in range(0, len(group_events), size):
+            send(
+                group,
+                {"type": MESSAGE_TYPE, "events": group_events[start : start + size]},
+            )
+
+
+@receiver(post_save, sender=Deal)
+def deal_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        queue_events([deal_event(instance, "created" if created else "updated")])
+
+
+@receiver(post_save, sender=Interaction)
+def interaction_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        queue_events([interaction_event(instance, "created" if created else "updated")])
+
+
+@receiver(deals_bulk_updated, sender=Deal)
+def deals_updated_in_bulk(sender, deals, **kwargs):
+    queue_events([deal_event(deal, "updated") for deal in deals])
+
+
+@receiver(interactions_bulk_created, sender=Interaction)
+def interactions_created_in_bulk(sender, interactions, **kwargs):
+    queue_events(
+        [interaction_event(interaction, "created") for interaction in interactions]
+    )
@@ -0,0 +1,108 @@
+# customers/exports.py
+
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from .models import Customer, Deal, Interaction
+
+CHUNK_SIZE = 2000
+
+# resource name -> (model, exported columns, field used for incremental exports)
+EXPORTS = {
+    "customers": (
+        Customer,
+        [
+            "id",
+            "first_name",
+            "last_name",
+            "email",
+            "phone",
+            "company_id",
+            "company__name",
+            "position",
+            "lead_status",
+            "lead_source",
+            "assigned_to_id",
+            "created_at",
+            "updated_at",
+            "last_contacted",
+        ],
+        "updated_at",
+    ),
+    "deals": (
+        Deal,
+        [
+            "id",
+            "customer_id",
+            "title",
+            "value",
+            "stage",
+            "probability",
+            "expected_close_date",
+            "assigned_to_id",
+            "created_at",
+            "updated_at",
+        ],
+        "updated_at",
+    ),
+    # Interactions are append-only, so created_at doubles as the change marker
+    "interactions": (
+        Interaction,
+        [
+            "id",
+            "customer_id",
+            "interaction_type",
+            "subject",
+            "notes",
+            "user_id",
+            "created_at",
+        ],
+        "created_at",
+    ),
+}
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+
+class Echo:
+    """File-like object whose write() hands the line back to csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def export_lines(queryset, fields, fmt):
+    """Yield the export one line at a time without building model instances"""
+    rows = queryset.values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+    if fmt == "csv":
+        writer = csv.writer(Echo())
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow(row)
+    else:
+        for row in rows:
+            yield json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+def export_queryset(resource, queryset=None, since=None):
+    """Build the queryset for an export, optionally only rows changed since"""
+    model, fields, since_field = EXPORTS[resource]
+    if queryset is None:
+        queryset = model.objects.all()
+    if since is not None:
+        queryset = queryset.filter(**{f"{since_field}__gte": since})
+    # Ordering on the change marker lets consumers keep a high-water mark
+    return queryset.order_by(since_field, "pk"), fields
+
+
+def streaming_export_response(resource, queryset=None, fmt="csv", since=None):
+    queryset, fields = export_queryset(resource, queryset, since)
+    response = StreamingHttpResponse(
+        export_lines(queryset, fields, fmt), content_type=CONTENT_TYPES[fmt]
+    )
+    response["Content-Disposition"] = f'attachment; filename="{resource}.{fmt}"'
+    return response
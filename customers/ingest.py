@@ -0,0 +1,236 @@
+# customers/ingest.py
+
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .dedupe import normalize_company_name
+from .models import Company, Customer, LeadSubmission
+
+logger = logging.getLogger(__name__)
+
+LEAD_SOURCES = dict(LeadSubmission.SOURCE_CHOICES)
+
+# Set temporary password (should be sent via email)
+TEMP_PASSWORD = "temp123"  # In production, generate random password
+
+
+class InvalidLead(ValueError):
+    """Raised when a submitted lead is missing required fields"""
+
+
+def clean_contact(data):
+    """Validate a contact form payload into a lead dict"""
+    name = data.get("name", "").strip()
+    email = data.get("email", "").strip()
+    message = data.get("message", "").strip()
+    company = data.get("company", "").strip()
+
+    if not all([name, email, message]):
+        raise InvalidLead("Name, email, and message are required.")
+
+    # Split name
+    name_parts = name.split(" ", 1)
+    return {
+        "email": email,
+        "first_name": name_parts[0],
+        "last_name": name_parts[1] if len(name_parts) > 1 else "",
+        "company": company,
+        "message": message,
+    }
+
+
+def clean_trial(data):
+    """Validate a free trial signup payload into a lead dict"""
+    email = data.get("email", "").strip()
+    first_name = data.get("first_name", "").strip()
+    last_name = data.get("last_name", "").strip()
+    company = data.get("company", "").strip()
+
+    if not all([email, first_name]):
+        raise InvalidLead("Email and first name are required.")
+
+    return {
+        "email": email,
+        "first_name": first_name,
+        "last_name": last_name,
+        "company": company,
+    }
+
+
+def enqueue(source, lead):
+    """Persist a validated lead for the ingest workers"""
+    submission = LeadSubmission.objects.create(source=source, payload=lead)
+    if settings.LEAD_INGEST_MODE == "celery":
+        from .tasks import process_lead_submissions
+
+        transaction.on_commit(process_lead_submissions.delay)
+    return submission
+
+
+def ingest_leads(leads):
+    """Create the CRM records for a batch of ``(source, lead)`` pairs.
+
+    Existing companies, customers and users are each matched with one IN
+    query and the missing rows are written with ``bulk_create``, so a batch
+    costs a fixed number of queries whatever its size. As with the original
+    ``get_or_create`` flow, existing customers are left untouched and portal
+    users are only created for new trial customers.
+
+    Customers and their portal users commit together, so a failed batch
+    leaves nothing behind for a retry to skip over.
+    """
+    # Password hashing is slow; do it before the write transaction
+    passwords = hash_passwords(
+        lead["email"] for source, lead in leads if source == "trial"
+    )
+    with transaction.atomic():
+        trials = create_customers(leads)
+        create_portal_users(trials, passwords)
+
+
+def create_customers(leads):
+    """Create missing companies and customers; return the new trial leads"""
+    companies = match_companies(lead["company"] for _, lead in leads)
+
+    emails = {lead["email"] for _, lead in leads}
+    existing = set(
+        Customer.objects.filter(email__in=emails).values_list("email", flat=True)
+    )
+    customers, trials = {}, {}
+    for source, lead in leads:
+        email = lead["email"]
+        if email in existing or email in customers:
+            continue
+        customers[email] = Customer(
+            email=email,
+            first_name=lead["first_name"],
+            last_name=lead["last_name"],
+            company_id=companies.get(normalize_company_name(lead["company"])),
+            lead_source=LEAD_SOURCES[source],
+            lead_status="new",
+        )
+        if source == "trial":
+            trials[email] = lead
+    Customer.objects.bulk_create(customers.values(), ignore_conflicts=True)
+    return trials
+
+
+def match_companies(names):
+    """Map normalized company names to company ids, creating missing ones.
+
+    Spelling variants ("ACME, Inc." / "Acme Inc") share a normalized name,
+    so they resolve to the existing company instead of adding a new one.
+    """
+    keys = {}
+    for name in names:
+        key = normalize_company_name(name)
+        if key:
+            keys.setdefault(key, name.strip())
+
+    companies = {}
+    for pk, key in (
+        Company.objects.filter(normalized_name__in=keys)
+        .order_by("pk")
+        .values_list("pk", "normalized_name")
+    ):
+        companies.setdefault(key, pk)
+    missing = [
+        Company(name=name, normalized_name=key, industry="Unknown")
+        for key, name in keys.items()
+        if key not in companies
+    ]
+    for company in Company.objects.bulk_create(missing):
+        companies[company.normalized_name] = company.pk
+    return companies
+
+
+def hash_passwords(emails):
+    """Temporary password hashes for the emails without a user, by email"""
+    emails = set(emails)
+    taken = set(
+        User.objects.filter(username__in=emails).values_list("username", flat=True)
+    )
+    return {email: make_password(TEMP_PASSWORD) for email in emails - taken}
+
+
+def create_portal_users(trials, passwords):
+    """Create user accounts for portal access, keyed by email"""
+    taken = set(
+        User.objects.filter(username__in=trials).values_list("username", flat=True)
+    )
+    users = [
+        User(
+            username=email,
+            email=email,
+            first_name=lead["first_name"],
+            last_name=lead["last_name"],
+            is_active=True,
+            password=passwords.get(email) or make_password(TEMP_PASSWORD),
+        )
+        for email, lead in trials.items()
+        if email not in taken
+    ]
+    User.objects.bulk_create(users, ignore_conflicts=True)
+
+
+def process_pending(batch_size=None):
+    """Claim one batch of pending submissions and ingest it.
+
+    The claim is its own short transaction, so no row locks are held while
+    the leads are written and passwords hashed. Submissions left in
+    "processing" by a worker that died are claimed again once
+    ``LEAD_INGEST_CLAIM_TIMEOUT`` seconds have passed.
+
+    Returns the number of submissions claimed, so callers can loop until
+    the queue is drained.
+    """
+    batch = claim_batch(batch_size or settings.LEAD_INGEST_BATCH_SIZE)
+    if not batch:
+        return 0
+
+    try:
+        ingest_leads([(s.source, s.payload) for s in batch])
+    except Exception:
+        logger.exception(
+            "Lead ingest failed for %d submissions, retrying one by one", len(batch)
+        )
+        # Ingest each submission on its own, so one bad lead only fails itself
+        processed = []
+        for submission in batch:
+            try:
+                ingest_leads([(submission.source, submission.payload)])
+            except Exception as e:
+                logger.exception("Lead ingest failed for submission %d", submission.pk)
+                LeadSubmission.objects.filter(pk=submission.pk).update(
+                    status="failed", error=str(e), processed_at=timezone.now()
+                )
+            else:
+                processed.append(submission.pk)
+    else:
+        processed = [s.pk for s in batch]
+
+    LeadSubmission.objects.filter(pk__in=processed).update(
+        status="processed", processed_at=timezone.now()
+    )
+    return len(batch)
+
+
+def claim_batch(batch_size):
+    """Mark up to ``batch_size`` submissions as processing; return them"""
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.LEAD_INGEST_CLAIM_TIMEOUT)
+    with transaction.atomic():
+        batch = list(
+            LeadSubmission.objects.select_for_update(skip_locked=True)
+            .filter(Q(status="pending") | Q(status="processing", claimed_at__lt=stale))
+            .order_by("id")[:batch_size]
+        )
+        LeadSubmission.objects.filter(pk__in=[s.pk for s in batch]).update(
+            status="processing", claimed_at=now
+        )
+    return batch
@@ -0,0 +1,98 @@
+# customers/inlines.py
+
+"""Admin inlines that stay cheap however long a customer's history is.
+
+A stock tabular inline renders one editable form per related row, and
+every form builds its own select for each foreign key. ``RecentInline``
+shows only the newest ``max_rows`` rows, read-only, with a link to the
+full list in the changelist, plus blank rows for adding new ones.
+"""
+
+from urllib.parse import urlencode
+from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteMixin, ForeignKeyRawIdWidget
+from django.forms import ModelChoiceField
+from django.forms.models import BaseInlineFormSet
+from django.urls import NoReverseMatch, reverse
+from .changelists import foreign_keys
+
+
+class RecentInlineFormSet(BaseInlineFormSet):
+    """Inline formset over the newest ``max_rows`` rows.
+
+    Select choices for foreign keys are fetched once and shared by every
+    form, rather than queried again for each row.
+    """
+
+    max_rows = None
+    changelist_url = None
+
+    def __init__(self, *args, **kwargs):
+        self.shared_choices = {}
+        super().__init__(*args, **kwargs)
+
+    def get_queryset(self):
+        if not hasattr(self, "_queryset"):
+            queryset = super().get_queryset()
+            if self.max_rows is not None:
+                queryset = queryset[: self.max_rows]
+            self._queryset = queryset
+        return self._queryset
+
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        for name, field in form.fields.items():
+            widget = getattr(field.widget, "widget", field.widget)
+            if not isinstance(field, ModelChoiceField) or isinstance(
+                widget, (AutocompleteMixin, ForeignKeyRawIdWidget)
+            ):
+                continue
+            if name not in self.shared_choices:
+                self.shared_choices[name] = list(field.choices)
+            # The admin wraps the select, and the wrapper keeps its own copy
+            field.choices = widget.choices = self.shared_choices[name]
+
+
+class RecentInline(admin.TabularInline):
+    """Read-only view of the latest rows, with blank rows to add more.
+
+    Existing rows link to their own change page; the full history is one
+    click away in the changelist, filtered to the parent. Put user foreign
+    keys in ``autocomplete_fields`` or ``raw_id_fields`` so the add rows
+    don't list every user.
+    """
+
+    formset = RecentInlineFormSet
+    template = "admin/edit_inline/recent_tabular.html"
+    max_rows = 10
+    ordering = ["-created_at", "-id"]
+    extra = 1
+    can_delete = False
+    show_change_link = True
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        related = foreign_keys(self.model, self.get_fields(request))
+        return queryset.select_related(*related) if related else queryset
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.max_rows = self.max_rows
+        formset.changelist_url = self.changelist_url(formset.fk, obj)
+        return formset
+
+    def changelist_url(self, fk, obj):
+        """The model's changelist filtered to ``obj``, if it has one"""
+        if obj is None or obj.pk is None:
+            return None
+        opts = self.model._meta
+        try:
+            url = reverse(
+                f"{self.admin_site.name}:{opts.app_label}_{opts.model_name}_changelist"
+            )
+        except NoReverseMatch:
+            return None
+        return f"{url}?{urlencode({f'{fk.name}__id__exact': obj.pk})}"
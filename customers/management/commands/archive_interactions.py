@@ -0,0 +1,49 @@
+# customers/management/commands/archive_interactions.py
+
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from customers.archive import archive_batch, archive_cutoff
+from customers.models import Interaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Move interactions older than INTERACTION_ARCHIVE_AFTER_DAYS into the "
+        "archive table, in batches (safe to run while the site is up)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Archive interactions older than this many days "
+            "(default: INTERACTION_ARCHIVE_AFTER_DAYS)",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.INTERACTION_ARCHIVE_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the interactions that would be archived",
+        )
+
+    def handle(self, *args, **options):
+        before = archive_cutoff(options["days"])
+        if options["dry_run"]:
+            due = Interaction.objects.filter(created_at__lt=before).count()
+            self.stdout.write(f"{due} interactions created before {before:%Y-%m-%d}.")
+            return
+
+        start = time.perf_counter()
+        archived = 0
+        while moved := archive_batch(before, options["batch_size"]):
+            archived += moved
+            self.stdout.write(f"Archived {archived} interactions...")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {archived} interactions created before "
+                f"{before:%Y-%m-%d} in {time.perf_counter() - start:.1f}s."
+            )
+        )
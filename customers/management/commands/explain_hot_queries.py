@@ -0,0 +1,99 @@
+# customers/management/commands/explain_hot_queries.py
+
+import datetime
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from customers.models import Customer, Deal, Interaction
+
+
+def hot_queries(customer_id, user_id):
+    """The CRM's most frequent list/filter queries, keyed by a short label"""
+    today = timezone.now().date()
+    recent = timezone.now() - datetime.timedelta(days=30)
+    return {
+        "customer changelist": Customer.objects.all()[:100],
+        "customer by lead_status": Customer.objects.filter(lead_status="new")[:100],
+        "customer by lead_source": Customer.objects.filter(
+            lead_source="Website Contact Form"
+        )[:100],
+        "customer by assigned_to": Customer.objects.filter(assigned_to_id=user_id)[
+            :100
+        ],
+        "customer created since": Customer.objects.filter(created_at__gte=recent)[:100],
+        "deal changelist": Deal.objects.all()[:100],
+        "deal by stage + close date": Deal.objects.filter(
+            stage="negotiation",
+            expected_close_date__range=(today, today + datetime.timedelta(days=90)),
+        )[:100],
+        "deal by assigned_to": Deal.objects.filter(assigned_to_id=user_id)[:100],
+        "portal deals page": Deal.objects.filter(customer_id=customer_id).order_by(
+            "-created_at", "-id"
+        )[:26],
+        "interaction changelist": Interaction.objects.all()[:100],
+        "interaction by type": Interaction.objects.filter(interaction_type="call")[
+            :100
+        ],
+        "interaction by user": Interaction.objects.filter(user_id=user_id)[:100],
+        "portal interactions page": Interaction.objects.filter(
+            customer_id=customer_id
+        ).order_by("-created_at", "-id")[:26],
+    }
+
+
+def uses_full_scan(plan):
+    """Heuristic: does the plan read a whole table instead of an index?"""
+    if connection.vendor == "postgresql":
+        return "Seq Scan" in plan
+    # SQLite reports "SCAN <table>" for full scans and
+    # "SCAN <table> USING INDEX ..." / "SEARCH ..." for index access
+    return any(
+        "SCAN" in line and "USING" not in line and "TEMP B-TREE" not in line
+        for line in plan.splitlines()
+    )
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN on the hot CRM queries to verify index usage"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Execute the queries and report actual timings (PostgreSQL only)",
+        )
+        parser.add_argument(
+            "--only", help="Only explain queries whose label contains this text"
+        )
+
+    def handle(self, *args, **options):
+        # Any existing ids will do; the plans only depend on the shape
+        customer_id = Customer.objects.values_list("pk", flat=True).first() or 1
+        user_id = User.objects.values_list("pk", flat=True).first() or 1
+
+        explain_options = {}
+        if options["analyze"]:
+            if connection.vendor == "postgresql":
+                explain_options = {"analyze": True, "buffers": True}
+            else:
+                self.stderr.write("--analyze is only supported on PostgreSQL.")
+
+        self.stdout.write(f"Database vendor: {connection.vendor}\n")
+        full_scans = []
+        for label, queryset in hot_queries(customer_id, user_id).items():
+            if options["only"] and options["only"] not in label:
+                continue
+
+            plan = queryset.explain(**explain_options)
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(plan + "\n")
+            if uses_full_scan(plan):
+                full_scans.append(label)
+
+        if full_scans:
+            self.stdout.write(
+                self.style.WARNING("Full table scans: " + ", ".join(full_scans))
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS("All hot queries use an index."))
@@ -0,0 +1,93 @@
+# customers/management/commands/find_duplicates.py
+
+import time
+from django.core.management.base import BaseCommand
+from customers import counters, scoring
+from customers.dedupe import (
+    company_duplicates,
+    customer_duplicates,
+    merge_duplicates,
+    normalize_company_name,
+)
+from customers.models import Company, Customer
+
+
+class Command(BaseCommand):
+    help = (
+        "Group near-duplicate companies and customers, and optionally merge "
+        "each group into its oldest record"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model", choices=["companies", "customers", "all"], default="all"
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            help="Trigram similarity needed to match (default: 0.75 for "
+            "companies, 0.9 for customer names at the same email domain)",
+        )
+        parser.add_argument(
+            "--merge",
+            action="store_true",
+            help="Repoint related rows to the oldest record and delete the rest",
+        )
+        parser.add_argument(
+            "--show", type=int, default=20, help="Number of groups to print"
+        )
+
+    def handle(self, *args, **options):
+        if options["model"] in ("companies", "all"):
+            self.backfill_company_names()
+            self.run(
+                Company,
+                company_duplicates,
+                options,
+                lambda c: f"{c.name} (#{c.pk})",
+            )
+        if options["model"] in ("customers", "all"):
+            self.run(
+                Customer,
+                customer_duplicates,
+                options,
+                lambda c: f"{c.first_name} {c.last_name} <{c.email}> (#{c.pk})",
+            )
+
+    def backfill_company_names(self):
+        """Fill normalized_name on companies saved before the field existed"""
+        stale = []
+        for company in Company.objects.filter(normalized_name="").only("name"):
+            company.normalized_name = normalize_company_name(company.name)
+            if company.normalized_name:
+                stale.append(company)
+        Company.objects.bulk_update(stale, ["normalized_name"], batch_size=1000)
+
+    def run(self, model, find, options, describe):
+        label = model._meta.verbose_name_plural
+        start = time.perf_counter()
+        kwargs = {"threshold": options["threshold"]} if options["threshold"] else {}
+        groups = find(**kwargs)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"{len(groups)} groups of duplicate {label} "
+            f"({sum(len(g) - 1 for g in groups)} duplicates) found in {elapsed:.1f}s"
+        )
+
+        shown = groups[: options["show"]]
+        records = model._base_manager.in_bulk([pk for g in shown for pk in g])
+        for group in shown:
+            keep, *rest = group
+            self.stdout.write(f"  keep {describe(records[keep])}")
+            for pk in rest:
+                self.stdout.write(f"    merge {describe(records[pk])}")
+
+        if options["merge"] and groups:
+            removed = merge_duplicates(model, groups)
+            # Rows were repointed with UPDATEs, which the signal handlers
+            # keeping counters and scores current never see
+            counters.rebuild_customers()
+            counters.rebuild_companies()
+            if model is Customer:
+                scoring.recompute()
+            self.stdout.write(self.style.SUCCESS(f"Merged {removed} {label}."))
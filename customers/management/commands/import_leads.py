@@ -0,0 +1,183 @@
+# customers/management/commands/import_leads.py
+
+import csv
+import json
+import time
+from itertools import islice
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from customers.counters import customers_moved
+from customers.dedupe import normalize_company_name
+from customers.models import Company, Customer
+
+# Customer fields an import row may set; anything else in the file is ignored
+IMPORT_FIELDS = [
+    "first_name",
+    "last_name",
+    "phone",
+    "position",
+    "lead_status",
+    "lead_source",
+]
+
+LEAD_STATUSES = {status for status, _ in Customer.LEAD_STATUS_CHOICES}
+
+
+def read_rows(path, fmt):
+    """Stream rows from a CSV or JSONL file as dicts"""
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def text(value):
+    """A row value as stripped text; JSONL values may be numbers or null"""
+    if value is None or isinstance(value, bool):
+        return ""
+    return str(value).strip()
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = "Import leads from a CSV or JSONL file with batched upserts on email"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSONL file to import")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl"],
+            help="File format (default: guessed from the file extension)",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument(
+            "--lead-source",
+            default="Import",
+            help="lead_source for rows that do not provide one",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"{path} does not exist.")
+        fmt = options["format"] or (
+            "jsonl" if path.suffix in (".jsonl", ".ndjson") else "csv"
+        )
+
+        # Company names are resolved in memory by normalized name, so
+        # spelling variants map to one company; only ids are kept
+        self.companies = {}
+        for pk, name in Company.objects.order_by("pk").values_list("pk", "name"):
+            self.companies.setdefault(normalize_company_name(name), pk)
+        self.default_source = options["lead_source"]
+
+        imported = skipped = 0
+        start = time.perf_counter()
+        for batch in batched(read_rows(path, fmt), options["batch_size"]):
+            with transaction.atomic():
+                written, rejected = self.import_batch(batch)
+            imported += written
+            skipped += rejected
+
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{imported} rows imported ({imported / elapsed:,.0f} rows/sec)"
+            )
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {imported} rows in {elapsed:.1f}s "
+                f"({imported / elapsed if elapsed else 0:,.0f} rows/sec), "
+                f"skipped {skipped}."
+            )
+        )
+
+    def import_batch(self, rows):
+        """Upsert one batch of rows; return (written, skipped) counts"""
+        new_names = {}
+        for row in rows:
+            name = text(row.get("company"))
+            key = normalize_company_name(name)
+            if key and key not in self.companies:
+                new_names.setdefault(key, name)
+        created = Company.objects.bulk_create(
+            [
+                Company(name=name, normalized_name=key, industry="Unknown")
+                for key, name in new_names.items()
+            ]
+        )
+        for company in created:
+            self.companies[company.normalized_name] = company.pk
+
+        customers = {}
+        skipped = 0
+        for row in rows:
+            email = text(row.get("email"))
+            if not email:
+                skipped += 1
+                continue
+
+            values = {field: text(row.get(field)) for field in IMPORT_FIELDS}
+            values = {field: value for field, value in values.items() if value}
+            name = text(row.get("name"))
+            if "first_name" not in values and name:
+                # Split name
+                name_parts = name.split(" ", 1)
+                values["first_name"] = name_parts[0]
+                values["last_name"] = name_parts[1] if len(name_parts) > 1 else ""
+            if values.get("lead_status") not in LEAD_STATUSES:
+                values.pop("lead_status", None)
+            # Only the columns the row provides overwrite an existing
+            # customer; the defaults below apply when it is inserted
+            provided = set(values)
+            company = normalize_company_name(text(row.get("company")))
+            if company:
+                provided.add("company")
+            values.setdefault("lead_status", "new")
+            values.setdefault("lead_source", self.default_source)
+
+            # Later rows for the same email win, as they would when upserting
+            customers[email] = (
+                Customer(email=email, company_id=self.companies.get(company), **values),
+                frozenset(provided),
+            )
+
+        # Upserts send no signals; note the companies of existing customers
+        # whose rows set one, to move their counters afterwards
+        old_companies = dict(
+            Customer.objects.filter(
+                email__in=[
+                    customer.email
+                    for customer, provided in customers.values()
+                    if "company" in provided
+                ]
+            ).values_list("pk", "company_id")
+        )
+
+        # One upsert per set of provided columns
+        groups = {}
+        for customer, provided in customers.values():
+            groups.setdefault(provided, []).append(customer)
+        for provided, group in groups.items():
+            if provided:
+                Customer.objects.bulk_create(
+                    group,
+                    update_conflicts=True,
+                    unique_fields=["email"],
+                    update_fields=sorted(provided) + ["updated_at"],
+                )
+            else:
+                # Nothing to update, only insert the new emails
+                Customer.objects.bulk_create(group, ignore_conflicts=True)
+        customers_moved(old_companies)
+        return len(customers), skipped
@@ -0,0 +1,40 @@
+# customers/management/commands/process_leads.py
+
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from customers.ingest import process_pending
+
+
+class Command(BaseCommand):
+    help = "Process queued lead submissions (DB-backed ingest worker)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.LEAD_INGEST_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for new submissions instead of exiting when drained",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep between polls when the queue is empty",
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            processed = process_pending(options["batch_size"])
+            total += processed
+            if processed:
+                self.stdout.write(f"Processed {processed} submissions")
+            elif options["loop"]:
+                time.sleep(options["interval"])
+            else:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f"Done, {total} submissions processed."))
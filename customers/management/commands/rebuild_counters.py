@@ -0,0 +1,24 @@
+# customers/management/commands/rebuild_counters.py
+
+from django.core.management.base import BaseCommand
+from customers import counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconcile the interaction/open-deal counters on customers and "
+        "companies with the source tables"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        customers = counters.rebuild_customers(options["batch_size"])
+        companies = counters.rebuild_companies(options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Counters rebuilt; fixed {customers} customers and "
+                f"{companies} companies."
+            )
+        )
@@ -0,0 +1,16 @@
+# customers/management/commands/rebuild_search_index.py
+
+from django.core.management.base import BaseCommand
+from customers.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Create the full-text search structures and repopulate them"
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        backend.install()
+        backend.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Search index rebuilt ({type(backend).__name__}).")
+        )
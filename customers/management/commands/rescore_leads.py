@@ -0,0 +1,31 @@
+# customers/management/commands/rescore_leads.py
+
+import time
+from django.core.management.base import BaseCommand
+from customers import scoring
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every customer's lead score from interactions and deals "
+        "(run daily so recency points decay)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=10_000,
+            help="Customers read and aggregated per round trip",
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        updated = scoring.recompute(options["batch_size"], options["chunk_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rescored leads in {time.perf_counter() - start:.1f}s; "
+                f"{updated} customers changed."
+            )
+        )
@@ -0,0 +1,305 @@
+# customers/management/commands/seed_benchmark.py
+
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from analytics import rollups
+from customers import counters, scoring
+from customers.dedupe import normalize_company_name
+from customers.models import Company, Customer, Deal, Interaction
+
+FIRST_NAMES = """
+James Mary Robert Patricia John Jennifer Michael Linda David Elizabeth Wei
+Priya Carlos Fatima Kenji Olga Ahmed Sofia Liam Amara
+""".split()
+LAST_NAMES = """
+Smith Johnson Williams Brown Jones Garcia Miller Davis Martinez Lopez Chen
+Patel Kim Nguyen Silva Kowalski Okafor Haddad Novak Tanaka
+""".split()
+COMPANY_WORDS = """
+Acme Globex Initech Umbrella Stark Wayne Vertex Summit Northwind Bluesky
+Pioneer Quantum Evergreen Redwood Atlas Nimbus Harbor Sterling Keystone Apex
+""".split()
+COMPANY_SUFFIXES = ["Inc", "LLC", "Ltd", "GmbH", "Group", "Labs", "Systems"]
+INDUSTRIES = """
+Software Healthcare Pharmaceuticals Retail Manufacturing Finance Logistics
+Education Hospitality Energy
+""".split()
+POSITIONS = ["CEO", "CTO", "Head of Sales", "Buyer", "Office Manager", "Engineer", ""]
+SOURCES = ["website", "referral", "ads", "event", "trial", "import", ""]
+
+# Roughly how a real pipeline is spread; weights follow the choices' order
+SIZES = [size for size, _ in Company._meta.get_field("size").choices]
+SIZE_WEIGHTS = [30, 30, 20, 15, 5]
+STATUSES = [status for status, _ in Customer.LEAD_STATUS_CHOICES]
+STATUS_WEIGHTS = [30, 25, 15, 10, 10, 10]
+STAGES = [stage for stage, _ in Deal.DEAL_STAGES]
+STAGE_WEIGHTS = [25, 20, 15, 10, 15, 15]
+STAGE_PROBABILITY = {
+    "prospecting": 10,
+    "qualification": 25,
+    "proposal": 50,
+    "negotiation": 75,
+    "closed_won": 100,
+    "closed_lost": 0,
+}
+INTERACTION_TYPES = [kind for kind, _ in Interaction.INTERACTION_TYPES]
+
+# Portal accounts sign in with this password
+PORTAL_PASSWORD = "benchmark"
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create keep the created_at/updated_at values it is given"""
+    fields = [
+        field
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill an empty database with generated companies, customers, deals "
+        "and interactions for benchmarks"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--customers", type=int, default=10_000)
+        parser.add_argument(
+            "--companies",
+            type=int,
+            help="Number of companies (default: one per 10 customers)",
+        )
+        parser.add_argument(
+            "--deals",
+            type=float,
+            default=2,
+            help="Average deals per customer",
+        )
+        parser.add_argument(
+            "--interactions",
+            type=float,
+            default=5,
+            help="Average interactions per customer",
+        )
+        parser.add_argument("--users", type=int, default=50, help="Sales reps")
+        parser.add_argument(
+            "--portal-users",
+            type=int,
+            default=100,
+            help=f"Customers given a portal login (password {PORTAL_PASSWORD!r})",
+        )
+        parser.add_argument(
+            "--days", type=int, default=730, help="Span of the generated history"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if Customer.objects.exists():
+            raise CommandError("The database already has customers; seed an empty one.")
+
+        self.random = random.Random(options["seed"])
+        self.now = timezone.now()
+        self.span = options["days"] * 86400
+        batch_size = options["batch_size"]
+        customers = options["customers"]
+        start = time.perf_counter()
+
+        with explicit_timestamps(Company, Customer, Deal, Interaction):
+            with transaction.atomic():
+                self.users = self.create_users(options["users"])
+                self.companies = self.create_companies(
+                    options["companies"] or max(1, customers // 10), batch_size
+                )
+            totals = [0, 0, 0]
+            for offset in range(0, customers, batch_size):
+                with transaction.atomic():
+                    counts = self.create_batch(
+                        offset,
+                        min(batch_size, customers - offset),
+                        options["deals"],
+                        options["interactions"],
+                    )
+                totals = [a + b for a, b in zip(totals, counts)]
+                self.stdout.write(
+                    f"{offset + counts[0]} customers, {totals[1]} deals, "
+                    f"{totals[2]} interactions"
+                )
+        self.create_portal_users(options["portal_users"])
+
+        # Grouped queries over the rows just written
+        counters.rebuild_companies(batch_size)
+        rollups.rebuild()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {totals[0]} customers, {len(self.companies)} companies, "
+                f"{totals[1]} deals and {totals[2]} interactions in "
+                f"{time.perf_counter() - start:.1f}s."
+            )
+        )
+
+    def moment(self, after=None):
+        """A random time in the seeded span, later than ``after`` if given"""
+        earliest = (self.now - after).total_seconds() if after else self.span
+        return self.now - timedelta(seconds=self.random.uniform(0, earliest))
+
+    def count(self, average):
+        """A per-customer count around ``average``, skewed like real accounts"""
+        return round(self.random.expovariate(1 / average)) if average > 0 else 0
+
+    def create_users(self, count):
+        return User.objects.bulk_create(
+            User(
+                username=f"rep{i}",
+                email=f"rep{i}@flowtada.example",
+                first_name=self.random.choice(FIRST_NAMES),
+                last_name=self.random.choice(LAST_NAMES),
+                is_staff=True,
+            )
+            for i in range(count)
+        )
+
+    def create_companies(self, count, batch_size):
+        rng = self.random
+        companies = []
+        for i in range(count):
+            name = (
+                f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_WORDS)} "
+                f"{rng.choice(COMPANY_SUFFIXES)} {i}"
+            )
+            created = self.moment()
+            companies.append(
+                Company(
+                    name=name,
+                    # save() sets this, bulk_create does not
+                    normalized_name=normalize_company_name(name),
+                    website=f"https://company{i}.example.com",
+                    industry=rng.choice(INDUSTRIES),
+                    size=rng.choices(SIZES, SIZE_WEIGHTS)[0],
+                    created_at=created,
+                    updated_at=created,
+                )
+            )
+        return [
+            company.pk for company in Company.objects.bulk_create(companies, batch_size)
+        ]
+
+    def create_batch(self, offset, size, deals, interactions):
+        """Create ``size`` customers with their deals and interactions.
+
+        Each customer's counters and lead score are filled in from the rows
+        generated for it, the way customers.counters and customers.scoring
+        would have left them, so nothing needs rebuilding afterwards.
+        """
+        rng = self.random
+        customers, new_deals, new_interactions = [], [], []
+        for i in range(offset, offset + size):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            created = self.moment()
+            customer = Customer(
+                first_name=first,
+                last_name=last,
+                email=f"{first.lower()}.{last.lower()}.{i}@customer.example",
+                phone=f"+1555{i:07d}"[-12:],
+                company_id=rng.choice(self.companies) if rng.random() < 0.8 else None,
+                position=rng.choice(POSITIONS),
+                lead_status=rng.choices(STATUSES, STATUS_WEIGHTS)[0],
+                lead_source=rng.choice(SOURCES),
+                assigned_to=rng.choice(self.users) if rng.random() < 0.9 else None,
+                created_at=created,
+                updated_at=created,
+            )
+            customers.append(customer)
+            owner = customer.assigned_to
+
+            for n in range(self.count(deals)):
+                stage = rng.choices(STAGES, STAGE_WEIGHTS)[0]
+                deal = Deal(
+                    customer=customer,
+                    title=f"{last} deal {n + 1}",
+                    value=Decimal(rng.randrange(500_00, 250_000_00)) / 100,
+                    stage=stage,
+                    probability=STAGE_PROBABILITY[stage],
+                    assigned_to=owner or rng.choice(self.users),
+                    created_at=self.moment(created),
+                )
+                deal.updated_at = deal.created_at
+                deal.expected_close_date = (
+                    deal.created_at + timedelta(days=rng.randint(14, 180))
+                ).date()
+                new_deals.append(deal)
+                customer.open_deal_value += counters.open_value(stage, deal.value)
+                customer.score_pipeline += scoring.deal_points(
+                    stage, deal.value, deal.probability
+                )
+
+            for n in range(self.count(interactions)):
+                kind = rng.choice(INTERACTION_TYPES)
+                interaction = Interaction(
+                    customer=customer,
+                    interaction_type=kind,
+                    subject=f"{kind.replace('_', ' ').title()} {n + 1}",
+                    notes="Generated for benchmarks.",
+                    user=owner or rng.choice(self.users),
+                    created_at=self.moment(created),
+                )
+                new_interactions.append(interaction)
+                customer.interaction_count += 1
+                customer.score_engagement += scoring.INTERACTION_POINTS[kind]
+                if (
+                    customer.last_interaction_at is None
+                    or interaction.created_at > customer.last_interaction_at
+                ):
+                    customer.last_interaction_at = interaction.created_at
+
+            if customer.last_interaction_at:
+                customer.last_contacted = customer.last_interaction_at
+                days = (self.now - customer.last_contacted).days
+                customer.score_recency = max(0, scoring.RECENCY_POINTS - days)
+            customer.lead_score = (
+                customer.score_engagement
+                + customer.score_pipeline
+                + customer.score_recency
+            )
+
+        # Deals and interactions pick up their customer's new primary key
+        Customer.objects.bulk_create(customers)
+        Deal.objects.bulk_create(new_deals)
+        Interaction.objects.bulk_create(new_interactions)
+        return len(customers), len(new_deals), len(new_interactions)
+
+    def create_portal_users(self, count):
+        """Portal logins for the first ``count`` customers, sharing one hash"""
+        password = make_password(PORTAL_PASSWORD)
+        User.objects.bulk_create(
+            User(
+                username=email,
+                email=email,
+                first_name=first_name,
+                last_name=last_name,
+                password=password,
+            )
+            for email, first_name, last_name in Customer.objects.order_by(
+                "pk"
+            ).values_list("email", "first_name", "last_name")[:count]
+        )
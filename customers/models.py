@@ -1,14 +1,46 @@
 # customers/models.py
 
 from django.db import models
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.urls import reverse
+from .dedupe import normalize_company_name
 
 
-class Company(models.Model):
+class DenormalizedModel(models.Model):
+    """Base for models with fields maintained in place by F() updates.
+
+    Those fields are listed in ``DENORMALIZED_FIELDS``. A plain save() of an
+    existing row leaves them out, so an instance loaded before an update
+    cannot write back its stale copies.
+    """
+
+    DENORMALIZED_FIELDS = set()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        ):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DENORMALIZED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+
+class Company(DenormalizedModel):
     """Company/Organization model"""
 
     name = models.CharField(max_length=200)
+    # Matching key for near-duplicate names, see customers.dedupe
+    normalized_name = models.CharField(max_length=200, blank=True, editable=False)
     website = models.URLField(blank=True)
     industry = models.CharField(max_length=100, blank=True)
     size = models.CharField(
@@ -25,15 +57,39 @@ class Company(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Activity rolled up from the company's customers, see customers.counters
+    interaction_count = models.IntegerField(default=0, editable=False)
+    open_deal_value = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, editable=False
+    )
+    last_interaction_at = models.DateTimeField(null=True, editable=False)
+
+    DENORMALIZED_FIELDS = {
+        "interaction_count",
+        "open_deal_value",
+        "last_interaction_at",
+    }
+
     class Meta:
         verbose_name_plural = "Companies"
         ordering = ["name"]
+        indexes = [
+            # Ingest matches incoming company names on their normalized form
+            models.Index(fields=["normalized_name"], name="company_normalized_name"),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_company_name(self.name)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "normalized_name"}
+        super().save(*args, **kwargs)
 
-class Customer(models.Model):
+
+class Customer(DenormalizedModel):
     """Customer contact model"""
 
     LEAD_STATUS_CHOICES = [
@@ -68,8 +124,53 @@ class Customer(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     last_contacted = models.DateTimeField(null=True, blank=True)
 
+    # Lead scoring, maintained by customers.scoring; lead_score is the sum
+    # of the three components
+    score_engagement = models.IntegerField(default=0, editable=False)
+    score_pipeline = models.IntegerField(default=0, editable=False)
+    score_recency = models.IntegerField(default=0, editable=False)
+    lead_score = models.IntegerField(default=0, editable=False)
+
+    # Activity summary, maintained by customers.counters
+    interaction_count = models.IntegerField(default=0, editable=False)
+    open_deal_value = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, editable=False
+    )
+    last_interaction_at = models.DateTimeField(null=True, editable=False)
+
+    DENORMALIZED_FIELDS = {
+        "last_contacted",
+        "score_engagement",
+        "score_pipeline",
+        "score_recency",
+        "lead_score",
+        "interaction_count",
+        "open_deal_value",
+        "last_interaction_at",
+    }
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Default ordering and the admin date hierarchy/filter
+            models.Index(fields=["-created_at"], name="customer_recent"),
+            # Admin list_filter paths, each paired with the default ordering
+            models.Index(
+                fields=["lead_status", "-created_at"], name="customer_status_recent"
+            ),
+            models.Index(
+                fields=["lead_source", "-created_at"], name="customer_source_recent"
+            ),
+            models.Index(
+                fields=["assigned_to", "-created_at"], name="customer_assignee_recent"
+            ),
+            # Incremental exports
+            models.Index(fields=["updated_at"], name="customer_updated"),
+            # Top leads per sales rep
+            models.Index(
+                fields=["assigned_to", "-lead_score"], name="customer_assignee_score"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
@@ -105,11 +206,90 @@ class Interaction(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Portal history pages: keyset pagination per customer
+            models.Index(
+                fields=["customer", "-created_at", "-id"],
+                name="interaction_customer_recent",
+            ),
+            models.Index(fields=["-created_at"], name="interaction_recent"),
+            models.Index(
+                fields=["interaction_type", "-created_at"],
+                name="interaction_type_recent",
+            ),
+            models.Index(
+                fields=["user", "-created_at"], name="interaction_user_recent"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.interaction_type}: {self.subject}"
 
 
+class InteractionArchive(models.Model):
+    """Interactions moved out of the live table, see customers.archive.
+
+    Rows keep their Interaction primary key and timestamps, so they sort
+    and paginate together with the live rows.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    customer = models.ForeignKey(
+        Customer, on_delete=models.CASCADE, related_name="archived_interactions"
+    )
+    interaction_type = models.CharField(
+        max_length=20, choices=Interaction.INTERACTION_TYPES
+    )
+    subject = models.CharField(max_length=200)
+    notes = models.TextField()
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="archived_interactions"
+    )
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "archived interaction"
+        ordering = ["-created_at"]
+        indexes = [
+            # Read-through from the portal and admin history, per customer
+            models.Index(
+                fields=["customer", "-created_at", "-id"],
+                name="archive_customer_recent",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.interaction_type}: {self.subject}"
+
+
+class DealQuerySet(models.QuerySet):
+    STATS = {
+        "total_deals": Count("id"),
+        "won_deals": Count("id", filter=Q(stage="closed_won")),
+        "total_value": Coalesce(
+            Sum("value"),
+            Value(0),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+    }
+
+    @staticmethod
+    def _with_success_rate(stats):
+        total_deals = stats["total_deals"]
+        stats["success_rate"] = round(
+            (stats["won_deals"] / total_deals * 100) if total_deals > 0 else 0, 1
+        )
+        return stats
+
+    def stats(self):
+        """Total/won/value/success-rate for the queryset in one aggregate query"""
+        return self._with_success_rate(self.order_by().aggregate(**self.STATS))
+
+    async def astats(self):
+        return self._with_success_rate(await self.order_by().aaggregate(**self.STATS))
+
+
 class Deal(models.Model):
     """Sales deal/opportunity"""
 
@@ -137,8 +317,62 @@ class Deal(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = DealQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Portal deal list: keyset pagination per customer
+            models.Index(
+                fields=["customer", "-created_at", "-id"],
+                name="deal_customer_recent",
+            ),
+            models.Index(fields=["-created_at"], name="deal_recent"),
+            # Admin stage filter combined with the close-date filter
+            models.Index(
+                fields=["stage", "expected_close_date"], name="deal_stage_close"
+            ),
+            models.Index(
+                fields=["assigned_to", "-created_at"], name="deal_assignee_recent"
+            ),
+            # Incremental exports
+            models.Index(fields=["updated_at"], name="deal_updated"),
+        ]
 
     def __str__(self):
         return f"{self.title} - ${self.value}"
+
+
+class LeadSubmission(models.Model):
+    """Queued lead from a public form, turned into CRM records by a worker"""
+
+    SOURCE_CHOICES = [
+        ("contact", "Website Contact Form"),
+        ("trial", "Free Trial Signup"),
+    ]
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("processing", "Processing"),
+        ("processed", "Processed"),
+        ("failed", "Failed"),
+    ]
+
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when a worker claims the submission, see customers.ingest
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            # Workers claim the oldest pending submissions first
+            models.Index(fields=["status", "id"], name="leadsubmission_queue"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_source_display()}: {self.payload.get('email', '')}"
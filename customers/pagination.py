@@ -0,0 +1,11 @@
+# customers/pagination.py
+
+from rest_framework.pagination import CursorPagination
+
+
+class RecentFirstCursorPagination(CursorPagination):
+    """Cursor pagination on (-created_at, -id); page N costs the same as page 1"""
+
+    ordering = ("-created_at", "-id")
+    page_size_query_param = "page_size"
+    max_page_size = 500
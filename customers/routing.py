@@ -0,0 +1,8 @@
+# customers/routing.py
+
+from django.urls import path
+from .consumers import CRMEventConsumer
+
+websocket_urlpatterns = [
+    path("ws/events/", CRMEventConsumer.as_asgi()),
+]
@@ -0,0 +1,289 @@
+# customers/scoring.py
+
+"""Lead scores stored on Customer.
+
+A customer's ``lead_score`` is the sum of three components:
+
+* ``score_engagement``: points per interaction, by type;
+* ``score_pipeline``: points per deal, for the probability-weighted value
+  of open deals plus a fixed bonus per won deal;
+* ``score_recency``: ``RECENCY_POINTS`` on the day of the last contact,
+  one point less for each day since.
+
+Saves and deletes of interactions and deals adjust the first two
+components with F() updates, and a new interaction resets recency. Every
+score write also stamps ``updated_at``, which the API's validators and the
+incremental exports key off. Recency
+decays with time alone, so run ``manage.py rescore_leads`` daily; it
+recomputes every score from scratch with numpy.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import Customer, Deal, Interaction, InteractionArchive
+from .signals import deals_bulk_updated, interactions_bulk_created
+from .snapshots import cascades_from_customer, stored_values
+
+INTERACTION_POINTS = {
+    "call": 5,
+    "email": 2,
+    "meeting": 10,
+    "demo": 15,
+    "proposal": 20,
+    "follow_up": 3,
+}
+
+# Weighted deal value (value * probability) per pipeline point, and the most
+# any one open deal can contribute
+PIPELINE_UNIT = 1000
+MAX_DEAL_POINTS = 100
+WON_DEAL_POINTS = 50
+
+RECENCY_POINTS = 30
+
+SCORE_FIELDS = ["score_engagement", "score_pipeline", "score_recency", "lead_score"]
+
+
+def deal_points(stage, value, probability):
+    if stage == "closed_won":
+        return WON_DEAL_POINTS
+    if stage == "closed_lost":
+        return 0
+    # Integer cents so the vectorized recompute rounds identically
+    cents = int(Decimal(value) * 100)
+    return min(MAX_DEAL_POINTS, cents * probability // (100 * 100 * PIPELINE_UNIT))
+
+
+def top_leads(assignee, limit=100):
+    """The assignee's highest-scoring customers (one index range scan)"""
+    return Customer.objects.filter(assigned_to=assignee).order_by("-lead_score")[:limit]
+
+
+def add_points(field, deltas):
+    """Add ``{customer_id: points}`` to one score component and the total.
+
+    Customers are grouped by delta, so a batch costs one UPDATE per
+    distinct number of points rather than one per customer.
+    """
+    by_delta = defaultdict(list)
+    for customer_id, delta in deltas.items():
+        if delta and customer_id is not None:
+            by_delta[delta].append(customer_id)
+    for delta, customer_ids in by_delta.items():
+        Customer.objects.filter(pk__in=customer_ids).update(
+            **{field: F(field) + delta, "lead_score": F("lead_score") + delta},
+            updated_at=timezone.now(),
+        )
+
+
+def mark_contacted(customer_ids, when):
+    """Record a contact at ``when``: full recency points again"""
+    if customer_ids:
+        Customer.objects.filter(pk__in=customer_ids).update(
+            last_contacted=when,
+            lead_score=F("lead_score") - F("score_recency") + RECENCY_POINTS,
+            score_recency=RECENCY_POINTS,
+            updated_at=timezone.now(),
+        )
+
+
+# Each deal/interaction as (customer_id, points) before and after a change
+def interaction_state(customer_id, interaction_type):
+    return customer_id, INTERACTION_POINTS.get(interaction_type, 0)
+
+
+def deal_state(customer_id, stage, value, probability):
+    return customer_id, deal_points(stage, value, probability)
+
+
+def apply_changes(field, changes):
+    """Apply ``(old_state, new_state)`` pairs; either side may be None"""
+    deltas = defaultdict(int)
+    for old, new in changes:
+        for state, sign in ((old, -1), (new, 1)):
+            if state is not None:
+                customer_id, points = state
+                deltas[customer_id] += sign * points
+    add_points(field, deltas)
+
+
+@receiver(post_save, sender=Interaction)
+def score_interaction(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = stored_values(instance)
+    if old is not None:
+        old = interaction_state(old["customer_id"], old["interaction_type"])
+    new = interaction_state(instance.customer_id, instance.interaction_type)
+    with transaction.atomic():
+        apply_changes("score_engagement", [(old, new)])
+        if created:
+            mark_contacted([instance.customer_id], instance.created_at)
+
+
+@receiver(post_delete, sender=Interaction)
+def unscore_interaction(sender, instance, origin=None, **kwargs):
+    if cascades_from_customer(origin):
+        # The customer and its score are going too
+        return
+    old = interaction_state(instance.customer_id, instance.interaction_type)
+    apply_changes("score_engagement", [(old, None)])
+
+
+@receiver(interactions_bulk_created, sender=Interaction)
+def score_bulk_interactions(sender, interactions, **kwargs):
+    apply_changes(
+        "score_engagement",
+        [
+            (None, interaction_state(i.customer_id, i.interaction_type))
+            for i in interactions
+        ],
+    )
+    if interactions:
+        mark_contacted(
+            {i.customer_id for i in interactions},
+            max(i.created_at for i in interactions),
+        )
+
+
+def state_of_deal(deal):
+    return deal_state(deal.customer_id, deal.stage, deal.value, deal.probability)
+
+
+@receiver(post_save, sender=Deal)
+def score_deal(sender, instance, raw=False, **kwargs):
+    if not raw:
+        old = stored_values(instance)
+        if old is not None:
+            old = deal_state(
+                old["customer_id"], old["stage"], old["value"], old["probability"]
+            )
+        apply_changes("score_pipeline", [(old, state_of_deal(instance))])
+
+
+@receiver(post_delete, sender=Deal)
+def unscore_deal(sender, instance, origin=None, **kwargs):
+    if cascades_from_customer(origin):
+        return
+    apply_changes("score_pipeline", [(state_of_deal(instance), None)])
+
+
+@receiver(deals_bulk_updated, sender=Deal)
+def score_bulk_deals(sender, deals, previous, **kwargs):
+    apply_changes(
+        "score_pipeline",
+        [(state_of_deal(previous[deal.pk]), state_of_deal(deal)) for deal in deals],
+    )
+
+
+def recompute(batch_size=1000, chunk_size=10_000):
+    """Recompute every customer's score with grouped queries and numpy.
+
+    Customers are read in primary key order, ``chunk_size`` at a time, and
+    each chunk only aggregates its own interactions and deals. Only
+    customers whose stored score differs are written. Returns the number of
+    customers updated.
+    """
+    now = timezone.now()
+    updated = 0
+    last_pk = 0
+    while rows := list(
+        Customer.objects.filter(pk__gt=last_pk)
+        .order_by("pk")
+        .values_list("pk", "last_contacted", *SCORE_FIELDS)[:chunk_size]
+    ):
+        last_pk = rows[-1][0]
+        updated += recompute_chunk(rows, now, batch_size)
+    return updated
+
+
+def recompute_chunk(rows, now, batch_size):
+    """Recompute the scores of one chunk of customer rows"""
+    ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    stored = np.array([row[2:] for row in rows], dtype=np.int64)
+    in_chunk = {"customer__gte": rows[0][0], "customer__lte": rows[-1][0]}
+
+    def positions(customer_ids):
+        return np.searchsorted(ids, np.asarray(customer_ids, dtype=np.int64))
+
+    # Engagement: interaction counts per customer and type
+    # (archived interactions still count, see customers.archive)
+    counts = [
+        row
+        for model in (Interaction, InteractionArchive)
+        for row in model.objects.filter(**in_chunk)
+        .order_by()
+        .values_list("customer_id", "interaction_type")
+        .annotate(n=Count("id"))
+    ]
+    engagement = np.zeros(len(ids), dtype=np.int64)
+    if counts:
+        customer_ids, types, n = zip(*counts)
+        points = np.array([INTERACTION_POINTS.get(t, 0) for t in types])
+        np.add.at(engagement, positions(customer_ids), np.array(n) * points)
+
+    # Pipeline: per-deal points, same integer arithmetic as deal_points()
+    deals = list(
+        Deal.objects.filter(**in_chunk)
+        .order_by()
+        .values_list("customer_id", "stage", "value", "probability")
+    )
+    pipeline = np.zeros(len(ids), dtype=np.int64)
+    if deals:
+        customer_ids, stages, values, probabilities = zip(*deals)
+        stages = np.array(stages)
+        cents = np.array([int(value * 100) for value in values], dtype=np.int64)
+        points = np.minimum(
+            MAX_DEAL_POINTS,
+            cents
+            * np.array(probabilities, dtype=np.int64)
+            // (100 * 100 * PIPELINE_UNIT),
+        )
+        points = np.where(stages == "closed_won", WON_DEAL_POINTS, points)
+        points = np.where(stages == "closed_lost", 0, points)
+        np.add.at(pipeline, positions(customer_ids), points)
+
+    # Recency: latest of last_contacted and the newest interaction
+    last = {pk: contacted for pk, contacted, *_ in rows}
+    for customer_id, latest in (
+        row
+        for model in (Interaction, InteractionArchive)
+        for row in model.objects.filter(**in_chunk)
+        .order_by()
+        .values("customer_id")
+        .annotate(latest=Max("created_at"))
+        .values_list("customer_id", "latest")
+    ):
+        if last[customer_id] is None or latest > last[customer_id]:
+            last[customer_id] = latest
+    days = np.array(
+        [(now - last[pk]).days if last[pk] else RECENCY_POINTS for pk in ids.tolist()],
+        dtype=np.int64,
+    )
+    recency = np.clip(RECENCY_POINTS - days, 0, RECENCY_POINTS)
+
+    scores = np.column_stack(
+        [engagement, pipeline, recency, engagement + pipeline + recency]
+    )
+    changed_contact = {pk for pk, contacted, *_ in rows if last[pk] != contacted}
+    changed = np.flatnonzero((scores != stored).any(axis=1)).tolist()
+    changed_pks = {int(ids[i]) for i in changed} | changed_contact
+
+    updates = []
+    index = {int(pk): i for i, pk in enumerate(ids)}
+    for pk in changed_pks:
+        values = scores[index[pk]]
+        customer = Customer(pk=pk, last_contacted=last[pk], updated_at=now)
+        for field, value in zip(SCORE_FIELDS, values.tolist()):
+            setattr(customer, field, value)
+        updates.append(customer)
+    Customer.objects.bulk_update(
+        updates, SCORE_FIELDS + ["last_contacted", "updated_at"], batch_size=batch_size
+    )
+    return len(updates)
@@ -0,0 +1,275 @@
+# customers/search.py
+
+import re
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from .models import Company, Customer, Interaction
+
+# Fields searched for each index, mirroring the admin search_fields
+SEARCH_FIELDS = {
+    "customer": ["first_name", "last_name", "email", "company__name"],
+    "interaction": ["subject", "notes", "customer__first_name", "customer__last_name"],
+}
+
+MODELS = {"customer": Customer, "interaction": Interaction}
+
+
+def search_terms(query):
+    """Split a user query into word tokens"""
+    return re.findall(r"\w+", query.lower())
+
+
+class SearchBackend:
+    """Fallback backend: case-insensitive substring match on every field"""
+
+    def install(self):
+        """Create any database structures the backend needs"""
+
+    def rebuild(self):
+        """Repopulate the index from the base tables"""
+
+    def filter(self, queryset, index, query):
+        """Restrict ``queryset`` to rows matching ``query``"""
+        condition = Q()
+        for term in search_terms(query):
+            term_condition = Q()
+            for field in SEARCH_FIELDS[index]:
+                term_condition |= Q(**{f"{field}__icontains": term})
+            condition &= term_condition
+        return queryset.filter(condition)
+
+    def search(self, index, query, limit=20):
+        """Best matches for ``query``, most relevant first"""
+        if not search_terms(query):
+            return []
+        return list(self.filter(MODELS[index].objects.all(), index, query)[:limit])
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """SQLite FTS5 virtual tables kept in sync by triggers.
+
+    install() runs after ``migrate`` and from ``rebuild_search_index``,
+    never in a request.
+    """
+
+    TABLES = {
+        "customer": "customers_customer_fts",
+        "interaction": "customers_interaction_fts",
+    }
+
+    VIRTUAL_TABLES = [
+        # Customers carry their company name, so this is a standalone table
+        """CREATE VIRTUAL TABLE customers_customer_fts USING fts5(
+            first_name, last_name, email, company_name, tokenize='unicode61'
+        )""",
+        # Interactions index their own columns (external content table)
+        """CREATE VIRTUAL TABLE customers_interaction_fts USING fts5(
+            subject, notes, content='customers_interaction', content_rowid='id',
+            tokenize='unicode61'
+        )""",
+    ]
+
+    # Updates only fire on the indexed columns, so counter and score
+    # updates do not rewrite the index rows
+    TRIGGERS = {
+        "customers_customer_fts_insert": """
+        AFTER INSERT ON customers_customer BEGIN
+            INSERT INTO customers_customer_fts
+                (rowid, first_name, last_name, email, company_name)
+            VALUES (new.id, new.first_name, new.last_name, new.email,
+                (SELECT name FROM customers_company WHERE id = new.company_id));
+        END""",
+        "customers_customer_fts_update": """
+        AFTER UPDATE OF first_name, last_name, email, company_id
+        ON customers_customer BEGIN
+            DELETE FROM customers_customer_fts WHERE rowid = old.id;
+            INSERT INTO customers_customer_fts
+                (rowid, first_name, last_name, email, company_name)
+            VALUES (new.id, new.first_name, new.last_name, new.email,
+                (SELECT name FROM customers_company WHERE id = new.company_id));
+        END""",
+        "customers_customer_fts_delete": """
+        AFTER DELETE ON customers_customer BEGIN
+            DELETE FROM customers_customer_fts WHERE rowid = old.id;
+        END""",
+        "customers_company_fts_update": """
+        AFTER UPDATE OF name ON customers_company BEGIN
+            UPDATE customers_customer_fts SET company_name = new.name
+            WHERE rowid IN
+                (SELECT id FROM customers_customer WHERE company_id = new.id);
+        END""",
+        "customers_interaction_fts_insert": """
+        AFTER INSERT ON customers_interaction BEGIN
+            INSERT INTO customers_interaction_fts (rowid, subject, notes)
+            VALUES (new.id, new.subject, new.notes);
+        END""",
+        "customers_interaction_fts_update": """
+        AFTER UPDATE OF subject, notes ON customers_interaction BEGIN
+            INSERT INTO customers_interaction_fts
+                (customers_interaction_fts, rowid, subject, notes)
+            VALUES ('delete', old.id, old.subject, old.notes);
+            INSERT INTO customers_interaction_fts (rowid, subject, notes)
+            VALUES (new.id, new.subject, new.notes);
+        END""",
+        "customers_interaction_fts_delete": """
+        AFTER DELETE ON customers_interaction BEGIN
+            INSERT INTO customers_interaction_fts
+                (customers_interaction_fts, rowid, subject, notes)
+            VALUES ('delete', old.id, old.subject, old.notes);
+        END""",
+    }
+
+    def install(self):
+        """Create the tables if missing (and fill them); replace the triggers"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = %s",
+                [self.TABLES["customer"]],
+            )
+            created = cursor.fetchone() is None
+            if created:
+                for statement in self.VIRTUAL_TABLES:
+                    cursor.execute(statement)
+            for name, body in self.TRIGGERS.items():
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+                cursor.execute(f"CREATE TRIGGER {name} {body}")
+        if created:
+            self.rebuild()
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM customers_customer_fts")
+            cursor.execute("""INSERT INTO customers_customer_fts
+                    (rowid, first_name, last_name, email, company_name)
+                SELECT c.id, c.first_name, c.last_name, c.email, co.name
+                FROM customers_customer c
+                LEFT JOIN customers_company co ON co.id = c.company_id""")
+            cursor.execute(
+                "INSERT INTO customers_interaction_fts (customers_interaction_fts) "
+                "VALUES ('rebuild')"
+            )
+
+    def match_expression(self, query):
+        # Every term must match, each as a prefix
+        return " ".join(f'"{term}"*' for term in search_terms(query))
+
+    def matching_ids(self, index, query, limit):
+        """Ids of the best ``limit`` matches by BM25 rank"""
+        table = self.TABLES[index]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {table} WHERE {table} MATCH %s "
+                "ORDER BY rank LIMIT %s",
+                [self.match_expression(query), limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def match_subquery(self, index, query):
+        table = self.TABLES[index]
+        return RawSQL(
+            f"SELECT rowid FROM {table} WHERE {table} MATCH %s",
+            [self.match_expression(query)],
+        )
+
+    def filter(self, queryset, index, query):
+        if not search_terms(query):
+            return queryset
+        condition = Q(pk__in=self.match_subquery(index, query))
+        if index == "interaction":
+            # Admin search also matches interactions by customer name
+            condition |= Q(customer_id__in=self.match_subquery("customer", query))
+        return queryset.filter(condition)
+
+    def search(self, index, query, limit=20):
+        if not search_terms(query):
+            return []
+        ids = self.matching_ids(index, query, limit)
+        objects = MODELS[index].objects.in_bulk(ids)
+        return [objects[pk] for pk in ids if pk in objects]
+
+
+class PostgresSearchBackend(SearchBackend):
+    """PostgreSQL full-text search on expression GIN indexes"""
+
+    VECTORS = {
+        "customer": (Customer, ["first_name", "last_name", "email"]),
+        "company": (Company, ["name"]),
+        "interaction": (Interaction, ["subject", "notes"]),
+    }
+
+    def vector(self, index):
+        from django.contrib.postgres.search import SearchVector
+
+        model, fields = self.VECTORS[index]
+        return SearchVector(*fields, config="simple")
+
+    def install(self):
+        from django.contrib.postgres.indexes import GinIndex
+
+        for index, (model, _) in self.VECTORS.items():
+            name = f"{index}_search_gin"
+            with connection.cursor() as cursor:
+                constraints = connection.introspection.get_constraints(
+                    cursor, model._meta.db_table
+                )
+            if name not in constraints:
+                # Built from the same SearchVector the queries use, so the
+                # planner can match the index expression
+                with connection.schema_editor() as editor:
+                    editor.add_index(model, GinIndex(self.vector(index), name=name))
+
+    def search_query(self, query):
+        from django.contrib.postgres.search import SearchQuery
+
+        # Every term must match, each as a prefix
+        raw = " & ".join(f"{term}:*" for term in search_terms(query))
+        return SearchQuery(raw, search_type="raw", config="simple")
+
+    def matches(self, index, query):
+        model, _ = self.VECTORS[index]
+        return model.objects.annotate(search=self.vector(index)).filter(
+            search=self.search_query(query)
+        )
+
+    def filter(self, queryset, index, query):
+        if not search_terms(query):
+            return queryset
+        ids = self.matches(index, query).values("pk")
+        condition = Q(pk__in=ids)
+        if index == "customer":
+            condition |= Q(company__in=self.matches("company", query).values("pk"))
+        else:
+            condition |= Q(customer__in=self.matches("customer", query).values("pk"))
+        return queryset.filter(condition)
+
+    def search(self, index, query, limit=20):
+        from django.contrib.postgres.search import SearchRank
+
+        if not search_terms(query):
+            return []
+        return list(
+            self.matches(index, query)
+            .annotate(rank=SearchRank(self.vector(index), self.search_query(query)))
+            .order_by("-rank")[:limit]
+        )
+
+
+def get_search_backend():
+    """The configured search backend, or the best one for the database"""
+    if settings.SEARCH_BACKEND:
+        return import_string(settings.SEARCH_BACKEND)()
+    if connection.vendor == "sqlite":
+        return SQLiteFTSBackend()
+    if connection.vendor == "postgresql":
+        return PostgresSearchBackend()
+    return SearchBackend()
+
+
+def install_search_index(using=DEFAULT_DB_ALIAS, **kwargs):
+    """post_migrate handler: create or update the search structures"""
+    # The backends work on the default connection
+    if using == DEFAULT_DB_ALIAS:
+        get_search_backend().install()
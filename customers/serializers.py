@@ -0,0 +1,124 @@
+# customers/serializers.py
+
+from django.contrib.auth.models import User
+from rest_framework import serializers
+from .models import Company, Customer, Deal, Interaction
+
+
+class UserSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ["id", "username", "first_name", "last_name", "email"]
+
+
+class CompanySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Company
+        fields = ["id", "name", "website", "industry", "size", "updated_at"]
+
+
+class SparseFieldsSerializer(serializers.ModelSerializer):
+    """ModelSerializer honouring ``?fields=`` and ``?expand=``.
+
+    The view passes ``fields`` (names to keep) and ``expand`` (relations to
+    nest) through the serializer context. Relations named in ``expandable``
+    render as primary keys unless expanded.
+    """
+
+    # relation name -> nested serializer class used when expanded
+    expandable = {}
+
+    @property
+    def is_top_level(self):
+        """Whether this serializer (not a nested one) renders the response"""
+        root = self.root
+        return self is root or (
+            self.parent is root and isinstance(root, serializers.ListSerializer)
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.is_top_level:
+            return fields
+
+        for name in self.context.get("expand", ()):
+            if name in fields and name in self.expandable:
+                fields[name] = self.expandable[name](
+                    many=isinstance(fields[name], serializers.ManyRelatedField),
+                    read_only=True,
+                )
+
+        requested = self.context.get("fields")
+        if requested:
+            fields = {
+                name: field for name, field in fields.items() if name in requested
+            }
+        return fields
+
+
+class DealSerializer(SparseFieldsSerializer):
+    expandable = {"assigned_to": UserSummarySerializer}
+
+    class Meta:
+        model = Deal
+        fields = [
+            "id",
+            "customer",
+            "title",
+            "value",
+            "stage",
+            "probability",
+            "expected_close_date",
+            "assigned_to",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = ["created_at", "updated_at"]
+
+
+class CustomerSerializer(SparseFieldsSerializer):
+    expandable = {
+        "company": CompanySerializer,
+        "assigned_to": UserSummarySerializer,
+        "deals": DealSerializer,
+    }
+
+    deals = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = Customer
+        fields = [
+            "id",
+            "first_name",
+            "last_name",
+            "email",
+            "phone",
+            "company",
+            "position",
+            "lead_status",
+            "lead_source",
+            "assigned_to",
+            "created_at",
+            "updated_at",
+            "last_contacted",
+            "lead_score",
+            "deals",
+        ]
+        read_only_fields = ["created_at", "updated_at", "last_contacted", "lead_score"]
+
+
+class InteractionSerializer(SparseFieldsSerializer):
+    expandable = {"user": UserSummarySerializer}
+
+    class Meta:
+        model = Interaction
+        fields = [
+            "id",
+            "customer",
+            "interaction_type",
+            "subject",
+            "notes",
+            "user",
+            "created_at",
+        ]
+        read_only_fields = ["created_at"]
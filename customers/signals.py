@@ -0,0 +1,13 @@
+# customers/signals.py
+
+from django.dispatch import Signal
+
+# bulk_update()/bulk_create() skip post_save, so the bulk write paths send
+# these instead, inside the same transaction as the write.
+
+# Arguments: ``deals`` (the updated instances) and ``previous`` (pk -> copy
+# of each deal as it was before the update)
+deals_bulk_updated = Signal()
+
+# Arguments: ``interactions`` (the created instances, with primary keys)
+interactions_bulk_created = Signal()
@@ -0,0 +1,55 @@
+# customers/snapshots.py
+
+"""Stored values of a row about to be saved, for the signal handlers.
+
+The counters, lead scores, analytics rollups and the portal customer cache
+all need the old values of an updated interaction, deal or customer. One pre_save receiver loads
+them with a single SELECT into the instance; the handlers read them with
+stored_values(). Deletes that cascade from a customer are recognised with
+cascades_from_customer(), so the handlers can skip rows that are going away
+together with their customer.
+"""
+
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+from .models import Customer, Deal, Interaction
+
+SNAPSHOT_FIELDS = {
+    Interaction: ["customer_id", "interaction_type"],
+    Deal: [
+        "customer_id",
+        "stage",
+        "value",
+        "probability",
+        "expected_close_date",
+        "assigned_to_id",
+    ],
+    Customer: ["company_id", "email"],
+}
+
+
+@receiver(pre_save, sender=Interaction)
+@receiver(pre_save, sender=Deal)
+@receiver(pre_save, sender=Customer)
+def remember_stored_values(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance._stored_values = (
+            sender.objects.filter(pk=instance.pk)
+            .values(*SNAPSHOT_FIELDS[sender])
+            .first()
+            if instance.pk
+            else None
+        )
+
+
+def stored_values(instance):
+    """The row's values before this save as a dict, or None if it is new"""
+    return getattr(instance, "_stored_values", None)
+
+
+def cascades_from_customer(origin):
+    """Whether a delete started from customers (its ``origin``)"""
+    if isinstance(origin, QuerySet):
+        return origin.model is Customer
+    return isinstance(origin, Customer)
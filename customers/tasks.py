@@ -0,0 +1,11 @@
+# customers/tasks.py
+
+from flowtada.celery import app
+from .ingest import process_pending
+
+
+@app.task
+def process_lead_submissions(batch_size=None):
+    """Drain the lead submission queue in batches"""
+    while process_pending(batch_size):
+        pass
@@ -0,0 +1,757 @@
+# customers/tests.py
+
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import patch
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from analytics import rollups
+from analytics.models import OutcomeRollup, StageRollup
+from customers.changelists import EstimatedCountPaginator
+from customers.archive import archive_batch
+from customers.counters import rebuild_companies, rebuild_customers
+from customers.dedupe import (
+    company_duplicates,
+    customer_duplicates,
+    normalize_company_name,
+)
+from customers.events import queue_events
+from customers.ingest import enqueue, process_pending
+from customers.models import (
+    Company,
+    Customer,
+    Deal,
+    Interaction,
+    InteractionArchive,
+)
+from customers.search import get_search_backend
+from customers.scoring import INTERACTION_POINTS, SCORE_FIELDS, recompute
+
+
+class CustomerAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "x")
+        Customer.objects.create(
+            first_name="Ada", last_name="Lovelace", email="ada@example.com"
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_changelist_uses_estimated_count_paginator(self):
+        response = self.client.get("/admin/customers/customer/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.context["cl"].paginator, EstimatedCountPaginator)
+        self.assertContains(response, "ada@example.com")
+
+    def test_other_changelists(self):
+        for model in ["company", "deal", "interaction", "leadsubmission"]:
+            with self.subTest(model=model):
+                response = self.client.get(f"/admin/customers/{model}/")
+                self.assertEqual(response.status_code, 200)
+
+    def test_change_form(self):
+        customer = Customer.objects.get()
+        response = self.client.get(f"/admin/customers/customer/{customer.pk}/change/")
+        self.assertEqual(response.status_code, 200)
+
+
+class ImportLeadsTests(TestCase):
+    def import_file(self, text, suffix):
+        with tempfile.NamedTemporaryFile("w", suffix=suffix, delete=False) as f:
+            f.write(text)
+        self.addCleanup(os.unlink, f.name)
+        call_command("import_leads", f.name, stdout=StringIO())
+
+    def import_csv(self, text):
+        self.import_file(text, ".csv")
+
+    def test_rows_only_overwrite_the_columns_they_provide(self):
+        Customer.objects.create(
+            first_name="Ada",
+            last_name="Lovelace",
+            email="ada@example.com",
+            phone="555-0100",
+            position="CTO",
+            lead_status="qualified",
+            lead_source="Referral",
+        )
+        self.import_csv(
+            "email,name,phone,lead_status\n"
+            "ada@example.com,,,\n"
+            "new@example.com,Grace Hopper,555-0199,\n"
+        )
+
+        ada = Customer.objects.get(email="ada@example.com")
+        self.assertEqual(
+            (ada.first_name, ada.phone, ada.position, ada.lead_status, ada.lead_source),
+            ("Ada", "555-0100", "CTO", "qualified", "Referral"),
+        )
+        grace = Customer.objects.get(email="new@example.com")
+        self.assertEqual(
+            (grace.first_name, grace.last_name, grace.phone, grace.lead_status),
+            ("Grace", "Hopper", "555-0199", "new"),
+        )
+        self.assertEqual(grace.lead_source, "Import")
+
+    def test_jsonl_values_that_are_not_strings(self):
+        rows = [
+            {"email": "a@example.com", "name": None, "phone": 5550100},
+            {"email": "b@example.com", "name": False, "first_name": "Bob"},
+            {"email": 42, "name": "Number Email"},
+        ]
+        self.import_file("\n".join(json.dumps(row) for row in rows), ".jsonl")
+        self.assertEqual(Customer.objects.get(email="a@example.com").phone, "5550100")
+        self.assertEqual(Customer.objects.get(email="b@example.com").first_name, "Bob")
+        self.assertEqual(Customer.objects.get(email="42").first_name, "Number")
+
+    def test_company_changes_move_counters(self):
+        old = Company.objects.create(name="Analytical Engines")
+        ada = Customer.objects.create(
+            first_name="Ada", last_name="Lovelace", email="ada@example.com", company=old
+        )
+        Interaction.objects.create(
+            customer=ada,
+            user=User.objects.create_user("rep"),
+            interaction_type="call",
+            subject="Intro",
+            notes="",
+        )
+        Deal.objects.create(
+            customer=ada,
+            title="Engine",
+            value=Decimal("100.00"),
+            expected_close_date=date(2030, 1, 1),
+        )
+
+        self.import_csv("email,company\nada@example.com,Difference Engines\n")
+        new = Company.objects.get(name="Difference Engines")
+        self.assertEqual(Customer.objects.get(pk=ada.pk).company, new)
+        old.refresh_from_db()
+        self.assertEqual((old.interaction_count, old.open_deal_value), (0, 0))
+        self.assertIsNone(old.last_interaction_at)
+        self.assertEqual((new.interaction_count, new.open_deal_value), (1, 100))
+        self.assertIsNotNone(new.last_interaction_at)
+        self.assertEqual(rebuild_companies(), 0)
+
+
+class ProcessPendingTests(TestCase):
+    def test_bad_lead_only_fails_its_own_submission(self):
+        good = enqueue(
+            "trial",
+            {
+                "email": "a@example.com",
+                "first_name": "Ada",
+                "last_name": "",
+                "company": "",
+            },
+        )
+        # Missing "company", which ingest_leads expects
+        bad = enqueue("trial", {"email": "b@example.com", "first_name": "Bob"})
+
+        with self.assertLogs("customers.ingest", "ERROR"):
+            self.assertEqual(process_pending(), 2)
+
+        good.refresh_from_db()
+        bad.refresh_from_db()
+        self.assertEqual(good.status, "processed")
+        self.assertEqual(bad.status, "failed")
+        self.assertTrue(Customer.objects.filter(email="a@example.com").exists())
+        self.assertTrue(User.objects.filter(username="a@example.com").exists())
+        self.assertEqual(process_pending(), 0)
+
+    def test_failed_users_roll_back_their_customers(self):
+        lead = {
+            "email": "a@example.com",
+            "first_name": "Ada",
+            "last_name": "",
+            "company": "",
+        }
+        submission = enqueue("trial", lead)
+        with patch(
+            "customers.ingest.create_portal_users", side_effect=RuntimeError
+        ), self.assertLogs("customers.ingest", "ERROR"):
+            process_pending()
+        submission.refresh_from_db()
+        self.assertEqual(submission.status, "failed")
+        self.assertFalse(Customer.objects.filter(email="a@example.com").exists())
+
+        enqueue("trial", lead)
+        process_pending()
+        self.assertTrue(Customer.objects.filter(email="a@example.com").exists())
+        self.assertTrue(User.objects.filter(username="a@example.com").exists())
+
+
+class BulkDealsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "x")
+        customer = Customer.objects.create(
+            first_name="Ada", last_name="Lovelace", email="ada@example.com"
+        )
+        cls.deal = Deal.objects.create(
+            customer=customer,
+            title="Engine",
+            value=Decimal("100.00"),
+            expected_close_date=date(2030, 1, 1),
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def post(self, rows):
+        return self.client.post(
+            reverse("customers:bulk_deals"), rows, content_type="application/json"
+        )
+
+    def test_invalid_values_are_row_errors(self):
+        rows = [{"id": self.deal.pk, "value": value} for value in ["NaN", "1e12"]]
+        # Usernames are strings; an integer must not match user "5"
+        User.objects.create_user("5")
+        rows.append({"id": self.deal.pk, "assigned_to": 5})
+        rows.append({"id": self.deal.pk, "value": "250.5", "assigned_to": "5"})
+        response = self.post(rows)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["written"], 1)
+        self.assertEqual(
+            [
+                (error["row"], list(error["errors"]))
+                for error in response.json()["errors"]
+            ],
+            [(0, ["value"]), (1, ["value"]), (2, ["assigned_to"])],
+        )
+        self.deal.refresh_from_db()
+        self.assertEqual(self.deal.value, Decimal("250.50"))
+
+
+class DedupeTests(TestCase):
+    def test_company_name_variants_collapse(self):
+        for names, key in [
+            (
+                [
+                    "ACME, Inc.",
+                    "Acme Inc",
+                    "acme inc.",
+                    "Acme Corporation",
+                    "ACME Co.",
+                    "Acme S.A.",
+                    "Ácme Ltd",
+                    "  acme  ",
+                ],
+                "acme",
+            ),
+            (["AT&T Inc.", "AT and T"], "at and t"),
+            (["บริษัท เอซีเอ็ม จำกัด", "เอซีเอ็ม จำกัด (มหาชน)"], "เอซีเอ็ม"),
+            # Only legal-form words: kept rather than emptied
+            (["Company Inc."], "company inc"),
+        ]:
+            for name in names:
+                with self.subTest(name=name):
+                    self.assertEqual(normalize_company_name(name), key)
+        self.assertNotEqual(
+            normalize_company_name("Acme Widgets"), normalize_company_name("Acme")
+        )
+
+    def test_company_duplicates(self):
+        companies = [
+            Company.objects.create(name=name)
+            for name in [
+                "Acme Widgets",
+                "ACME Widgets, Inc.",
+                "Globex",
+                "Acme Widget Co",
+                "Initech",
+            ]
+        ]
+        acme = [companies[0].pk, companies[1].pk, companies[3].pk]
+        self.assertEqual(company_duplicates(), [acme])
+
+    def test_customer_duplicates_share_a_company_domain(self):
+        def add(first_name, last_name, email):
+            return Customer.objects.create(
+                first_name=first_name, last_name=last_name, email=email
+            ).pk
+
+        ada = add("Ada", "Lovelace", "ada@engines.example")
+        twin = add("Lovelace", "Ada", "a.lovelace@engines.example")
+        add("Ada", "Lovelace", "ada@other.example")
+        add("Ada", "Lovelace", "ada@gmail.com")
+        add("Ada", "Lovelace", "lovelace@gmail.com")
+        self.assertEqual(customer_duplicates(), [[ada, twin]])
+
+    def add_activity(self, customer, value):
+        Interaction.objects.create(
+            customer=customer,
+            user=self.rep,
+            interaction_type="call",
+            subject="Call",
+            notes="",
+        )
+        Deal.objects.create(
+            customer=customer,
+            title="Deal",
+            value=Decimal(value),
+            expected_close_date=date(2030, 1, 1),
+        )
+
+    def merge(self, model):
+        call_command("find_duplicates", "--model", model, "--merge", stdout=StringIO())
+
+    def test_merge_companies(self):
+        self.rep = User.objects.create_user("rep")
+        keep = Company.objects.create(name="Acme Widgets")
+        duplicate = Company.objects.create(name="ACME Widgets, Inc.")
+        ada = Customer.objects.create(
+            first_name="Ada", last_name="Lovelace", email="ada@a.example", company=keep
+        )
+        bob = Customer.objects.create(
+            first_name="Bob",
+            last_name="Byron",
+            email="bob@b.example",
+            company=duplicate,
+        )
+        self.add_activity(ada, "100.00")
+        self.add_activity(bob, "250.00")
+
+        self.merge("companies")
+        self.assertFalse(Company.objects.filter(pk=duplicate.pk).exists())
+        bob.refresh_from_db()
+        self.assertEqual(bob.company_id, keep.pk)
+        keep.refresh_from_db()
+        self.assertEqual((keep.interaction_count, keep.open_deal_value), (2, 350))
+        self.assertEqual(rebuild_companies(), 0)
+
+    def test_merge_customers(self):
+        self.rep = User.objects.create_user("rep")
+        company = Company.objects.create(name="Analytical Engines")
+        keep, duplicate = [
+            Customer.objects.create(
+                first_name=first_name,
+                last_name=last_name,
+                email=email,
+                company=company,
+            )
+            for first_name, last_name, email in [
+                ("Ada", "Lovelace", "ada@engines.example"),
+                ("Lovelace", "Ada", "a.lovelace@engines.example"),
+            ]
+        ]
+        self.add_activity(keep, "100.00")
+        self.add_activity(duplicate, "250.00")
+        self.add_activity(duplicate, "50.00")
+
+        self.merge("customers")
+        self.assertFalse(Customer.objects.filter(pk=duplicate.pk).exists())
+        self.assertEqual(Interaction.objects.filter(customer=keep).count(), 3)
+        self.assertEqual(Deal.objects.filter(customer=keep).count(), 3)
+        keep.refresh_from_db()
+        self.assertEqual((keep.interaction_count, keep.open_deal_value), (3, 400))
+        self.assertEqual(keep.score_engagement, 3 * INTERACTION_POINTS["call"])
+        company.refresh_from_db()
+        self.assertEqual((company.interaction_count, company.open_deal_value), (3, 400))
+        self.assertEqual((rebuild_customers(), rebuild_companies()), (0, 0))
+
+
+class ScoringTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("rep")
+        cls.customers = [
+            Customer.objects.create(
+                first_name=f"C{n}", last_name="", email=f"c{n}@example.com"
+            )
+            for n in range(5)
+        ]
+
+    def test_score_updates_stamp_updated_at(self):
+        customer = self.customers[0]
+        before = Customer.objects.get(pk=customer.pk).updated_at
+        Interaction.objects.create(
+            customer=customer, user=self.user, interaction_type="demo", subject="Demo"
+        )
+        customer.refresh_from_db()
+        self.assertEqual(customer.score_engagement, INTERACTION_POINTS["demo"])
+        self.assertGreater(customer.updated_at, before)
+
+    def test_recompute_in_chunks(self):
+        for n, customer in enumerate(self.customers):
+            Interaction.objects.create(
+                customer=customer, user=self.user, interaction_type="call", subject="x"
+            )
+            Deal.objects.create(
+                customer=customer,
+                title="Deal",
+                value=Decimal(100_000 * n),
+                probability=50,
+                expected_close_date=date(2030, 1, 1),
+            )
+        expected = list(Customer.objects.order_by("pk").values_list(*SCORE_FIELDS))
+        Customer.objects.update(**{field: 0 for field in SCORE_FIELDS})
+
+        self.assertEqual(recompute(chunk_size=2), len(self.customers))
+        self.assertEqual(
+            list(Customer.objects.order_by("pk").values_list(*SCORE_FIELDS)), expected
+        )
+        self.assertEqual(recompute(chunk_size=2), 0)
+
+
+class CustomerApiValidatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "x")
+        cls.rep = User.objects.create_user("rep", first_name="Rita")
+        cls.company = Company.objects.create(name="Analytical Engines")
+        customer = Customer.objects.create(
+            first_name="Ada",
+            last_name="Lovelace",
+            email="ada@example.com",
+            company=cls.company,
+            assigned_to=cls.rep,
+        )
+        cls.deal = Deal.objects.create(
+            customer=customer,
+            title="Engine",
+            value=Decimal("100.00"),
+            expected_close_date=date(2030, 1, 1),
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304
+        )
+        return response["ETag"]
+
+    def assertChangesETag(self, url, change):
+        before = self.etag(url)
+        change()
+        self.assertNotEqual(self.etag(url), before)
+
+    def test_deal_change(self):
+        def change():
+            self.deal.title = "Difference Engine"
+            self.deal.save()
+
+        self.assertChangesETag(reverse("customers:customer-list"), change)
+
+    def test_expanded_company_change(self):
+        def change():
+            self.company.industry = "Computing"
+            self.company.save()
+
+        url = f"{reverse('customers:customer-list')}?expand=company"
+        self.assertChangesETag(url, change)
+
+    def test_expanded_user_change(self):
+        def change():
+            self.rep.last_name = "Smith"
+            self.rep.save()
+
+        url = f"{reverse('customers:customer-list')}?expand=assigned_to"
+        self.assertChangesETag(url, change)
+
+
+class DealStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customer.objects.create(
+            first_name="Ada", last_name="Lovelace", email="ada@example.com"
+        )
+        for n, stage in enumerate(
+            ["closed_won", "closed_lost", "proposal", "closed_won"]
+        ):
+            Deal.objects.create(
+                customer=cls.customer,
+                title=f"Deal {n}",
+                value=Decimal("250.00"),
+                stage=stage,
+                expected_close_date=date(2030, 1, 1),
+            )
+
+    expected = {
+        "total_deals": 4,
+        "won_deals": 2,
+        "total_value": Decimal("1000.00"),
+        "success_rate": 50.0,
+    }
+
+    def test_stats(self):
+        with self.assertNumQueries(1):
+            stats = Deal.objects.filter(customer=self.customer).stats()
+        self.assertEqual(stats, self.expected)
+
+    def test_astats(self):
+        with self.assertNumQueries(1):
+            stats = async_to_sync(Deal.objects.filter(customer=self.customer).astats)()
+        self.assertEqual(stats, self.expected)
+
+    def test_empty(self):
+        with self.assertNumQueries(1):
+            stats = Deal.objects.filter(stage="negotiation").stats()
+        self.assertEqual(stats["total_deals"], 0)
+        self.assertEqual(stats["success_rate"], 0)
+
+
+class ApiQueryCountTests(TestCase):
+    # Session and user, the validator aggregates, the page and its prefetches
+    expected = {
+        "customers:customer-list": {
+            "": 6,
+            "fields=id,email": 4,
+            "expand=company,assigned_to,deals": 8,
+        },
+        "customers:deal-list": {"expand=assigned_to": 5},
+        "customers:interaction-list": {"expand=user": 5},
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "x")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def seed(self, count):
+        for n in range(Customer.objects.count(), Customer.objects.count() + count):
+            customer = Customer.objects.create(
+                first_name="Ada",
+                last_name=str(n),
+                email=f"ada{n}@example.com",
+                company=Company.objects.create(name=f"Company {n}"),
+                assigned_to=self.admin,
+            )
+            Deal.objects.create(
+                customer=customer,
+                title="Engine",
+                value=Decimal("100.00"),
+                expected_close_date=date(2030, 1, 1),
+                assigned_to=self.admin,
+            )
+            Interaction.objects.create(
+                customer=customer, user=self.admin, interaction_type="call", subject="x"
+            )
+
+    def assertQueryCounts(self):
+        for name, queries in self.expected.items():
+            for query, count in queries.items():
+                with self.subTest(url=name, query=query):
+                    with self.assertNumQueries(count):
+                        response = self.client.get(f"{reverse(name)}?{query}")
+                    self.assertEqual(response.status_code, 200)
+
+    def test_query_counts_per_page(self):
+        self.seed(3)
+        self.assertQueryCounts()
+        self.seed(30)
+        self.assertQueryCounts()
+
+
+@skipUnless(connection.vendor == "sqlite", "SQLite FTS5 backend")
+class SQLiteSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customer.objects.create(
+            first_name="Ada", last_name="Lovelace", email="ada@example.com"
+        )
+
+    def total_changes(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT total_changes()")
+            return cursor.fetchone()[0]
+
+    def test_index_is_installed_by_migrate(self):
+        self.assertEqual(
+            get_search_backend().search("customer", "lovel"), [self.customer]
+        )
+
+    def test_name_changes_are_indexed(self):
+        Customer.objects.filter(pk=self.customer.pk).update(last_name="Byron")
+        self.assertEqual(get_search_backend().search("customer", "lovel"), [])
+        self.assertEqual(
+            get_search_backend().search("customer", "byron"), [self.customer]
+        )
+
+    def test_score_updates_skip_the_index(self):
+        before = self.total_changes()
+        Customer.objects.filter(pk=self.customer.pk).update(lead_score=5)
+        # Only the customer row itself; no trigger rewrote the index row
+        self.assertEqual(self.total_changes() - before, 1)
+
+    def test_view_limit_is_at_least_one(self):
+        Customer.objects.create(
+            first_name="Adam", last_name="Lovell", email="adam@example.com"
+        )
+        self.client.force_login(
+            User.objects.create_superuser("admin", "admin@example.com", "x")
+        )
+        for limit in ["-1", "0"]:
+            with self.subTest(limit=limit):
+                response = self.client.get(
+                    reverse("customers:search"), {"q": "lovel", "limit": limit}
+                )
+                self.assertEqual(len(response.json()["results"]), 1)
+
+
+class SignalHandlerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("rep")
+        cls.company = Company.objects.create(name="Analytical Engines")
+
+    def add_customer(self, n, deals):
+        customer = Customer.objects.create(
+            first_name="Ada",
+            last_name=str(n),
+            email=f"ada{n}@example.com",
+            company=self.company,
+        )
+        for stage in ["proposal", "closed_won"] * deals:
+            Deal.objects.create(
+                customer=customer,
+                title="Engine",
+                value=Decimal("100.00"),
+                stage=stage,
+                expected_close_date=date(2030, 1, 1),
+                assigned_to=self.user,
+            )
+            Interaction.objects.create(
+                customer=customer, user=self.user, interaction_type="call", subject="x"
+            )
+        return customer
+
+    def rollups(self):
+        return sorted(
+            StageRollup.objects.exclude(deal_count=0).values_list(
+                "stage", "deal_count", "total_value", "weighted_value"
+            )
+        ) + sorted(
+            OutcomeRollup.objects.exclude(deal_count=0).values_list(
+                "month", "outcome", "assigned_to", "deal_count", "total_value"
+            )
+        )
+
+    def test_deal_save_reads_the_stored_row_once(self):
+        deal = self.add_customer(0, 1).deals.first()
+        deal.stage = "negotiation"
+        with CaptureQueriesContext(connection) as queries:
+            deal.save()
+        selects = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith("SELECT")
+            and 'FROM "customers_deal"' in query["sql"]
+        ]
+        self.assertEqual(len(selects), 1)
+
+    def test_customer_delete_skips_per_row_handlers(self):
+        def delete_queries(customer):
+            with CaptureQueriesContext(connection) as queries:
+                customer.delete()
+            return len(queries)
+
+        self.add_customer(0, 5)
+        few, many = self.add_customer(1, 1), self.add_customer(2, 10)
+        self.assertEqual(delete_queries(many), delete_queries(few))
+
+        # The company and rollups match a rebuild from the remaining rows
+        expected = self.rollups()
+        self.assertEqual(rebuild_companies(), 0)
+        rollups.rebuild()
+        self.assertEqual(self.rollups(), expected)
+
+    def test_customer_queryset_delete(self):
+        for n in range(3):
+            self.add_customer(n, 2)
+        Customer.objects.filter(last_name__in=["0", "1"]).delete()
+        self.assertEqual(rebuild_companies(), 0)
+        self.company.refresh_from_db()
+        self.assertEqual(self.company.interaction_count, 4)
+
+
+class ArchiveTests(TestCase):
+    def test_archive_batch_keeps_counters(self):
+        user = User.objects.create_user("rep")
+        customer = Customer.objects.create(
+            first_name="Ada", last_name="Lovelace", email="ada@example.com"
+        )
+        for n in range(3):
+            Interaction.objects.create(
+                customer=customer, user=user, interaction_type="call", subject=str(n)
+            )
+
+        self.assertEqual(archive_batch(timezone.now() + timedelta(days=1), 2), 2)
+        self.assertEqual(Interaction.objects.count(), 1)
+        self.assertEqual(InteractionArchive.objects.count(), 2)
+        customer.refresh_from_db()
+        self.assertEqual(customer.interaction_count, 3)
+        self.assertEqual(rebuild_customers(), 0)
+
+
+@patch("customers.events.publish")
+class QueueEventsTests(TransactionTestCase):
+    def event(self, pk, action="updated"):
+        return {"model": "deal", "id": pk, "action": action}
+
+    def test_one_flush_per_transaction(self, publish):
+        with transaction.atomic():
+            queue_events([self.event(1, "created")])
+            queue_events([self.event(1), self.event(2)])
+            publish.assert_not_called()
+        publish.assert_called_once_with([self.event(1, "created"), self.event(2)])
+
+    def test_rolled_back_events_are_dropped(self, publish):
+        with self.assertRaises(ZeroDivisionError), transaction.atomic():
+            queue_events([self.event(1)])
+            1 / 0
+        with transaction.atomic():
+            queue_events([self.event(2)])
+        publish.assert_called_once_with([self.event(2)])
+
+    def test_rolled_back_savepoint(self, publish):
+        with transaction.atomic():
+            with self.assertRaises(ZeroDivisionError), transaction.atomic():
+                queue_events([self.event(1)])
+                1 / 0
+            queue_events([self.event(2)])
+        publish.assert_called_once_with([self.event(2)])
+
+
+class PublishFailureTests(TransactionTestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(
+            first_name="Ada", last_name="Lovelace", email="ada@example.com"
+        )
+
+    def create_deal(self):
+        return Deal.objects.create(
+            customer=self.customer,
+            title="Renewal",
+            value=Decimal("100.00"),
+            expected_close_date=date(2030, 1, 1),
+        )
+
+    @patch("customers.events.send_events", side_effect=ConnectionError)
+    def test_saves_survive_a_failing_channel_layer(self, send_events):
+        with self.assertLogs("customers.events", "ERROR"):
+            self.create_deal()
+        with self.assertLogs("customers.events", "ERROR"), transaction.atomic():
+            self.create_deal()
+        self.assertEqual(send_events.call_count, 2)
+        self.assertEqual(Deal.objects.count(), 2)
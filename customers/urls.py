@@ -6,15 +6,19 @@ from . import views
 
 app_name = "customers"
 
-# For future API endpoints
 router = DefaultRouter()
-# router.register(r'customers', views.CustomerViewSet)
-# router.register(r'deals', views.DealViewSet)
+router.register(r"customers", views.CustomerViewSet)
+router.register(r"deals", views.DealViewSet)
+router.register(r"interactions", views.InteractionViewSet)
 
 urlpatterns = [
     # API routes (for future mobile app/integrations)
+    path("bulk/interactions/", views.bulk_interactions_view, name="bulk_interactions"),
+    path("bulk/deals/", views.bulk_deals_view, name="bulk_deals"),
     path("", include(router.urls)),
     # Web endpoints
     path("contact/", views.contact_submission, name="contact"),
     path("trial/", views.trial_signup, name="trial_signup"),
+    path("export/<str:resource>/", views.export_view, name="export"),
+    path("search/", views.search_view, name="search"),
 ]
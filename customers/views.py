@@ -1,67 +1,64 @@
 # customers/views.py
 
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
 from django.http import JsonResponse
+from django.utils.dateparse import parse_datetime
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
-from django.contrib.auth.models import User
-from .models import Customer, Company
+from django.views.decorators.http import require_GET, require_http_methods
+from rest_framework import permissions, viewsets
+from rest_framework.decorators import api_view, parser_classes, permission_classes
+from rest_framework.parsers import JSONParser
+from rest_framework.response import Response
+from .bulk import NDJSONParser, create_interactions, update_deals
+from .conditional import ConditionalListMixin
+from .exports import CONTENT_TYPES, EXPORTS, streaming_export_response
+from .search import get_search_backend
+from .serializers import CustomerSerializer, DealSerializer, InteractionSerializer
+from .ingest import InvalidLead, clean_contact, clean_trial, enqueue, ingest_leads
+from .models import Customer, Deal, Interaction
+from .pagination import RecentFirstCursorPagination
 import json
 
 
+def submit_lead(source, lead):
+    """Ingest a validated lead inline, or queue it when async ingest is on.
+
+    Returns the HTTP status to answer with: 202 when the lead was only
+    queued, 200 when its records already exist.
+    """
+    if settings.LEAD_INGEST_MODE == "sync":
+        ingest_leads([(source, lead)])
+        return 200
+
+    enqueue(source, lead)
+    return 202
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def contact_submission(request):
     """Handle contact form submissions from website"""
     try:
         data = json.loads(request.body)
-        name = data.get("name", "").strip()
-        email = data.get("email", "").strip()
-        message = data.get("message", "").strip()
-        company = data.get("company", "").strip()
-
-        if not all([name, email, message]):
-            return JsonResponse(
-                {
-                    "status": "error",
-                    "message": "Name, email, and message are required.",
-                },
-                status=400,
-            )
-
-        # Split name
-        name_parts = name.split(" ", 1)
-        first_name = name_parts[0]
-        last_name = name_parts[1] if len(name_parts) > 1 else ""
-
-        # Create or get company
-        company_obj = None
-        if company:
-            company_obj, created = Company.objects.get_or_create(
-                name=company, defaults={"industry": "Unknown"}
-            )
-
-        # Create customer record
-        customer, created = Customer.objects.get_or_create(
-            email=email,
-            defaults={
-                "first_name": first_name,
-                "last_name": last_name,
-                "company": company_obj,
-                "lead_source": "Website Contact Form",
-                "lead_status": "new",
-            },
-        )
+        lead = clean_contact(data)
 
         # TODO: Send email notification to sales team
         # TODO: Create interaction record with message
+        status = submit_lead("contact", lead)
 
         return JsonResponse(
             {
                 "status": "success",
                 "message": "Thank you for your interest! Our team will contact you soon.",
-            }
+            },
+            status=status,
         )
 
+    except InvalidLead as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
     except json.JSONDecodeError:
         return JsonResponse(
             {"status": "error", "message": "Invalid data format."}, status=400
@@ -79,62 +76,22 @@ def trial_signup(request):
     """Handle free trial signups"""
     try:
         data = json.loads(request.body)
-        email = data.get("email", "").strip()
-        first_name = data.get("first_name", "").strip()
-        last_name = data.get("last_name", "").strip()
-        company = data.get("company", "").strip()
+        lead = clean_trial(data)
 
-        if not all([email, first_name]):
-            return JsonResponse(
-                {"status": "error", "message": "Email and first name are required."},
-                status=400,
-            )
-
-        # Create company if provided
-        company_obj = None
-        if company:
-            company_obj, created = Company.objects.get_or_create(
-                name=company, defaults={"industry": "Unknown"}
-            )
-
-        # Create customer record
-        customer, created = Customer.objects.get_or_create(
-            email=email,
-            defaults={
-                "first_name": first_name,
-                "last_name": last_name,
-                "company": company_obj,
-                "lead_source": "Free Trial Signup",
-                "lead_status": "new",
-            },
-        )
-
-        # Create user account for portal access
-        if created:
-            user, user_created = User.objects.get_or_create(
-                username=email,
-                email=email,
-                defaults={
-                    "first_name": first_name,
-                    "last_name": last_name,
-                    "is_active": True,
-                },
-            )
-
-            if user_created:
-                # Set temporary password (should be sent via email)
-                temp_password = "temp123"  # In production, generate random password
-                user.set_password(temp_password)
-                user.save()
+        # Creates the customer record and, for new customers, the portal user
+        status = submit_lead("trial", lead)
 
         return JsonResponse(
             {
                 "status": "success",
                 "message": "Trial account created! Check your email for login details.",
                 "redirect": "/portal/login/",
-            }
+            },
+            status=status,
         )
 
+    except InvalidLead as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
     except json.JSONDecodeError:
         return JsonResponse(
             {"status": "error", "message": "Invalid data format."}, status=400
@@ -144,3 +101,209 @@ def trial_signup(request):
             {"status": "error", "message": "An error occurred. Please try again."},
             status=500,
         )
+
+
+@staff_member_required
+@require_GET
+def export_view(request, resource):
+    """Stream a CSV/JSONL export, optionally only rows changed since a time"""
+    if resource not in EXPORTS:
+        return JsonResponse(
+            {"status": "error", "message": "Unknown export."}, status=404
+        )
+
+    fmt = request.GET.get("format", "csv")
+    if fmt not in CONTENT_TYPES:
+        return JsonResponse(
+            {"status": "error", "message": "Format must be csv or jsonl."}, status=400
+        )
+
+    since = None
+    if request.GET.get("updated_since"):
+        since = parse_datetime(request.GET["updated_since"])
+        if since is None:
+            return JsonResponse(
+                {"status": "error", "message": "Invalid updated_since timestamp."},
+                status=400,
+            )
+
+    return streaming_export_response(resource, fmt=fmt, since=since)
+
+
+@staff_member_required
+@require_GET
+def search_view(request):
+    """Ranked prefix search over customers or interactions"""
+    query = request.GET.get("q", "").strip()
+    index = request.GET.get("type", "customers")
+    if index not in ("customers", "interactions"):
+        return JsonResponse(
+            {"status": "error", "message": "type must be customers or interactions."},
+            status=400,
+        )
+    try:
+        limit = max(1, min(int(request.GET.get("limit", 20)), 100))
+    except ValueError:
+        limit = 20
+
+    backend = get_search_backend()
+    if index == "customers":
+        results = [
+            {
+                "id": customer.pk,
+                "name": customer.full_name,
+                "email": customer.email,
+            }
+            for customer in backend.search("customer", query, limit)
+        ]
+    else:
+        results = [
+            {
+                "id": interaction.pk,
+                "customer_id": interaction.customer_id,
+                "interaction_type": interaction.interaction_type,
+                "subject": interaction.subject,
+                "created_at": interaction.created_at,
+            }
+            for interaction in backend.search("interaction", query, limit)
+        ]
+
+    return JsonResponse({"status": "success", "query": query, "results": results})
+
+
+class SparseFieldsMixin:
+    """Shape the queryset from ``?fields=`` and ``?expand=``.
+
+    Only the columns the serializer will render are loaded (``only()``),
+    expanded foreign keys are joined with ``select_related`` and reverse
+    relations are prefetched, so a page costs a fixed number of queries.
+    """
+
+    def get_requested_fields(self):
+        raw = self.request.query_params.get("fields")
+        if not raw or self.request.method not in permissions.SAFE_METHODS:
+            return None
+        return {name.strip() for name in raw.split(",") if name.strip()}
+
+    def get_expansions(self):
+        raw = self.request.query_params.get("expand", "")
+        expandable = self.get_serializer_class().expandable
+        return {name.strip() for name in raw.split(",") if name.strip() in expandable}
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = self.get_requested_fields()
+        context["expand"] = self.get_expansions()
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method not in permissions.SAFE_METHODS:
+            return queryset
+
+        serializer_class = self.get_serializer_class()
+        fields = self.get_requested_fields() or serializer_class.Meta.fields
+        expand = self.get_expansions()
+        opts = queryset.model._meta
+
+        # Cursor pagination reads the ordering columns from each row
+        columns = {"id", "created_at"}
+        for name in fields:
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                continue
+
+            if field.one_to_many:
+                related = field.related_model.objects.all()
+                if name not in expand:
+                    # Only the ids are rendered
+                    related = related.only("id", field.field.name)
+                queryset = queryset.prefetch_related(Prefetch(name, queryset=related))
+            elif field.many_to_one and name in expand:
+                queryset = queryset.select_related(name)
+                columns.add(name)
+                nested = serializer_class.expandable[name].Meta.fields
+                columns.update(f"{name}__{related}" for related in nested)
+            elif field.concrete:
+                columns.add(name)
+
+        return queryset.only(*columns)
+
+
+class CustomerViewSet(ConditionalListMixin, SparseFieldsMixin, viewsets.ModelViewSet):
+    """Customers API with sparse fields and company/assigned_to/deals expansion"""
+
+    queryset = Customer.objects.all()
+    serializer_class = CustomerSerializer
+    pagination_class = RecentFirstCursorPagination
+    permission_classes = [permissions.IsAdminUser]
+
+
+class DealViewSet(ConditionalListMixin, SparseFieldsMixin, viewsets.ModelViewSet):
+    """Deals API with sparse fields and assigned_to expansion"""
+
+    queryset = Deal.objects.all()
+    serializer_class = DealSerializer
+    pagination_class = RecentFirstCursorPagination
+    permission_classes = [permissions.IsAdminUser]
+
+
+class InteractionViewSet(
+    ConditionalListMixin, SparseFieldsMixin, viewsets.ModelViewSet
+):
+    """Interactions API with sparse fields and user expansion"""
+
+    # Interactions have no updated_at; rows are effectively append-only
+    validator_field = "created_at"
+
+    queryset = Interaction.objects.all()
+    serializer_class = InteractionSerializer
+    pagination_class = RecentFirstCursorPagination
+    permission_classes = [permissions.IsAdminUser]
+
+
+def bulk_write(request, write_rows):
+    """Run a bulk writer over a JSON array / NDJSON body and report per row"""
+    rows = request.data
+    if not isinstance(rows, list):
+        return Response(
+            {"status": "error", "message": "Expected a JSON array or NDJSON."},
+            status=400,
+        )
+
+    objects = [row for row in rows if isinstance(row, dict)]
+    written, errors = write_rows(objects)
+    # Re-number errors against the request, including non-object rows
+    positions = [index for index, row in enumerate(rows) if isinstance(row, dict)]
+    errors = [{**error, "row": positions[error["row"]]} for error in errors]
+    errors += [
+        {"row": index, "errors": {"non_field_errors": "Expected an object."}}
+        for index, row in enumerate(rows)
+        if not isinstance(row, dict)
+    ]
+    errors.sort(key=lambda error: error["row"])
+
+    return Response(
+        {
+            "status": "success" if not errors else "partial",
+            "written": written,
+            "errors": errors,
+        }
+    )
+
+
+@api_view(["POST"])
+@parser_classes([JSONParser, NDJSONParser])
+@permission_classes([permissions.IsAdminUser])
+def bulk_interactions_view(request):
+    """Log many interactions in one request"""
+    return bulk_write(request, create_interactions)
+
+
+@api_view(["POST"])
+@parser_classes([JSONParser, NDJSONParser])
+@permission_classes([permissions.IsAdminUser])
+def bulk_deals_view(request):
+    """Update many deals in one request"""
+    return bulk_write(request, update_deals)
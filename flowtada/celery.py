@@ -0,0 +1,10 @@
+# flowtada/celery.py
+
+import os
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "flowtada.settings")
+
+app = Celery("flowtada")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
@@ -2,7 +2,7 @@
 
 from pathlib import Path
 import os
-from decouple import config
+from decouple import Csv, config
 from django.utils.translation import gettext_lazy as _
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -31,6 +31,7 @@ INSTALLED_APPS = [
 
     # Third party apps
     'rest_framework',
+    'rest_framework.authtoken',  # TokenAuthentication for integrations
     'channels',  # For WebSocket real-time features
 
     # Local apps - ACTUAL EXISTING APPS
@@ -50,6 +51,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.instrumentation.InstrumentationMiddleware',  # First, to time the rest
     'django.middleware.security.SecurityMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Static files
@@ -58,6 +60,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'portal.middleware.CustomerMiddleware',  # Lazy request.customer
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -102,6 +105,27 @@ if not DEBUG:
         config('DATABASE_URL', default='sqlite:///db.sqlite3')
     )
 
+# Password hashing. The first hasher hashes new passwords; stored hashes made
+# by any of the others are upgraded to it at the user's next login. Set
+# PASSWORD_HASH_ITERATIONS to change the PBKDF2 cost (empty = Django's
+# default), and list another hasher first to migrate algorithms.
+PASSWORD_HASHERS = config('PASSWORD_HASHERS', cast=Csv(), default=','.join([
+    'portal.hashers.ConfigurablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]))
+PASSWORD_HASH_ITERATIONS = config('PASSWORD_HASH_ITERATIONS', default=0, cast=int)
+
+# Portal login throttling: failed attempts allowed per client IP and per
+# username within a sliding window (seconds; 0 disables). Set the proxy
+# count when behind load balancers that append to X-Forwarded-For.
+LOGIN_THROTTLE_WINDOW = config('LOGIN_THROTTLE_WINDOW', default=900, cast=int)
+LOGIN_THROTTLE_IP_LIMIT = config('LOGIN_THROTTLE_IP_LIMIT', default=50, cast=int)
+LOGIN_THROTTLE_USERNAME_LIMIT = config('LOGIN_THROTTLE_USERNAME_LIMIT', default=10, cast=int)
+LOGIN_THROTTLE_PROXY_COUNT = config('LOGIN_THROTTLE_PROXY_COUNT', default=0, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -180,11 +204,46 @@ if DEBUG:
         }
     }
 
+# Deal/Interaction events pushed over /ws/events/ are sent to each group in
+# messages of at most this many events
+REALTIME_EVENT_BATCH_SIZE = config('REALTIME_EVENT_BATCH_SIZE', default=100, cast=int)
+
+# Lead ingest for the public contact/trial forms:
+#   'sync'   - create the records inside the request (default)
+#   'db'     - queue to the LeadSubmission table, drained by `manage.py process_leads`
+#   'celery' - queue to the table and trigger the Celery ingest task
+LEAD_INGEST_MODE = config('LEAD_INGEST_MODE', default='sync')
+LEAD_INGEST_BATCH_SIZE = config('LEAD_INGEST_BATCH_SIZE', default=500, cast=int)
+# Seconds before a submission claimed by a worker that died is claimed again
+LEAD_INGEST_CLAIM_TIMEOUT = config('LEAD_INGEST_CLAIM_TIMEOUT', default=600, cast=int)
+
+# Celery (background tasks)
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://127.0.0.1:6379/0')
+
+# Full-text search backend (dotted path); empty picks SQLite FTS5 or
+# PostgreSQL full-text search based on the database
+SEARCH_BACKEND = config('SEARCH_BACKEND', default='')
+
+# `manage.py archive_interactions` moves interactions older than this many
+# days into the InteractionArchive table, this many rows per transaction
+INTERACTION_ARCHIVE_AFTER_DAYS = config('INTERACTION_ARCHIVE_AFTER_DAYS', default=365, cast=int)
+INTERACTION_ARCHIVE_BATCH_SIZE = config('INTERACTION_ARCHIVE_BATCH_SIZE', default=5000, cast=int)
+
 # Login URLs
 LOGIN_URL = '/portal/login/'
 LOGIN_REDIRECT_URL = '/portal/dashboard/'
 LOGOUT_REDIRECT_URL = '/'
 
+# Portal customer lookup cache (seconds, 0 disables caching)
+PORTAL_CUSTOMER_CACHE_TIMEOUT = config('PORTAL_CUSTOMER_CACHE_TIMEOUT', default=30, cast=int)
+
+# Serve the dashboard/deals/interactions pages with the async views in
+# portal/async_views.py; only worth it when running under ASGI
+PORTAL_ASYNC_VIEWS = config('PORTAL_ASYNC_VIEWS', default=False, cast=bool)
+
+# Rows per "load more" page on portal deal/interaction lists
+PORTAL_PAGE_SIZE = config('PORTAL_PAGE_SIZE', default=25, cast=int)
+
 # Multi-tenant configuration (enable when companies app is created)
 # TENANT_MODEL = 'companies.Company'
 # TENANT_DOMAIN_FIELD = 'subdomain'
@@ -222,6 +281,23 @@ if DEBUG:
         }
     }
 
+# Full-page cache for anonymous marketing pages (core app). Set the timeout
+# to 0 to disable; run ``manage.py clear_page_cache`` after each deploy.
+PAGE_CACHE_ALIAS = config('PAGE_CACHE_ALIAS', default='default')
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=600, cast=int)
+
+# Request instrumentation (core/instrumentation.py). A sampled request
+# records its query count, DB time and latency per view, served in
+# Prometheus format at /metrics/ to staff or to
+# "Authorization: Bearer <INSTRUMENTATION_METRICS_TOKEN>". A statement run
+# INSTRUMENTATION_DUPLICATE_THRESHOLD times in one request is logged as a
+# likely N+1. Server-Timing headers expose timings to the client, so they
+# default to on only in development.
+INSTRUMENTATION_SAMPLE_RATE = config('INSTRUMENTATION_SAMPLE_RATE', default=0.1, cast=float)
+INSTRUMENTATION_DUPLICATE_THRESHOLD = config('INSTRUMENTATION_DUPLICATE_THRESHOLD', default=5, cast=int)
+INSTRUMENTATION_SERVER_TIMING = config('INSTRUMENTATION_SERVER_TIMING', default=DEBUG, cast=bool)
+INSTRUMENTATION_METRICS_TOKEN = config('INSTRUMENTATION_METRICS_TOKEN', default='')
+
 # Logging
 LOGGING = {
     'version': 1,
@@ -258,6 +334,11 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': True,
         },
+        'core': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
     },
 }
 
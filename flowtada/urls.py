@@ -5,12 +5,14 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.conf.urls.i18n import i18n_patterns
+from core.views import metrics_view
 
 # Non-translated URLs (like API endpoints)
 urlpatterns = [
     # Language switching URL
     path('i18n/', include('django.conf.urls.i18n')),
     # path('api/', include('core.api_urls')),  # API doesn't need translation
+    path('metrics/', metrics_view, name='metrics'),
 ]
 
 # Translated URLs
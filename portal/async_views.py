@@ -0,0 +1,143 @@
+# portal/async_views.py
+
+"""Async versions of the read-only portal pages, for ASGI deployments.
+
+They render the same templates as ``portal.views`` and are selected in
+``portal/urls.py`` when ``PORTAL_ASYNC_VIEWS`` is on. Everything the
+templates touch is loaded up front, so rendering never reaches the ORM.
+
+On Django 4.2 the async ORM still runs each query through a thread-sensitive
+executor, so gathered queries overlap their Python-side work rather than
+running in parallel on the database. The win is that a request waiting on
+the database no longer holds a worker thread.
+"""
+
+import asyncio
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import render
+from customers.archive import interaction_history
+from customers.conditional import aconditional_page
+from customers.models import Customer, Deal, Interaction
+from .customers import aget_customer
+from .pagination import apaginate_keyset, apaginate_keyset_through
+from .views import history_sources, is_fragment_request
+
+
+def alogin_required(view_func):
+    """login_required for async views"""
+
+    @wraps(view_func)
+    async def inner(request, *args, **kwargs):
+        # Resolving request.user reads the session, which is sync-only
+        is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+        if not is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view_func(request, *args, **kwargs)
+
+    return inner
+
+
+async def dashboard_sources(request):
+    customer = await aget_customer(request)
+    if customer is None:
+        return None
+    live, archived = interaction_history(customer)
+    return [
+        (Customer.objects.filter(pk=customer.pk), "updated_at"),
+        (Deal.objects.filter(customer=customer), "updated_at"),
+        (live, "created_at"),
+        (archived, "created_at"),
+    ]
+
+
+async def deal_sources(request):
+    customer = await aget_customer(request)
+    if customer is None:
+        return None
+    return [(Deal.objects.filter(customer=customer), "updated_at")]
+
+
+async def interaction_sources(request):
+    customer = await aget_customer(request)
+    if customer is None:
+        return None
+    return history_sources(customer)
+
+
+async def recent(queryset, count=5):
+    return [row async for row in queryset.order_by("-created_at")[:count]]
+
+
+@alogin_required
+@aconditional_page(dashboard_sources)
+async def adashboard_view(request):
+    """Customer portal dashboard (async)"""
+    customer = await aget_customer(request)
+    if customer is not None:
+        customer_deals = Deal.objects.filter(customer=customer)
+        deals, interactions, stats = await asyncio.gather(
+            recent(customer_deals),
+            apaginate_keyset_through(interaction_history(customer), per_page=5),
+            customer_deals.astats(),
+        )
+        context = {
+            "customer": customer,
+            "deals": deals,
+            "interactions": interactions,
+            "stats": stats,
+        }
+    else:
+        context = {
+            "customer": None,
+            "message": "No customer record found. Please contact support.",
+        }
+
+    return render(request, "portal/dashboard.html", context)
+
+
+@alogin_required
+@aconditional_page(deal_sources)
+async def adeals_view(request):
+    """Customer deals list (async)"""
+    customer = await aget_customer(request)
+    if customer is not None:
+        deals = Deal.objects.filter(customer=customer)
+    else:
+        deals = Deal.objects.none()
+
+    page = await apaginate_keyset(
+        deals, request.GET.get("cursor"), settings.PORTAL_PAGE_SIZE
+    )
+    template = (
+        "portal/partials/deal_rows.html"
+        if is_fragment_request(request)
+        else "portal/deals.html"
+    )
+    return render(request, template, {"deals": page, "page": page})
+
+
+@alogin_required
+@aconditional_page(interaction_sources)
+async def ainteractions_view(request):
+    """Customer interactions history (async)"""
+    customer = await aget_customer(request)
+    if customer is not None:
+        history = [
+            queryset.select_related("user")
+            for queryset in interaction_history(customer)
+        ]
+    else:
+        history = [Interaction.objects.none()]
+
+    page = await apaginate_keyset_through(
+        history, request.GET.get("cursor"), settings.PORTAL_PAGE_SIZE
+    )
+    template = (
+        "portal/partials/interaction_rows.html"
+        if is_fragment_request(request)
+        else "portal/interactions.html"
+    )
+    return render(request, template, {"interactions": page, "page": page})
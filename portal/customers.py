@@ -0,0 +1,65 @@
+# portal/customers.py
+
+from django.conf import settings
+from django.core.cache import cache
+from customers.models import Customer
+
+CACHE_KEY = "portal:customer:{}"
+
+
+def cache_key(user_id):
+    return CACHE_KEY.format(user_id)
+
+
+def customer_queryset(user):
+    return Customer.objects.select_related("company", "assigned_to").filter(
+        email=user.email
+    )
+
+
+def resolve_customer(user):
+    """Look up the Customer record for a portal user, or None"""
+    if not user.is_authenticated:
+        return None
+
+    timeout = settings.PORTAL_CUSTOMER_CACHE_TIMEOUT
+    if timeout:
+        customer = cache.get(cache_key(user.pk))
+        if customer is not None:
+            return customer
+
+    customer = customer_queryset(user).first()
+    if customer is not None and timeout:
+        cache.set(cache_key(user.pk), customer, timeout)
+    return customer
+
+
+async def aresolve_customer(user):
+    """Async version of resolve_customer()"""
+    if not user.is_authenticated:
+        return None
+
+    timeout = settings.PORTAL_CUSTOMER_CACHE_TIMEOUT
+    if timeout:
+        customer = await cache.aget(cache_key(user.pk))
+        if customer is not None:
+            return customer
+
+    customer = await customer_queryset(user).afirst()
+    if customer is not None and timeout:
+        await cache.aset(cache_key(user.pk), customer, timeout)
+    return customer
+
+
+def get_customer(request):
+    """Resolve the request's customer once and memoize it on the request"""
+    if not hasattr(request, "_cached_customer"):
+        request._cached_customer = resolve_customer(request.user)
+    return request._cached_customer
+
+
+async def aget_customer(request):
+    """Async version of get_customer(), sharing the same memo"""
+    if not hasattr(request, "_cached_customer"):
+        request._cached_customer = await aresolve_customer(request.user)
+    return request._cached_customer
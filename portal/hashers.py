@@ -0,0 +1,19 @@
+# portal/hashers.py
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with the work factor taken from settings.
+
+    Shares the ``pbkdf2_sha256`` algorithm name with Django's hasher, so
+    existing hashes verify unchanged. When ``PASSWORD_HASH_ITERATIONS``
+    differs from the iterations a stored hash was made with, Django rehashes
+    the password at the user's next successful login. Raising or lowering
+    the cost therefore needs no migration.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS or PBKDF2PasswordHasher.iterations
@@ -0,0 +1,32 @@
+# portal/middleware.py
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import SimpleLazyObject
+from .customers import get_customer
+
+
+class CustomerMiddleware:
+    """Attach a lazily resolved ``request.customer`` for portal views.
+
+    Works in both sync and async stacks, so async views are not forced
+    through a thread. Async views must use ``aget_customer()`` instead of
+    touching ``request.customer``, which resolves synchronously.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.customer = SimpleLazyObject(lambda: get_customer(request))
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        request.customer = SimpleLazyObject(lambda: get_customer(request))
+        return await self.get_response(request)
@@ -0,0 +1,104 @@
+# portal/pagination.py
+
+import base64
+from datetime import datetime
+from django.core.exceptions import BadRequest
+from django.db.models import Q
+
+DEFAULT_PER_PAGE = 25
+
+
+class KeysetPage:
+    """One page of keyset-paginated results"""
+
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def encode_cursor(obj):
+    """Encode the (created_at, id) position of ``obj`` as an opaque token"""
+    raw = f"{obj.created_at.isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, pk = raw.split("|")
+        return datetime.fromisoformat(created_at), int(pk)
+    except ValueError:
+        raise BadRequest("Invalid cursor.")
+
+
+def keyset_queryset(queryset, cursor):
+    """``queryset`` ordered newest first and restricted to rows after ``cursor``"""
+    queryset = queryset.order_by("-created_at", "-id")
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+    return queryset
+
+
+def keyset_page(rows, per_page):
+    """Build a page from up to ``per_page + 1`` fetched rows.
+
+    The extra row only tells us whether another page exists.
+    """
+    next_cursor = encode_cursor(rows[per_page - 1]) if len(rows) > per_page else None
+    return KeysetPage(rows[:per_page], next_cursor)
+
+
+def paginate_keyset(queryset, cursor=None, per_page=DEFAULT_PER_PAGE):
+    """Return the page of ``queryset`` following ``cursor``, newest first.
+
+    Rows are ordered on ``(-created_at, -id)`` and the cursor is applied as a
+    range condition rather than an OFFSET, so with an index on
+    ``(customer, -created_at, -id)`` every page costs the same as the first.
+    """
+    queryset = keyset_queryset(queryset, cursor)
+    return keyset_page(list(queryset[: per_page + 1]), per_page)
+
+
+async def apaginate_keyset(queryset, cursor=None, per_page=DEFAULT_PER_PAGE):
+    """Async version of paginate_keyset()"""
+    queryset = keyset_queryset(queryset, cursor)
+    return keyset_page([row async for row in queryset[: per_page + 1]], per_page)
+
+
+def paginate_keyset_through(querysets, cursor=None, per_page=DEFAULT_PER_PAGE):
+    """paginate_keyset() over querysets whose rows follow one another.
+
+    Every row of a queryset must sort after (be older than) every row of
+    the ones before it, as archived interactions do after live ones. A
+    queryset is only queried once the ones before it run out.
+    """
+    rows = []
+    for queryset in querysets:
+        rows += keyset_queryset(queryset, cursor)[: per_page + 1 - len(rows)]
+        if len(rows) > per_page:
+            break
+    return keyset_page(rows, per_page)
+
+
+async def apaginate_keyset_through(querysets, cursor=None, per_page=DEFAULT_PER_PAGE):
+    """Async version of paginate_keyset_through()"""
+    rows = []
+    for queryset in querysets:
+        queryset = keyset_queryset(queryset, cursor)
+        rows += [row async for row in queryset[: per_page + 1 - len(rows)]]
+        if len(rows) > per_page:
+            break
+    return keyset_page(rows, per_page)
@@ -0,0 +1,24 @@
+# portal/signals.py
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from customers.models import Customer
+from customers.snapshots import stored_values
+from .customers import cache_key
+
+
+@receiver([post_save, post_delete], sender=Customer)
+def invalidate_cached_customer(sender, instance, **kwargs):
+    """Drop cached portal customers for users sharing the customer's email.
+
+    Users with the email the customer had before an update are included, so
+    they stop seeing it as soon as the address changes.
+    """
+    emails = {instance.email}
+    old = stored_values(instance)
+    if old:
+        emails.add(old["email"])
+    user_ids = User.objects.filter(email__in=emails).values_list("pk", flat=True)
+    cache.delete_many([cache_key(user_id) for user_id in user_ids])
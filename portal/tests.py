@@ -0,0 +1,362 @@
+# portal/tests.py
+
+import base64
+from datetime import date, timedelta
+from decimal import Decimal
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from customers.archive import archive_batch, interaction_history
+from customers.models import Customer, Deal, Interaction
+from portal.customers import resolve_customer
+from portal.pagination import (
+    apaginate_keyset,
+    apaginate_keyset_through,
+    paginate_keyset,
+    paginate_keyset_through,
+)
+from portal.throttling import SlidingWindowLimiter
+
+
+class PortalValidatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            "ada@example.com", "ada@example.com", first_name="Ada"
+        )
+        cls.rep = User.objects.create_user("rep", first_name="Rita")
+        cls.customer = Customer.objects.create(
+            first_name="Ada", last_name="Lovelace", email="ada@example.com"
+        )
+        Interaction.objects.create(
+            customer=cls.customer,
+            user=cls.rep,
+            interaction_type="call",
+            subject="Intro",
+            notes="",
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304
+        )
+        return response["ETag"]
+
+    def assertChangesETag(self, url, change):
+        before = self.etag(url)
+        change()
+        self.assertNotEqual(self.etag(url), before)
+
+    def test_dashboard_greeting(self):
+        def change():
+            self.user.first_name = "Augusta"
+            self.user.save()
+
+        self.assertChangesETag(reverse("portal:dashboard"), change)
+
+    def test_dashboard_customer_change(self):
+        def change():
+            self.customer.phone = "555-0100"
+            self.customer.save()
+
+        self.assertChangesETag(reverse("portal:dashboard"), change)
+
+    def test_interactions_user_change(self):
+        def change():
+            self.rep.last_name = "Smith"
+            self.rep.save()
+
+        self.assertChangesETag(reverse("portal:interactions"), change)
+
+    def test_interactions_archived_user_change(self):
+        archive_batch(timezone.now() + timedelta(days=1), 100)
+
+        def change():
+            self.rep.first_name = "Margaret"
+            self.rep.save()
+
+        self.assertChangesETag(reverse("portal:interactions"), change)
+
+
+class DashboardQueryCountTests(TestCase):
+    def test_queries_do_not_grow_with_deals(self):
+        user = User.objects.create_user("ada@example.com", "ada@example.com")
+        customer = Customer.objects.create(
+            first_name="Ada", last_name="Lovelace", email="ada@example.com"
+        )
+        self.client.force_login(user)
+
+        def dashboard_queries():
+            # Counted with a wrapper: each request resets connection.queries
+            queries = []
+
+            def record(execute, sql, *args):
+                queries.append(sql)
+                return execute(sql, *args)
+
+            with connection.execute_wrapper(record):
+                response = self.client.get(reverse("portal:dashboard"))
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        self.client.get(reverse("portal:dashboard"))
+        before = dashboard_queries()
+        Deal.objects.bulk_create(
+            Deal(
+                customer=customer,
+                title=f"Deal {n}",
+                value=Decimal("100.00"),
+                stage="closed_won" if n % 2 else "proposal",
+                expected_close_date=date(2030, 1, 1),
+            )
+            for n in range(20)
+        )
+        self.assertEqual(dashboard_queries(), before)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    PORTAL_CUSTOMER_CACHE_TIMEOUT=30,
+)
+class CachedCustomerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("ada@example.com", "ada@example.com")
+        self.customer = Customer.objects.create(
+            first_name="Ada", last_name="Lovelace", email="ada@example.com"
+        )
+
+    def test_profile_keeps_changes_made_after_caching(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("portal:dashboard"))
+        Customer.objects.filter(pk=self.customer.pk).update(lead_status="won")
+
+        response = self.client.post(
+            reverse("portal:profile"),
+            {
+                "first_name": "Augusta",
+                "last_name": "Lovelace",
+                "phone": "555-0100",
+                "position": "",
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.first_name, "Augusta")
+        self.assertEqual(self.customer.lead_status, "won")
+
+    def test_email_change_drops_cache_for_old_email(self):
+        self.assertEqual(resolve_customer(self.user), self.customer)
+        self.customer.email = "augusta@example.com"
+        self.customer.save()
+        self.assertIsNone(resolve_customer(self.user))
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("ada@example.com", "ada@example.com")
+        cls.customer = Customer.objects.create(
+            first_name="Ada", last_name="Lovelace", email="ada@example.com"
+        )
+        start = timezone.now() - timedelta(days=10)
+        for n in range(7):
+            interaction = Interaction.objects.create(
+                customer=cls.customer,
+                user=cls.user,
+                interaction_type="call",
+                subject=f"Call {n}",
+                notes="",
+            )
+            # Pairs of rows share a timestamp, so the id breaks the tie
+            Interaction.objects.filter(pk=interaction.pk).update(
+                created_at=start + timedelta(hours=n // 2)
+            )
+        cls.newest_first = list(
+            Interaction.objects.order_by("-created_at", "-id").values_list(
+                "pk", flat=True
+            )
+        )
+
+    def walk(self, paginate):
+        """Follow cursors from the first page; returns the row ids in order"""
+        pks, cursor = [], None
+        while True:
+            page = paginate(cursor)
+            self.assertLessEqual(len(page), 3)
+            pks += [row.pk for row in page]
+            if not page.has_next:
+                return pks
+            cursor = page.next_cursor
+
+    def test_cursor_round_trip_with_ties(self):
+        self.assertEqual(
+            self.walk(
+                lambda cursor: paginate_keyset(Interaction.objects.all(), cursor, 3)
+            ),
+            self.newest_first,
+        )
+        self.assertEqual(
+            self.walk(
+                lambda cursor: async_to_sync(apaginate_keyset)(
+                    Interaction.objects.all(), cursor, 3
+                )
+            ),
+            self.newest_first,
+        )
+
+    def test_pages_continue_into_the_archive(self):
+        # The four oldest move to the archive, splitting a page of three
+        archive_batch(timezone.now(), 4)
+        self.assertEqual(Interaction.objects.count(), 3)
+
+        for paginate in [
+            paginate_keyset_through,
+            async_to_sync(apaginate_keyset_through),
+        ]:
+            with self.subTest(paginate=paginate):
+                self.assertEqual(
+                    self.walk(
+                        lambda cursor: paginate(
+                            interaction_history(self.customer), cursor, 2
+                        )
+                    ),
+                    self.newest_first,
+                )
+
+    def test_view_cursor(self):
+        self.client.force_login(self.user)
+        with self.settings(PORTAL_PAGE_SIZE=3):
+            pks, cursor = [], ""
+            while cursor is not None:
+                response = self.client.get(
+                    reverse("portal:interactions"), {"cursor": cursor}
+                )
+                self.assertEqual(response.status_code, 200)
+                page = response.context["page"]
+                pks += [row.pk for row in page]
+                cursor = page.next_cursor
+        self.assertEqual(pks, self.newest_first)
+
+    def test_bad_cursor(self):
+        self.client.force_login(self.user)
+        for cursor in [
+            "garbage",
+            encode_text("no separator"),
+            encode_text("2030-01-01T00:00:00|x"),
+            encode_text("yesterday|1"),
+        ]:
+            with self.subTest(cursor=cursor):
+                for name in ["portal:deals", "portal:interactions"]:
+                    with self.assertLogs("django.request", "WARNING"):
+                        response = self.client.get(reverse(name), {"cursor": cursor})
+                    self.assertEqual(response.status_code, 400)
+
+
+def encode_text(text):
+    return base64.urlsafe_b64encode(text.encode()).decode()
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class SlidingWindowLimiterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.limiter = SlidingWindowLimiter("test", limit=3, window=60)
+
+    def test_limit_and_window_expiry(self):
+        for now in [600, 610, 620]:
+            self.assertEqual(self.limiter.retry_after("ada", now), 0)
+            self.limiter.hit("ada", now)
+        self.assertEqual(self.limiter.retry_after("ada", 630), 30)
+        self.assertEqual(self.limiter.retry_after("bob", 630), 0)
+
+        # The previous window's hits fade out over the next one
+        self.assertEqual(self.limiter.count("ada", 660), 3)
+        self.assertEqual(self.limiter.retry_after("ada", 660), 60)
+        self.assertEqual(self.limiter.count("ada", 690), 1.5)
+        self.assertEqual(self.limiter.retry_after("ada", 690), 0)
+        self.assertEqual(self.limiter.count("ada", 720), 0)
+
+    def test_reset(self):
+        for now in [600, 610, 620]:
+            self.limiter.hit("ada", now)
+        self.limiter.reset("ada", 630)
+        self.assertEqual(self.limiter.retry_after("ada", 630), 0)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    LOGIN_THROTTLE_WINDOW=900,
+    LOGIN_THROTTLE_IP_LIMIT=3,
+    LOGIN_THROTTLE_USERNAME_LIMIT=2,
+    LOGIN_THROTTLE_PROXY_COUNT=0,
+)
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user("ada@example.com", "ada@example.com", "secret")
+
+    def login(self, email, password="wrong", ip="10.0.0.1", **extra):
+        return self.client.post(
+            reverse("portal:login"),
+            {"email": email, "password": password},
+            content_type="application/json",
+            REMOTE_ADDR=ip,
+            **extra,
+        )
+
+    def assertThrottled(self, response):
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+
+    def assertNotThrottled(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "error")
+
+    def test_per_account_limit(self):
+        for _ in range(2):
+            self.assertNotThrottled(self.login("ada@example.com"))
+        # Even the right password waits, from any address
+        self.assertThrottled(self.login("ada@example.com", "secret"))
+        self.assertThrottled(self.login("ADA@example.com ", ip="10.0.0.2"))
+        # Other accounts from the same address still get through
+        self.assertNotThrottled(self.login("bob@example.com"))
+
+    def test_per_ip_limit(self):
+        for email in ["a@example.com", "b@example.com", "c@example.com"]:
+            self.assertNotThrottled(self.login(email))
+        self.assertThrottled(self.login("ada@example.com", "secret"))
+        response = self.login("ada@example.com", "secret", ip="10.0.0.2")
+        self.assertEqual(response.json()["status"], "success")
+
+    def test_success_clears_account_failures(self):
+        self.assertNotThrottled(self.login("ada@example.com"))
+        self.assertEqual(
+            self.login("ada@example.com", "secret").json()["status"], "success"
+        )
+        self.client.logout()
+        for _ in range(2):
+            self.assertNotThrottled(self.login("ada@example.com"))
+
+    @override_settings(LOGIN_THROTTLE_PROXY_COUNT=1)
+    def test_client_ip_behind_proxy(self):
+        for email in ["a@example.com", "b@example.com", "c@example.com"]:
+            self.login(email, HTTP_X_FORWARDED_FOR="spoofed, 192.0.2.1")
+        # Same proxy, different client
+        self.assertNotThrottled(
+            self.login("d@example.com", HTTP_X_FORWARDED_FOR="192.0.2.2")
+        )
+        self.assertThrottled(
+            self.login("d@example.com", HTTP_X_FORWARDED_FOR="other, 192.0.2.1")
+        )
@@ -0,0 +1,114 @@
+# portal/throttling.py
+
+import hashlib
+import math
+import time
+from django.conf import settings
+from django.core.cache import cache
+
+KEY = "portal:login:{scope}:{ident}:{bucket}"
+
+
+class SlidingWindowLimiter:
+    """Cache-backed failure counter over a sliding time window.
+
+    Keeps one counter per fixed window and weights the previous window by
+    how much of it still overlaps the sliding one, the usual two-bucket
+    approximation. A check is a single get_many(); recording a hit is an
+    add() plus an incr().
+    """
+
+    def __init__(self, scope, limit, window):
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+
+    def keys(self, ident, now):
+        bucket = int(now // self.window)
+        return (
+            KEY.format(scope=self.scope, ident=ident, bucket=bucket),
+            KEY.format(scope=self.scope, ident=ident, bucket=bucket - 1),
+        )
+
+    def count(self, ident, now=None):
+        now = time.time() if now is None else now
+        current, previous = self.keys(ident, now)
+        counts = cache.get_many([current, previous])
+        overlap = 1 - (now % self.window) / self.window
+        return counts.get(current, 0) + counts.get(previous, 0) * overlap
+
+    def retry_after(self, ident, now=None):
+        """Seconds until ``ident`` is allowed again, or 0 if it is now"""
+        now = time.time() if now is None else now
+        if self.count(ident, now) < self.limit:
+            return 0
+        # Once the current window ends only its own count carries over
+        return math.ceil(self.window - now % self.window)
+
+    def hit(self, ident, now=None):
+        now = time.time() if now is None else now
+        current, _ = self.keys(ident, now)
+        # Kept for two windows so it can serve as the previous bucket
+        cache.add(current, 0, self.window * 2)
+        try:
+            cache.incr(current)
+        except ValueError:
+            cache.set(current, 1, self.window * 2)
+
+    def reset(self, ident, now=None):
+        cache.delete_many(self.keys(ident, time.time() if now is None else now))
+
+
+def client_ip(request):
+    """The client address, skipping ``LOGIN_THROTTLE_PROXY_COUNT`` proxies"""
+    proxies = settings.LOGIN_THROTTLE_PROXY_COUNT
+    if proxies:
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        addresses = [a.strip() for a in forwarded.split(",") if a.strip()]
+        if len(addresses) >= proxies:
+            return addresses[-proxies]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def username_key(username):
+    # Hashed so arbitrary input can't produce invalid cache keys
+    return hashlib.md5(
+        (username or "").strip().lower().encode(), usedforsecurity=False
+    ).hexdigest()
+
+
+def limiters():
+    window = settings.LOGIN_THROTTLE_WINDOW
+    return (
+        SlidingWindowLimiter("ip", settings.LOGIN_THROTTLE_IP_LIMIT, window),
+        SlidingWindowLimiter("user", settings.LOGIN_THROTTLE_USERNAME_LIMIT, window),
+    )
+
+
+def login_retry_after(request, username):
+    """Seconds the client must wait before another login attempt, or 0.
+
+    Call this before authenticate(), so a throttled attempt costs a cache
+    lookup and no password hashing.
+    """
+    if not settings.LOGIN_THROTTLE_WINDOW:
+        return 0
+    by_ip, by_username = limiters()
+    return max(
+        by_ip.retry_after(client_ip(request)),
+        by_username.retry_after(username_key(username)),
+    )
+
+
+def record_login_failure(request, username):
+    if settings.LOGIN_THROTTLE_WINDOW:
+        by_ip, by_username = limiters()
+        by_ip.hit(client_ip(request))
+        by_username.hit(username_key(username))
+
+
+def record_login_success(request, username):
+    """Clear the username's failures; the IP's failures still count"""
+    if settings.LOGIN_THROTTLE_WINDOW:
+        _, by_username = limiters()
+        by_username.reset(username_key(username))
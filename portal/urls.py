@@ -1,16 +1,28 @@
 # portal/urls.py
 
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = "portal"
 
+if settings.PORTAL_ASYNC_VIEWS:
+    from . import async_views
+
+    dashboard_view = async_views.adashboard_view
+    deals_view = async_views.adeals_view
+    interactions_view = async_views.ainteractions_view
+else:
+    dashboard_view = views.dashboard_view
+    deals_view = views.deals_view
+    interactions_view = views.interactions_view
+
 urlpatterns = [
     path("", views.login_view, name="login"),
     path("login/", views.login_view, name="login"),
     path("logout/", views.logout_view, name="logout"),
-    path("dashboard/", views.dashboard_view, name="dashboard"),
+    path("dashboard/", dashboard_view, name="dashboard"),
     path("profile/", views.profile_view, name="profile"),
-    path("deals/", views.deals_view, name="deals"),
-    path("interactions/", views.interactions_view, name="interactions"),
+    path("deals/", deals_view, name="deals"),
+    path("interactions/", interactions_view, name="interactions"),
 ]
@@ -1,16 +1,38 @@
 # portal/views.py
 
+from django.conf import settings
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import AuthenticationForm
+from django.contrib.auth.models import User
 from django.contrib import messages
+from django.db.models import Q
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
+from customers.archive import interaction_history
+from customers.conditional import conditional_page
 from customers.models import Customer, Deal, Interaction
+from .pagination import paginate_keyset, paginate_keyset_through
+from .throttling import (
+    login_retry_after,
+    record_login_failure,
+    record_login_success,
+)
 import json
 
 
+def throttled_response(request, form, retry_after):
+    message = "Too many login attempts. Please try again later."
+    if request.content_type == "application/json":
+        response = JsonResponse({"status": "error", "message": message}, status=429)
+    else:
+        messages.error(request, message)
+        response = render(request, "portal/login.html", {"form": form}, status=429)
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
 def login_view(request):
     """Customer portal login"""
     if request.user.is_authenticated:
@@ -24,13 +46,20 @@ def login_view(request):
                 username = data.get("email")
                 password = data.get("password")
 
+                # Throttle before authenticate() so rejections cost no hashing
+                retry_after = login_retry_after(request, username)
+                if retry_after:
+                    return throttled_response(request, None, retry_after)
+
                 user = authenticate(request, username=username, password=password)
                 if user:
+                    record_login_success(request, username)
                     login(request, user)
                     return JsonResponse(
                         {"status": "success", "redirect": "/portal/dashboard/"}
                     )
                 else:
+                    record_login_failure(request, username)
                     return JsonResponse(
                         {"status": "error", "message": "Invalid email or password"}
                     )
@@ -41,15 +70,23 @@ def login_view(request):
         else:
             # Handle form submission
             form = AuthenticationForm(request, data=request.POST)
+            username = request.POST.get("username")
+            retry_after = login_retry_after(request, username)
+            if retry_after:
+                # An unbound form: rendering a bound one would validate it,
+                # which authenticates
+                unbound = AuthenticationForm(request, initial={"username": username})
+                return throttled_response(request, unbound, retry_after)
+
+            # is_valid() authenticates; reuse its user rather than hashing again
             if form.is_valid():
-                username = form.cleaned_data.get("username")
-                password = form.cleaned_data.get("password")
-                user = authenticate(username=username, password=password)
-                if user:
-                    login(request, user)
-                    messages.success(request, f"Welcome back, {user.first_name}!")
-                    return redirect("portal:dashboard")
+                user = form.get_user()
+                record_login_success(request, username)
+                login(request, user)
+                messages.success(request, f"Welcome back, {user.first_name}!")
+                return redirect("portal:dashboard")
             else:
+                record_login_failure(request, username)
                 messages.error(request, "Invalid email or password.")
     else:
         form = AuthenticationForm()
@@ -57,41 +94,72 @@ def login_view(request):
     return render(request, "portal/login.html", {"form": form})
 
 
+# Data each portal page renders, for conditional GET validators
+def dashboard_sources(request):
+    customer = request.customer
+    if not customer:
+        return None
+    live, archived = interaction_history(customer)
+    return [
+        (Customer.objects.filter(pk=customer.pk), "updated_at"),
+        (Deal.objects.filter(customer=customer), "updated_at"),
+        (live, "created_at"),
+        (archived, "created_at"),
+    ]
+
+
+def deal_sources(request):
+    customer = request.customer
+    if not customer:
+        return None
+    return [(Deal.objects.filter(customer=customer), "updated_at")]
+
+
+def interaction_sources(request):
+    customer = request.customer
+    if not customer:
+        return None
+    return history_sources(customer)
+
+
+def history_sources(customer):
+    """The customer's live and archived interactions and who logged them"""
+    live, archived = interaction_history(customer)
+    users = User.objects.filter(
+        Q(pk__in=live.values("user")) | Q(pk__in=archived.values("user"))
+    )
+    return [
+        (live, "created_at"),
+        (archived, "created_at"),
+        # Users have no timestamp; compare the rendered names
+        (users.values_list("username", "first_name", "last_name"), None),
+    ]
+
+
 @login_required
+@conditional_page(dashboard_sources)
 def dashboard_view(request):
     """Customer portal dashboard"""
     # Get customer data for the logged-in user
-    try:
-        customer = Customer.objects.get(email=request.user.email)
-
+    customer = request.customer
+    if customer:
         # Get customer's deals
-        deals = Deal.objects.filter(customer=customer).order_by("-created_at")[:5]
-
-        # Get recent interactions
-        interactions = Interaction.objects.filter(customer=customer).order_by(
-            "-created_at"
-        )[:5]
+        customer_deals = Deal.objects.filter(customer=customer)
+        deals = customer_deals.order_by("-created_at")[:5]
 
-        # Calculate stats
-        total_deals = deals.count()
-        won_deals = deals.filter(stage="closed_won").count()
-        total_value = sum(deal.value for deal in deals)
+        # Get recent interactions, from the archive if there are few newer
+        interactions = paginate_keyset_through(
+            interaction_history(customer), per_page=5
+        )
 
         context = {
             "customer": customer,
             "deals": deals,
             "interactions": interactions,
-            "stats": {
-                "total_deals": total_deals,
-                "won_deals": won_deals,
-                "total_value": total_value,
-                "success_rate": round(
-                    (won_deals / total_deals * 100) if total_deals > 0 else 0, 1
-                ),
-            },
+            # Stats cover all of the customer's deals, not just the recent five
+            "stats": customer_deals.stats(),
         }
-
-    except Customer.DoesNotExist:
+    else:
         # User doesn't have a customer record
         context = {
             "customer": None,
@@ -104,9 +172,8 @@ def dashboard_view(request):
 @login_required
 def profile_view(request):
     """Customer profile management"""
-    try:
-        customer = Customer.objects.get(email=request.user.email)
-    except Customer.DoesNotExist:
+    customer = request.customer
+    if not customer:
         messages.error(request, "Customer profile not found.")
         return redirect("portal:dashboard")
 
@@ -116,7 +183,17 @@ def profile_view(request):
         customer.last_name = request.POST.get("last_name", customer.last_name)
         customer.phone = request.POST.get("phone", customer.phone)
         customer.position = request.POST.get("position", customer.position)
-        customer.save()
+        # request.customer may be a cached copy; writing back only the form
+        # fields keeps it from reverting changes made since it was cached
+        customer.save(
+            update_fields=[
+                "first_name",
+                "last_name",
+                "phone",
+                "position",
+                "updated_at",
+            ]
+        )
 
         messages.success(request, "Profile updated successfully!")
         return redirect("portal:profile")
@@ -124,30 +201,56 @@ def profile_view(request):
     return render(request, "portal/profile.html", {"customer": customer})
 
 
+def is_fragment_request(request):
+    """Whether the client asked only for the rows of a "load more" page"""
+    return (
+        request.GET.get("fragment") == "1"
+        or request.headers.get("x-requested-with") == "XMLHttpRequest"
+    )
+
+
 @login_required
+@conditional_page(deal_sources)
 def deals_view(request):
     """Customer deals list"""
-    try:
-        customer = Customer.objects.get(email=request.user.email)
-        deals = Deal.objects.filter(customer=customer).order_by("-created_at")
-    except Customer.DoesNotExist:
-        deals = []
+    customer = request.customer
+    if customer:
+        deals = Deal.objects.filter(customer=customer)
+    else:
+        deals = Deal.objects.none()
 
-    return render(request, "portal/deals.html", {"deals": deals})
+    page = paginate_keyset(deals, request.GET.get("cursor"), settings.PORTAL_PAGE_SIZE)
+    template = (
+        "portal/partials/deal_rows.html"
+        if is_fragment_request(request)
+        else "portal/deals.html"
+    )
+    return render(request, template, {"deals": page, "page": page})
 
 
 @login_required
+@conditional_page(interaction_sources)
 def interactions_view(request):
     """Customer interactions history"""
-    try:
-        customer = Customer.objects.get(email=request.user.email)
-        interactions = Interaction.objects.filter(customer=customer).order_by(
-            "-created_at"
-        )
-    except Customer.DoesNotExist:
-        interactions = []
+    customer = request.customer
+    if customer:
+        # Older history continues from the archive once the live rows run out
+        history = [
+            queryset.select_related("user")
+            for queryset in interaction_history(customer)
+        ]
+    else:
+        history = [Interaction.objects.none()]
 
-    return render(request, "portal/interactions.html", {"interactions": interactions})
+    page = paginate_keyset_through(
+        history, request.GET.get("cursor"), settings.PORTAL_PAGE_SIZE
+    )
+    template = (
+        "portal/partials/interaction_rows.html"
+        if is_fragment_request(request)
+        else "portal/interactions.html"
+    )
+    return render(request, template, {"interactions": page, "page": page})
 
 
 def logout_view(request):
@@ -0,0 +1,16 @@
+// Admin changelist: apply an autocomplete filter when a value is picked
+
+'use strict';
+{
+    django.jQuery(document).on('change', 'select.autocomplete-filter', function () {
+        const params = new URLSearchParams(window.location.search);
+        params.delete(this.dataset.lookup);
+        params.delete(this.dataset.lookupIsnull);
+        // A different filter starts over from the first page
+        params.delete('p');
+        if (this.value) {
+            params.set(this.dataset.lookup, this.value);
+        }
+        window.location.search = params.toString();
+    });
+}
@@ -0,0 +1,23 @@
+// Portal "load more" pagination
+
+document.addEventListener('click', function (e) {
+    const button = e.target.closest('.load-more');
+    if (!button) {
+        return;
+    }
+
+    button.disabled = true;
+    fetch(button.dataset.nextUrl, {
+        headers: { 'X-Requested-With': 'XMLHttpRequest' },
+        credentials: 'same-origin'
+    })
+        .then(response => response.text())
+        .then(html => {
+            // The fragment carries the next rows and, if any remain, a new button
+            button.insertAdjacentHTML('afterend', html);
+            button.remove();
+        })
+        .catch(() => {
+            button.disabled = false;
+        });
+});